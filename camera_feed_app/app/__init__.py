@@ -43,6 +43,12 @@ def create_app(config_class=Config) -> Flask:
 
     app.register_blueprint(camera_bp)
 
+    if app.config.get("MODEL_PRELOAD"):
+        from camera_feed_app.app.services.camera_service import init_camera_manager
+
+        # Load and warm up detector models in the background so the first toggle is instant.
+        init_camera_manager(app.config).start_model_preload()
+
     @app.get("/favicon.ico")
     def favicon():
         resp = send_from_directory(app.static_folder, "favicon.svg", mimetype="image/svg+xml")
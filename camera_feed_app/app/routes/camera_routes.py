@@ -1,7 +1,9 @@
+import json
 import os
 import tempfile
 from datetime import datetime
 from pathlib import Path
+from typing import Tuple
 
 import cv2
 import numpy as np
@@ -21,6 +23,57 @@ def _manager():
     return init_camera_manager(current_app.config)
 
 
+def _requested_camera_id():
+    """Optional ``camera_id`` from the JSON body; None targets the primary camera."""
+    data = request.get_json(silent=True) or {}
+    camera_id = data.get("camera_id")
+    if camera_id is None:
+        return None
+    try:
+        return int(camera_id)
+    except (TypeError, ValueError):
+        abort(400)
+
+
+def _toggle_message(label: str, enabled: bool, model_state: str) -> str:
+    if model_state == "busy":
+        return f"{label} toggle already in progress; try again when it finishes"
+    if model_state == "loading":
+        return f"{label} model loading; detection turns on when it is ready"
+    if model_state == "failed" and not enabled:
+        return f"{label} model failed to load"
+    return f"{label} detection {'enabled' if enabled else 'disabled'}"
+
+
+def _toggle_busy_response(label: str, enabled: bool) -> Tuple[Response, int]:
+    """409 for a toggle refused because the previous toggle of the same detector is still running."""
+    return (
+        jsonify({"success": False, "enabled": enabled, "model_state": "busy", "message": _toggle_message(label, enabled, "busy")}),
+        409,
+    )
+
+
+def _snapshot_response(body: bytes, etag: str, version: int) -> Response:
+    """JSON response for a published state snapshot; a matching ``If-None-Match`` gets 304."""
+    response = Response(body, mimetype="application/json")
+    # Weak, because response compression rewrites the body a strong ETag would describe.
+    response.set_etag(etag, weak=True)
+    response.headers["X-State-Version"] = str(version)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def _event_summary(metadata_path: Path):
+    """``drone, gun``-style list of what triggered an event clip, or None for other media."""
+    if not metadata_path.exists():
+        return None
+    try:
+        metadata = json.loads(metadata_path.read_text())
+    except (OSError, ValueError):
+        return None
+    return ", ".join(str(trigger.get("kind")) for trigger in metadata.get("triggers", []))
+
+
 def _get_demo_dir():
     """Get demo testing directory from config."""
     return Path(current_app.config.get("DEMO_TESTING_DIR", "camera_feed_app/demo"))
@@ -43,7 +96,8 @@ def archives():
                 continue
 
             for file_path in directory.iterdir():
-                if not file_path.is_file():
+                # Event clip metadata is shown with its clip rather than listed on its own.
+                if not file_path.is_file() or file_path.suffix.lower() == ".json":
                     continue
 
                 if file_path.name in files_by_name:
@@ -57,6 +111,7 @@ def archives():
                     "url": url_for("camera.archives_media", media_type=media_type, filename=file_path.name),
                     "is_image": file_path.suffix.lower() in {".jpg", ".jpeg", ".png", ".bmp", ".webp"},
                     "is_video": file_path.suffix.lower() in {".mp4", ".avi", ".mov", ".mkv", ".mjpeg"},
+                    "event": _event_summary(file_path.with_suffix(".json")),
                 }
 
         items = list(files_by_name.values())
@@ -144,11 +199,36 @@ def select_camera():
     except (TypeError, ValueError):
         return jsonify({"success": False, "message": "Invalid camera index"}), 400
 
-    ok, message = _manager().open_camera(index)
-    status = 200 if ok else 400
+    # {"wait": false} returns 202 at once; the camera then reports "opening" under camera_transitions in /api/status.
+    wait = bool(data.get("wait", True))
+    ok, message = _manager().open_camera(index, wait=wait)
+    status = (200 if wait else 202) if ok else 400
     return jsonify({"success": ok, "message": message, "selected_camera": f"Camera {index}" if ok else None}), status
 
 
+@camera_bp.post("/api/cameras/<int:camera_id>/open")
+def open_additional_camera(camera_id: int):
+    """Open a camera alongside the ones already streaming."""
+    wait = bool((request.get_json(silent=True) or {}).get("wait", True))
+    ok, message = _manager().add_camera(camera_id, wait=wait)
+    status = (200 if wait else 202) if ok else 400
+    return jsonify({"success": ok, "message": message, "camera": _manager().get_camera_status(camera_id)}), status
+
+
+@camera_bp.post("/api/cameras/<int:camera_id>/close")
+def close_camera(camera_id: int):
+    ok, message = _manager().close_camera(camera_id)
+    return jsonify({"success": ok, "message": message, "state": _manager().get_state()})
+
+
+@camera_bp.get("/api/cameras/<int:camera_id>/status")
+def camera_status(camera_id: int):
+    status = _manager().get_camera_status(camera_id)
+    if status is None:
+        return jsonify({"success": False, "message": f"Camera {camera_id} is not open"}), 404
+    return jsonify({"success": True, "camera": status})
+
+
 @camera_bp.post("/api/start")
 def start_camera():
     state = _manager().get_state()
@@ -175,47 +255,78 @@ def video_feed():
     )
 
 
+@camera_bp.get("/video_feed/<int:camera_id>")
+def camera_video_feed(camera_id: int):
+    return Response(
+        frame_generator(_manager(), camera_id),
+        mimetype="multipart/x-mixed-replace; boundary=frame",
+    )
+
+
+@camera_bp.get("/api/event_clips")
+def event_clips():
+    """Recently saved event clips with the detections that triggered them."""
+    limit = request.args.get("limit", 20, type=int)
+    return jsonify({"success": True, "clips": _manager().get_event_clips(limit)})
+
+
 @camera_bp.post("/api/capture")
 def capture_image():
-    ok, message, filename = _manager().capture_image()
+    ok, message, filename = _manager().capture_image(_requested_camera_id())
     status = 200 if ok else 400
     return jsonify({"success": ok, "message": message, "filename": filename}), status
 
 
 @camera_bp.post("/api/record/start")
 def start_recording():
-    ok, message, filename = _manager().start_recording()
+    ok, message, filename = _manager().start_recording(_requested_camera_id())
     status = 200 if ok else 400
     return jsonify({"success": ok, "message": message, "filename": filename, "state": _manager().get_state()}), status
 
 
 @camera_bp.post("/api/record/stop")
 def stop_recording():
-    ok, message = _manager().stop_recording()
+    ok, message = _manager().stop_recording(_requested_camera_id())
     return jsonify({"success": ok, "message": message, "state": _manager().get_state()})
 
 
 @camera_bp.get("/api/status")
 def status():
-    return jsonify({"success": True, "state": _manager().get_state()})
+    snapshot = _manager().get_state_snapshot()
+    return _snapshot_response(snapshot.status_body, snapshot.status_etag, snapshot.version)
 
 
 @camera_bp.get("/api/fps")
 def get_fps():
-    return jsonify({"fps": _manager().get_fps()})
+    camera_id = request.args.get("camera_id", type=int)
+    snapshot = _manager().get_state_snapshot()
+    body, etag = snapshot.fps_response(camera_id)
+    return _snapshot_response(body, etag, snapshot.version)
+
+
+@camera_bp.get("/api/events")
+def state_events():
+    """Server-Sent Events: status, AI status and FPS changes, replacing the dashboard's polling."""
+    response = Response(_manager().iter_state_events(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # keep reverse proxies from buffering the stream
+    return response
 
 
 @camera_bp.post("/api/toggle_face")
 def toggle_face():
     """Toggle face detection on/off."""
-    enabled = _manager().toggle_face_detection()
+    enabled, model_state = _manager().toggle_face_detection()
+    if model_state == "busy":
+        return _toggle_busy_response("Face", enabled)
     status = _manager().get_face_detection_status()
     return jsonify(
         {
             "success": True,
             "enabled": enabled,
+            "model_state": model_state,
             "faces_detected": status["faces_detected"],
-            "message": f"Face detection {'enabled' if enabled else 'disabled'}",
+            "message": _toggle_message("Face", enabled, model_state),
         }
     )
 
@@ -223,14 +334,17 @@ def toggle_face():
 @camera_bp.post("/api/toggle_drone")
 def toggle_drone():
     """Toggle drone detection on/off."""
-    enabled = _manager().toggle_drone_detection()
+    enabled, model_state = _manager().toggle_drone_detection()
+    if model_state == "busy":
+        return _toggle_busy_response("Drone", enabled)
     status = _manager().get_drone_detection_status()
     return jsonify(
         {
             "success": True,
             "enabled": enabled,
+            "model_state": model_state,
             "drones_detected": status["drones_detected"],
-            "message": f"Drone detection {'enabled' if enabled else 'disabled'}",
+            "message": _toggle_message("Drone", enabled, model_state),
         }
     )
 
@@ -238,7 +352,9 @@ def toggle_drone():
 @camera_bp.post("/api/toggle_knife")
 def toggle_knife():
     """Toggle knife detection on/off."""
-    enabled = _manager().toggle_knife_detection()
+    enabled, model_state = _manager().toggle_knife_detection()
+    if model_state == "busy":
+        return _toggle_busy_response("Knife", enabled)
     status = _manager().get_weapon_detection_status()
     return jsonify(
         {
@@ -249,7 +365,8 @@ def toggle_knife():
             "knives_detected": status["knives_detected"],
             "guns_detected": status["guns_detected"],
             "total_weapons": status["total_weapons"],
-            "message": f"Knife detection {'enabled' if enabled else 'disabled'}",
+            "model_state": model_state,
+            "message": _toggle_message("Knife", enabled, model_state),
         }
     )
 
@@ -257,11 +374,13 @@ def toggle_knife():
 @camera_bp.post("/api/toggle_gun")
 def toggle_gun():
     """Toggle gun detection on/off."""
-    enabled = _manager().toggle_gun_detection()
+    enabled, model_state = _manager().toggle_gun_detection()
+    if model_state == "busy":
+        return _toggle_busy_response("Gun", enabled)
     status = _manager().get_weapon_detection_status()
     gun_available = status.get("gun_available", False)
     gun_backend = status.get("gun_backend", "none")
-    message = f"Gun detection {'enabled' if enabled else 'disabled'}"
+    message = _toggle_message("Gun", enabled, model_state)
     if not gun_available:
         message = "Gun detection unavailable: configure WEAPON_GUN_MODEL or WEAPON_GUN_ROBOFLOW_* settings"
 
@@ -276,6 +395,7 @@ def toggle_gun():
             "knives_detected": status["knives_detected"],
             "guns_detected": status["guns_detected"],
             "total_weapons": status["total_weapons"],
+            "model_state": model_state,
             "message": message,
         }
     )
@@ -284,7 +404,9 @@ def toggle_gun():
 @camera_bp.post("/api/toggle_weapon")
 def toggle_weapon():
     """Backward-compatible endpoint - toggles both knife and gun together."""
-    enabled = _manager().toggle_weapon_detection()
+    enabled, model_state = _manager().toggle_weapon_detection()
+    if model_state == "busy":
+        return _toggle_busy_response("Weapon", enabled)
     status = _manager().get_weapon_detection_status()
     return jsonify(
         {
@@ -296,7 +418,8 @@ def toggle_weapon():
             "knives_detected": status["knives_detected"],
             "guns_detected": status["guns_detected"],
             "total_weapons": status["total_weapons"],
-            "message": f"Weapon detection {'enabled' if enabled else 'disabled'}",
+            "model_state": model_state,
+            "message": _toggle_message("Weapon", enabled, model_state),
         }
     )
 
@@ -311,8 +434,16 @@ def weapon_status():
 @camera_bp.get("/api/ai_status")
 def ai_status():
     """Get combined AI detection status for all models."""
-    status = _manager().get_ai_status()
-    return jsonify(status)
+    snapshot = _manager().get_state_snapshot()
+    return _snapshot_response(snapshot.ai_status_body, snapshot.ai_status_etag, snapshot.version)
+
+
+@camera_bp.get("/api/ai_diagnostics")
+def ai_diagnostics():
+    """Batching, motion gate, interval, model registry, tracking and remote inference counters."""
+    response = jsonify(_manager().get_ai_diagnostics())
+    response.headers["Cache-Control"] = "no-store"
+    return response
 
 
 @camera_bp.get("/api/audio_drone/status")
@@ -482,7 +613,9 @@ def audio_drone_delete_detection(filename):
 @camera_bp.post("/api/toggle_detection")
 def toggle_detection():
     """Legacy endpoint - toggles face detection."""
-    enabled = _manager().toggle_face_detection()
+    enabled, model_state = _manager().toggle_face_detection()
+    if model_state == "busy":
+        return _toggle_busy_response("Face", enabled)
     status = _manager().get_face_detection_status()
     return jsonify(
         {
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Dict, Optional, List
 from datetime import datetime
 
+from camera_feed_app.app.services.model_registry import ModelHandle, ModelRegistry, model_key
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,7 @@ class AudioDroneDetectionService:
         duration_seconds: int = 3,
         n_mels: int = 128,
         captures_dir: str = "app/static/captures",
+        model_registry: Optional[ModelRegistry] = None,
     ) -> None:
         self._model_path = Path(model_path)
         self._confidence_threshold = confidence_threshold
@@ -28,7 +30,8 @@ class AudioDroneDetectionService:
         self._captures_dir = Path(captures_dir)
         self._detections_log = self._captures_dir / "audio_detections.json"
 
-        self._model = None
+        self._model_registry = model_registry or ModelRegistry()
+        self._model_handle: Optional[ModelHandle] = None
         self._available = False
         self._last_result: Optional[Dict[str, object]] = None
         
@@ -49,18 +52,28 @@ class AudioDroneDetectionService:
             return False
 
         try:
-            self._model = tf.keras.models.load_model(str(self._model_path))
+            # The registry may evict the model while no upload is analysed; detect_file() reloads it.
+            handle = self._model_registry.register(
+                model_key("keras", self._model_path),
+                lambda: tf.keras.models.load_model(str(self._model_path)),
+            )
+            handle.load()
+            self._model_handle = handle
             self._available = True
             logger.info("AudioDroneDetectionService: model loaded from %s", self._model_path)
             return True
         except Exception as error:
             logger.error("Failed to load audio drone model: %s", error)
             self._available = False
-            self._model = None
+            self._model_handle = None
             return False
 
+    def model_handles(self) -> List[ModelHandle]:
+        """Registry handle of the loaded audio model, if any."""
+        return [self._model_handle] if self._model_handle is not None else []
+
     def is_available(self) -> bool:
-        return self._available and self._model is not None
+        return self._available and self._model_handle is not None
 
     def detect_file(self, file_path: str) -> Dict[str, object]:
         if not self.is_available():
@@ -130,7 +143,11 @@ class AudioDroneDetectionService:
             mel_db = librosa.power_to_db(mel, ref=np.max)
 
             model_input = mel_db[np.newaxis, ..., np.newaxis]
-            prediction = self._model.predict(model_input, verbose=0)
+            model = self._model_handle.acquire("audio")
+            try:
+                prediction = model.predict(model_input, verbose=0)
+            finally:
+                self._model_handle.release("audio")
             score = float(prediction[0][0])
 
             detected = score > self._confidence_threshold
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from camera_feed_app.app.services.detection_arrays import concat, from_boxes_data
+from camera_feed_app.app.services.frame_context import FrameContext, region_inference_size
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingInference:
+    def __init__(self, frame, stream_id, predict_kwargs: Dict[str, object]) -> None:
+        self.frame = frame
+        self.stream_id = stream_id
+        self.predict_kwargs = predict_kwargs
+        self.key = tuple(
+            sorted((name, tuple(value) if isinstance(value, list) else value) for name, value in predict_kwargs.items())
+        )
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchInferenceScheduler:
+    """Gather frames from every camera stream and run them through one model call.
+
+    Callers block in :meth:`infer` while a single worker thread collects
+    requests that share the same predict arguments. The worker waits at most
+    ``max_wait_ms`` after the oldest request, and only while other recently
+    active streams are still expected to submit, so a lone camera pays no extra
+    latency. Because only the worker touches the model, callers do not need to
+    hold a lock around inference. When the model is shared with another
+    scheduler, pass its ``model_lock`` so their calls do not overlap.
+    """
+
+    _STREAM_ACTIVITY_WINDOW_SECONDS = 2.0
+
+    def __init__(
+        self,
+        model_getter: Callable[[], object],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 15.0,
+        name: str = "model",
+        model_lock: Optional[threading.Lock] = None,
+    ) -> None:
+        self._model_getter = model_getter
+        self._model_lock = model_lock
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._name = name
+
+        self._condition = threading.Condition()
+        self._pending = deque()
+        self._stream_last_seen: Dict[object, float] = {}
+        self._worker: Optional[threading.Thread] = None
+
+        self._batches_run = 0
+        self._frames_run = 0
+        self._largest_batch = 0
+
+    def infer(self, frame, stream_id=None, timeout: float = 30.0, **predict_kwargs):
+        """Queue ``frame`` for the next batch and return its ultralytics ``Results``."""
+        return self.infer_many([frame], stream_id=stream_id, timeout=timeout, **predict_kwargs)[0]
+
+    def infer_many(self, frames: List[object], stream_id=None, timeout: float = 30.0, **predict_kwargs) -> List[object]:
+        """Queue several images of one stream (e.g. motion crops) together and return their ``Results`` in order."""
+        requests = [_PendingInference(frame, stream_id, predict_kwargs) for frame in frames]
+        if not requests:
+            return []
+        with self._condition:
+            self._ensure_worker_locked()
+            self._stream_last_seen[stream_id] = requests[0].enqueued_at
+            self._pending.extend(requests)
+            self._condition.notify_all()
+
+        deadline = time.monotonic() + timeout
+        for request in requests:
+            if not request.done.wait(max(0.0, deadline - time.monotonic())):
+                raise TimeoutError(f"{self._name} batch inference timed out after {timeout:.1f}s")
+            if request.error is not None:
+                raise request.error
+        return [request.result for request in requests]
+
+    def infer_regions(
+        self,
+        context: FrameContext,
+        stream_id=None,
+        max_size: int = 640,
+        preprocess: Optional[Callable[[FrameContext], object]] = None,
+        timeout: float = 30.0,
+        **predict_kwargs,
+    ) -> np.ndarray:
+        """Run the model on the context's motion crops, or on the whole frame, and return source-frame boxes.
+
+        Each input is letterboxed once (``preprocess`` may turn the letterboxed
+        view into the model input, e.g. ``lambda view: view.clahe()``). Crops
+        share one input size so they go to the model as a single batch.
+        Returns an ``(N, 6)`` detection array (see ``detection_arrays``), read
+        from each result's ``boxes.data`` in one copy.
+        """
+        views = context.region_views()
+        size = max_size if context.regions is None else region_inference_size(views, max_size)
+        inputs = [view.letterbox(size) for view in views]
+        images = [preprocess(view) if preprocess is not None else view.frame for view in inputs]
+        results = self.infer_many(images, stream_id=stream_id, timeout=timeout, imgsz=size, **predict_kwargs)
+
+        arrays = []
+        for view, result in zip(inputs, results):
+            boxes = getattr(result, "boxes", None)
+            detections = from_boxes_data(getattr(boxes, "data", None))
+            if len(detections):
+                detections[:, :4] = view.to_source_boxes(detections[:, :4])
+                arrays.append(detections)
+        return concat(*arrays)
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                "max_batch_size": self._max_batch_size,
+                "max_wait_ms": round(self._max_wait * 1000.0, 1),
+                "batches_run": self._batches_run,
+                "frames_run": self._frames_run,
+                "largest_batch": self._largest_batch,
+                "average_batch_size": round(self._frames_run / self._batches_run, 2) if self._batches_run else 0.0,
+            }
+
+    def _ensure_worker_locked(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._worker_loop, name=f"batch-{self._name}", daemon=True)
+        self._worker.start()
+
+    def _expected_batch_size_locked(self, now: float) -> int:
+        cutoff = now - self._STREAM_ACTIVITY_WINDOW_SECONDS
+        for stream_id in [stream_id for stream_id, seen in self._stream_last_seen.items() if seen < cutoff]:
+            del self._stream_last_seen[stream_id]
+        return max(1, min(self._max_batch_size, len(self._stream_last_seen)))
+
+    def _take_batch_locked(self) -> List[_PendingInference]:
+        key = self._pending[0].key
+        batch = [request for request in self._pending if request.key == key][: self._max_batch_size]
+        for request in batch:
+            self._pending.remove(request)
+        return batch
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: bool(self._pending))
+
+                oldest = self._pending[0]
+                deadline = oldest.enqueued_at + self._max_wait
+                while True:
+                    now = time.monotonic()
+                    ready = sum(1 for request in self._pending if request.key == oldest.key)
+                    if ready >= self._expected_batch_size_locked(now) or now >= deadline:
+                        break
+                    self._condition.wait(deadline - now)
+
+                batch = self._take_batch_locked()
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_PendingInference]) -> None:
+        try:
+            model = self._model_getter()
+            if model is None:
+                raise RuntimeError(f"{self._name} model is not loaded")
+
+            if self._model_lock is not None:
+                with self._model_lock:
+                    results = list(model([request.frame for request in batch], **batch[0].predict_kwargs))
+            else:
+                results = list(model([request.frame for request in batch], **batch[0].predict_kwargs))
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self._name} returned {len(results)} results for a batch of {len(batch)}")
+
+            for request, result in zip(batch, results):
+                request.result = result
+        except Exception as error:
+            logger.error("Batched %s inference failed: %s", self._name, error)
+            for request in batch:
+                request.error = error
+        finally:
+            with self._condition:
+                self._batches_run += 1
+                self._frames_run += len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
+            for request in batch:
+                request.done.set()
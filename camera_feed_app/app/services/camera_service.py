@@ -3,45 +3,92 @@ import queue
 import threading
 import tempfile
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import cv2
-import numpy as np
 
+from camera_feed_app.app.services.camera_stream import CameraStream
 from camera_feed_app.app.services.face_detection_service import FaceDetectionService
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.low_light_enhancer import LowLightEnhancer
+from camera_feed_app.app.services.detection_cache import PerceptualResultCache
+from camera_feed_app.app.services.detection_scheduler import AdaptiveIntervalScheduler
+from camera_feed_app.app.services.event_recorder import EventRecorder
+from camera_feed_app.app.services.remote_inference import RemoteInferenceClient
+from camera_feed_app.app.services.mjpeg_broadcaster import MjpegBroadcaster
+from camera_feed_app.app.services.model_preloader import ModelPreloader
+from camera_feed_app.app.services.model_registry import ModelHandle, ModelRegistry
+from camera_feed_app.app.services.motion_gate import MotionGate
 from camera_feed_app.app.services.drone_detection_service import DroneDetectionService
 from camera_feed_app.app.services.audio_drone_detection_service import AudioDroneDetectionService
 from camera_feed_app.app.services.weapon_detection_service import WeaponDetectionService
+from camera_feed_app.app.services.shared_coco_inference import SharedCocoInference
+from camera_feed_app.app.services.state_snapshot import StatePublisher, StateSnapshot, state_events
 
 
 logger = logging.getLogger(__name__)
 
 
+class _Transition:
+    """A slow state change (camera opening, model loading) running on its own thread."""
+
+    def __init__(self, state: str) -> None:
+        self.state = state
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.ok = False
+        self.message = ""
+        self.done = threading.Event()
+
+    def finish(self, state: str, ok: bool, message: str) -> None:
+        self.state = state
+        self.ok = ok
+        self.message = message
+        self.finished_at = time.monotonic()
+        self.done.set()
+
+    def is_pending(self) -> bool:
+        return not self.done.is_set()
+
+    def to_status(self) -> Dict[str, object]:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return {
+            "state": self.state,
+            "elapsed_s": round(end - self.started_at, 2),
+            "message": self.message or None,
+        }
+
+
 class CameraManager:
+    # A toggle answers with the final state if its transition finishes within this time.
+    _TOGGLE_WAIT_SECONDS = 0.5
+
     def __init__(self, app_config) -> None:
+        # Held only for short state swaps; camera opens and model loads run as _Transitions.
         self._lock = threading.RLock()
-        self._capture: Optional[cv2.VideoCapture] = None
-        self._writer: Optional[cv2.VideoWriter] = None
-        self._record_file_handle = None
-        self._record_mode: Optional[str] = None
-        self._reader_thread: Optional[threading.Thread] = None
-        self._active_camera_index: Optional[int] = None
-        self._active_camera_name: Optional[str] = None
-
-        self._is_running = False
-        self._is_recording = False
-        self._last_frame = None
-        self._previous_frame_time: Optional[float] = None
-        self._fps_samples = deque(maxlen=20)
-        self._current_fps: float = 0.0
+        self._streams: Dict[int, CameraStream] = {}
+        self._primary_camera_id: Optional[int] = None
+        self._camera_transitions: Dict[int, _Transition] = {}
+        self._detector_transitions: Dict[str, _Transition] = {}
+        self._weapon_toggle_lock = threading.Lock()
 
         self._scan_max_index = int(app_config["CAMERA_SCAN_MAX_INDEX"])
+        self._max_streams = max(1, int(app_config.get("CAMERA_MAX_STREAMS", 8)))
         self._fps = int(app_config["CAMERA_FPS"])
         self._frame_width = int(app_config["CAMERA_FRAME_WIDTH"])
         self._frame_height = int(app_config["CAMERA_FRAME_HEIGHT"])
+        self._frame_buffer_size = int(app_config.get("FRAME_BUFFER_SIZE", 3))
+        self._stream_jpeg_quality = int(app_config.get("STREAM_JPEG_QUALITY", 95))
+        self._recording_queue_size = int(app_config.get("RECORDING_QUEUE_SIZE", 64))
+        self._recording_drop_policy = str(app_config.get("RECORDING_DROP_POLICY", "drop_oldest")).strip().lower()
+        self._recording_late_ms = float(app_config.get("RECORDING_LATE_MS", 500))
+
+        # Detectors of one frame run side by side; 0 sizes the pool for every camera slot.
+        pipeline_workers = int(app_config.get("AI_PIPELINE_WORKERS", 0)) or 2 * self._max_streams
+        self._detector_pool = ThreadPoolExecutor(max_workers=pipeline_workers, thread_name_prefix="detector")
 
         self._captures_dir = Path(app_config["CAPTURES_DIR"])
         self._recordings_dir = Path(app_config["RECORDINGS_DIR"])
@@ -51,6 +98,22 @@ class CameraManager:
         self._fallback_captures_dir.mkdir(parents=True, exist_ok=True)
         self._fallback_recordings_dir.mkdir(parents=True, exist_ok=True)
 
+        # Event mode: each camera buffers its last EVENT_PRE_SECONDS, and detections flush them to a clip.
+        self._event_recorder: Optional[EventRecorder] = None
+        if bool(app_config.get("EVENT_RECORDING_ENABLED", False)):
+            self._event_recorder = EventRecorder(
+                self._recordings_dir,
+                fallback_dir=self._fallback_recordings_dir,
+                pre_seconds=float(app_config.get("EVENT_PRE_SECONDS", 5)),
+                post_seconds=float(app_config.get("EVENT_POST_SECONDS", 5)),
+                buffer_fps=float(app_config.get("EVENT_BUFFER_FPS", 10)),
+                max_buffer_mb=float(app_config.get("EVENT_BUFFER_MAX_MB", 64)),
+                max_clip_seconds=float(app_config.get("EVENT_CLIP_MAX_SECONDS", 60)),
+                triggers=str(app_config.get("EVENT_TRIGGERS", "drone,knife,gun,audio")).split(","),
+            )
+
+        adaptive_intervals = bool(app_config.get("AI_ADAPTIVE_INTERVALS", True))
+        face_interval = int(app_config.get("FACE_DETECTION_INTERVAL", 2))
         self.face_detector = FaceDetectionService(
             cascade_path=app_config.get("FACE_CASCADE_PATH"),
             scale_factor=float(app_config.get("FACE_SCALE_FACTOR", 1.1)),
@@ -59,7 +122,7 @@ class CameraManager:
                 int(app_config.get("FACE_MIN_SIZE_W", 30)),
                 int(app_config.get("FACE_MIN_SIZE_H", 30)),
             ),
-            detection_interval=int(app_config.get("FACE_DETECTION_INTERVAL", 2)),
+            detection_interval=1 if adaptive_intervals else face_interval,
         )
         self._face_model_loaded = False
         self.face_enabled = False
@@ -73,16 +136,80 @@ class CameraManager:
         if not drone_class_ids:
             drone_class_ids = [4]
 
+        # Loaded weights live in one registry: services asking for the same file share them,
+        # and models no enabled detector holds are dropped after MODEL_IDLE_EVICT_SECONDS.
+        self._model_idle_seconds = float(app_config.get("MODEL_IDLE_EVICT_SECONDS", 600))
+        self._model_registry = ModelRegistry(idle_seconds=self._model_idle_seconds)
+        # Registry handles each preload loaded (for its status) and those it still holds.
+        self._preloaded_handles: Dict[str, List[ModelHandle]] = {}
+        self._preload_pins: Dict[str, List[ModelHandle]] = {}
+
+        # The local drone fallback and knife detection both read COCO classes; when
+        # they would load the same weights (or COCO_SHARED_MODEL is set) they
+        # share one model and one forward pass per frame.
+        drone_model = str(app_config.get("DRONE_MODEL", "yolov8s.pt") or "").strip()
+        weapon_base_model = str(app_config.get("WEAPON_BASE_MODEL", "yolov8n.pt") or "").strip()
+        coco_shared_model = str(app_config.get("COCO_SHARED_MODEL", "") or "").strip()
+        drone_uses_local = not str(app_config.get("ROBOFLOW_API_KEY", "") or "").strip()
+        self._shared_coco: Optional[SharedCocoInference] = None
+        if drone_uses_local and (coco_shared_model or drone_model == weapon_base_model):
+            self._shared_coco = SharedCocoInference(
+                model_path=coco_shared_model or weapon_base_model,
+                batch_max_size=int(app_config.get("INFERENCE_BATCH_MAX_SIZE", 8)),
+                batch_max_wait_ms=float(app_config.get("INFERENCE_BATCH_MAX_WAIT_MS", 15)),
+                model_registry=self._model_registry,
+            )
+
+        # One keep-alive connection pool for every Roboflow-style backend (drone and gun).
+        self._remote_client = RemoteInferenceClient(
+            base_url=str(app_config.get("ROBOFLOW_API_URL", "https://detect.roboflow.com")),
+            max_in_flight=int(app_config.get("REMOTE_INFERENCE_MAX_IN_FLIGHT", 4)),
+            breaker_failure_threshold=int(app_config.get("REMOTE_BREAKER_FAILURE_THRESHOLD", 3)),
+            breaker_reset_timeout=float(app_config.get("REMOTE_BREAKER_RESET_MS", 2000)) / 1000.0,
+            breaker_max_reset_timeout=float(app_config.get("REMOTE_BREAKER_MAX_RESET_MS", 60000)) / 1000.0,
+        )
+        self._remote_deadline_ms = float(app_config.get("REMOTE_INFERENCE_DEADLINE_MS", 0))
+        remote_async = bool(app_config.get("REMOTE_INFERENCE_ASYNC", True))
+        self._remote_cache: Optional[PerceptualResultCache] = None
+        if bool(app_config.get("REMOTE_CACHE_ENABLED", True)):
+            self._remote_cache = PerceptualResultCache(
+                max_entries=int(app_config.get("REMOTE_CACHE_SIZE", 256)),
+                ttl=float(app_config.get("REMOTE_CACHE_TTL_MS", 10000)) / 1000.0,
+                max_distance=int(app_config.get("REMOTE_CACHE_MAX_DISTANCE", 8)),
+            )
+
+        # Trackers keep drone and weapon boxes moving between detection runs.
+        self._tracker_options: Optional[Dict[str, object]] = None
+        if bool(app_config.get("OBJECT_TRACKING_ENABLED", True)):
+            self._tracker_options = {
+                "iou_threshold": float(app_config.get("TRACKING_IOU_THRESHOLD", 0.3)),
+                "max_missed": int(app_config.get("TRACKING_MAX_MISSED", 2)),
+                "flow_width": int(app_config.get("TRACKING_FLOW_WIDTH", 320)),
+            }
+
+        drone_frame_skip = int(app_config.get("DRONE_FRAME_SKIP", 2))
         self.drone_detector = DroneDetectionService(
             model_path=app_config.get("DRONE_MODEL", "yolov8s.pt"),
             confidence_threshold=float(app_config.get("DRONE_CONFIDENCE", 0.45)),
             drone_class_ids=drone_class_ids,
-            detection_interval=int(app_config.get("DRONE_FRAME_SKIP", 2)),
+            detection_interval=1 if adaptive_intervals else drone_frame_skip,
             iou_threshold=float(app_config.get("DRONE_IOU_THRESHOLD", 0.45)),
             enable_preprocessing=bool(app_config.get("DRONE_IMAGE_ENHANCE", True)),
             roboflow_api_key=app_config.get("ROBOFLOW_API_KEY", ""),
             roboflow_model_id=app_config.get("ROBOFLOW_MODEL_ID", "drone-dataset-jiusn/1"),
             roboflow_size=int(app_config.get("ROBOFLOW_SIZE", 640)),
+            roboflow_jpeg_quality=int(app_config.get("ROBOFLOW_JPEG_QUALITY", 80)),
+            batch_max_size=int(app_config.get("INFERENCE_BATCH_MAX_SIZE", 8)),
+            batch_max_wait_ms=float(app_config.get("INFERENCE_BATCH_MAX_WAIT_MS", 15)),
+            shared_coco=self._shared_coco,
+            remote_client=self._remote_client,
+            remote_timeout=self._remote_deadline(drone_frame_skip),
+            async_remote=remote_async,
+            result_cache=self._remote_cache,
+            remote_fallback_local=bool(app_config.get("REMOTE_FALLBACK_LOCAL", False)),
+            tracker_options=self._tracker_options,
+            model_registry=self._model_registry,
+            remote_latency_callback=lambda seconds: self._record_remote_latency("drone", seconds),
         )
         self._drone_model_loaded = False
         self.drone_enabled = False
@@ -93,18 +220,31 @@ class CameraManager:
             target_sr=int(app_config.get("AUDIO_DRONE_TARGET_SR", 16000)),
             duration_seconds=int(app_config.get("AUDIO_DRONE_DURATION_SECONDS", 3)),
             n_mels=int(app_config.get("AUDIO_DRONE_N_MELS", 128)),
+            model_registry=self._model_registry,
         )
         self._audio_model_loaded = False
 
+        weapon_frame_skip = int(app_config.get("WEAPON_FRAME_SKIP", 3))
         self.weapon_detector = WeaponDetectionService(
             base_model_path=app_config.get("WEAPON_BASE_MODEL", "yolov8n.pt"),
             gun_model_path=app_config.get("WEAPON_GUN_MODEL", ""),
             confidence_threshold=float(app_config.get("WEAPON_CONFIDENCE", 0.50)),
-            detection_interval=int(app_config.get("WEAPON_FRAME_SKIP", 3)),
+            detection_interval=1 if adaptive_intervals else weapon_frame_skip,
             iou_threshold=float(app_config.get("WEAPON_IOU_THRESHOLD", 0.45)),
             gun_roboflow_api_key=app_config.get("WEAPON_GUN_ROBOFLOW_API_KEY", ""),
             gun_roboflow_model_id=app_config.get("WEAPON_GUN_ROBOFLOW_MODEL_ID", ""),
             gun_roboflow_size=int(app_config.get("WEAPON_GUN_ROBOFLOW_SIZE", 640)),
+            roboflow_jpeg_quality=int(app_config.get("ROBOFLOW_JPEG_QUALITY", 80)),
+            batch_max_size=int(app_config.get("INFERENCE_BATCH_MAX_SIZE", 8)),
+            batch_max_wait_ms=float(app_config.get("INFERENCE_BATCH_MAX_WAIT_MS", 15)),
+            shared_coco=self._shared_coco,
+            remote_client=self._remote_client,
+            remote_timeout=self._remote_deadline(weapon_frame_skip),
+            async_remote=remote_async,
+            result_cache=self._remote_cache,
+            tracker_options=self._tracker_options,
+            model_registry=self._model_registry,
+            remote_latency_callback=lambda seconds: self._record_remote_latency("weapon", seconds),
         )
         self._weapon_model_loaded = False
         gun_model_path = str(app_config.get("WEAPON_GUN_MODEL", "") or "").strip()
@@ -115,16 +255,132 @@ class CameraManager:
         self.gun_enabled = False
 
         self._low_light_enabled = bool(app_config["LOW_LIGHT_ENHANCEMENT_ENABLED"])
-        self._low_light_luma_threshold = int(app_config["LOW_LIGHT_LUMA_THRESHOLD"])
-        self._low_light_clahe_clip_limit = float(app_config["LOW_LIGHT_CLAHE_CLIP_LIMIT"])
-        self._low_light_gamma = float(app_config["LOW_LIGHT_GAMMA"])
-        self._low_light_max_gain = float(app_config["LOW_LIGHT_MAX_GAIN"])
-
-        self._clahe = cv2.createCLAHE(
-            clipLimit=self._low_light_clahe_clip_limit,
-            tileGridSize=(8, 8),
+        self._low_light = LowLightEnhancer(
+            luma_threshold=int(app_config["LOW_LIGHT_LUMA_THRESHOLD"]),
+            clahe_clip_limit=float(app_config["LOW_LIGHT_CLAHE_CLIP_LIMIT"]),
+            gamma=float(app_config["LOW_LIGHT_GAMMA"]),
+            max_gain=float(app_config["LOW_LIGHT_MAX_GAIN"]),
+            mode=str(app_config.get("LOW_LIGHT_MODE", "fast")).strip().lower(),
+            estimate_interval=int(app_config.get("LOW_LIGHT_ESTIMATE_INTERVAL", 10)),
+            hysteresis=float(app_config.get("LOW_LIGHT_HYSTERESIS", 6)),
+            clahe_scale=float(app_config.get("LOW_LIGHT_CLAHE_SCALE", 0.5)),
+        )
+
+        # With adaptive intervals the detectors run whenever they are called and
+        # the scheduler decides which of them are due on each frame.
+        self._static_intervals = {"face": face_interval, "drone": drone_frame_skip, "weapon": weapon_frame_skip}
+        self._interval_scheduler: Optional[AdaptiveIntervalScheduler] = None
+        if adaptive_intervals:
+            self._interval_scheduler = AdaptiveIntervalScheduler(
+                self._static_intervals,
+                target_fps=float(app_config.get("AI_TARGET_FPS", 15)),
+                cpu_budget=float(app_config.get("AI_CPU_BUDGET", 0.5)),
+                max_interval=int(app_config.get("AI_MAX_INTERVAL", 30)),
+                # Drone and knife read one shared COCO pass, which only pays off when they run on the same frame.
+                shared=[("drone", "weapon")] if self._shared_coco is not None else (),
+            )
+
+        self._motion_gate: Optional[MotionGate] = None
+        if bool(app_config.get("MOTION_GATING_ENABLED", True)):
+            self._motion_gate = MotionGate(
+                pixel_threshold=int(app_config.get("MOTION_PIXEL_THRESHOLD", 25)),
+                min_area_ratio=float(app_config.get("MOTION_MIN_AREA", 0.002)),
+                hold_frames=int(app_config.get("MOTION_HOLD_FRAMES", 10)),
+                keepalive=float(app_config.get("MOTION_KEEPALIVE_MS", 5000)) / 1000.0,
+                roi_enabled=bool(app_config.get("MOTION_ROI_ENABLED", True)),
+                max_regions=int(app_config.get("MOTION_ROI_MAX_REGIONS", 3)),
+                roi_padding=int(app_config.get("MOTION_ROI_PADDING", 48)),
+                full_frame_every=int(app_config.get("MOTION_ROI_FULL_FRAME_EVERY", 10)),
+                max_coverage=float(app_config.get("MOTION_ROI_MAX_COVERAGE", 0.5)),
+            )
+
+        # Models named in MODEL_PRELOAD are loaded and warmed up in the background by start_model_preload().
+        self._model_preloader = ModelPreloader()
+        warmup_enabled = bool(app_config.get("MODEL_WARMUP_ENABLED", True))
+        loaders = {
+            "face": (self._ensure_face_model_loaded, self.face_detector.warmup),
+            "drone": (self._pinned_loader("drone", self._ensure_drone_model_loaded, self.drone_detector), self.drone_detector.warmup),
+            "weapon": (self._pinned_loader("weapon", self._ensure_weapon_model_loaded, self.weapon_detector), self.weapon_detector.warmup),
+            "audio": (self._pinned_loader("audio", self._ensure_audio_model_loaded, self.audio_drone_detector), None),
+        }
+        for name in str(app_config.get("MODEL_PRELOAD", "") or "").split(","):
+            name = name.strip().lower()
+            if not name:
+                continue
+            if name not in loaders:
+                logger.warning("Unknown model in MODEL_PRELOAD: %s", name)
+                continue
+            load, warmup = loaders[name]
+            self._model_preloader.register(name, load, warmup if warmup_enabled else None)
+
+        # Status endpoints read the published snapshot instead of taking the manager lock.
+        self._state_publisher = StatePublisher(
+            self._build_state_snapshot,
+            min_interval=float(app_config.get("STATE_SNAPSHOT_MIN_INTERVAL_MS", 200)) / 1000.0,
         )
-        self._gamma_lut = self._build_gamma_lut(self._low_light_gamma)
+        self._state_events_max_rate = float(app_config.get("STATE_EVENTS_MAX_RATE", 2))
+
+    def start_model_preload(self) -> None:
+        """Begin loading and warming up the MODEL_PRELOAD models on a background thread."""
+        self._model_preloader.start()
+
+    def _remote_deadline(self, frame_skip: int) -> float:
+        """Seconds a remote detection may take before its result is no longer worth waiting for.
+
+        Unless REMOTE_INFERENCE_DEADLINE_MS is set, this is ten detection ticks
+        of the camera frame budget, kept between 0.5 s and 5 s.
+        """
+        if self._remote_deadline_ms > 0:
+            return self._remote_deadline_ms / 1000.0
+        frame_period = 1.0 / max(self._fps, 1)
+        return min(5.0, max(0.5, 10 * max(1, frame_skip) * frame_period))
+
+    def _pinned_loader(self, name: str, load, service):
+        """Preload step that loads a model and then holds it in the registry for a while.
+
+        The hold keeps the warmed-up model from being evicted before anyone
+        turns its detector on. It is released the first time the detector is
+        turned off, or after MODEL_IDLE_EVICT_SECONDS, whichever comes first;
+        from then on the model is evicted like any other once no enabled
+        detector holds it.
+        """
+
+        def load_and_pin() -> bool:
+            if not load():
+                return False
+            handles = service.model_handles()
+            pinned = self._model_idle_seconds > 0
+            if pinned:
+                for handle in handles:
+                    handle.acquire(f"preload:{name}")
+            with self._lock:
+                self._preloaded_handles[name] = handles
+                if pinned:
+                    self._preload_pins[name] = handles
+            if pinned:
+                timer = threading.Timer(self._model_idle_seconds, self._release_preload_pin, args=(name,))
+                timer.daemon = True
+                timer.start()
+            return True
+
+        return load_and_pin
+
+    def _release_preload_pin(self, name: str) -> None:
+        with self._lock:
+            handles = self._preload_pins.pop(name, [])
+        for handle in handles:
+            handle.release(f"preload:{name}")
+
+    def _preload_status(self) -> Dict[str, Dict[str, object]]:
+        """Preload states, reporting ``evicted`` for a preloaded model the registry has since dropped."""
+        status = self._model_preloader.get_status()
+        with self._lock:
+            preloaded = dict(self._preloaded_handles)
+        for name, handles in preloaded.items():
+            entry = status.get(name)
+            if entry is not None and entry["state"] == ModelPreloader.READY and not all(handle.is_loaded() for handle in handles):
+                entry["state"] = "evicted"
+        return status
 
     def _ensure_face_model_loaded(self) -> bool:
         if self._face_model_loaded:
@@ -162,62 +418,11 @@ class CameraManager:
             logger.warning("Audio drone model failed to load")
         return loaded
 
-    def _build_gamma_lut(self, gamma_value: float):
-        gamma_value = max(gamma_value, 0.1)
-        inv_gamma = 1.0 / gamma_value
-        lut = np.array(
-            [
-                ((idx / 255.0) ** inv_gamma) * 255.0
-                for idx in range(256)
-            ],
-            dtype=np.float32,
-        )
-        return np.clip(lut, 0, 255).astype(np.uint8)
-
-    def _enhance_low_light(self, frame):
+    def _enhance_low_light(self, context: FrameContext, force_estimate: bool = False) -> FrameContext:
+        """Brighten dark frames; returns ``context`` itself, with its cached views, when no change is needed."""
         if not self._low_light_enabled:
-            return frame
-
-        small = cv2.resize(frame, (160, 90), interpolation=cv2.INTER_AREA)
-        gray_small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
-        avg_luma = float(gray_small.mean())
-
-        if avg_luma >= self._low_light_luma_threshold:
-            return frame
-
-        gain = min(self._low_light_max_gain, self._low_light_luma_threshold / max(avg_luma, 1.0))
-        frame_gain = cv2.convertScaleAbs(frame, alpha=gain, beta=0)
-
-        lab = cv2.cvtColor(frame_gain, cv2.COLOR_BGR2LAB)
-        l_channel, a_channel, b_channel = cv2.split(lab)
-        l_enhanced = self._clahe.apply(l_channel)
-        enhanced_lab = cv2.merge((l_enhanced, a_channel, b_channel))
-        enhanced_bgr = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
-
-        return cv2.LUT(enhanced_bgr, self._gamma_lut)
-
-    def _reset_fps(self) -> None:
-        self._previous_frame_time = None
-        self._fps_samples.clear()
-        self._current_fps = 0.0
-
-    def _update_fps(self) -> float:
-        now = time.time()
-        if self._previous_frame_time is None:
-            self._previous_frame_time = now
-            return self._current_fps
-
-        elapsed = now - self._previous_frame_time
-        self._previous_frame_time = now
-        if elapsed <= 0:
-            return self._current_fps
-
-        instant_fps = 1.0 / elapsed
-        self._fps_samples.append(instant_fps)
-        if self._fps_samples:
-            self._current_fps = sum(self._fps_samples) / len(self._fps_samples)
-
-        return self._current_fps
+            return context
+        return self._low_light.enhance(context, stream_id=context.camera_id, force_estimate=force_estimate)
 
     def _draw_overlay_text(
         self,
@@ -241,8 +446,8 @@ class CameraManager:
         cv2.rectangle(frame, top_left, bottom_right, (40, 40, 40), 1)
         cv2.putText(frame, text, (x, y - 2), font, font_scale, text_color, thickness, cv2.LINE_AA)
 
-    def _overlay_frame_metadata(self, frame, fps_value: float):
-        camera_name = self._active_camera_name or "None"
+    def _overlay_frame_metadata(self, frame, camera_name: Optional[str], fps_value: float):
+        camera_name = camera_name or "None"
         frame_h = frame.shape[0]
         self._draw_overlay_text(frame, f"FPS: {fps_value:.2f}", (12, 34), (90, 255, 120), 0.72, 2)
         self._draw_overlay_text(
@@ -255,66 +460,166 @@ class CameraManager:
         )
         return frame
 
-    def _apply_ai_pipeline(self, frame, force: bool = False):
+    def _annotate_frame(self, frame, camera_id=None):
+        """Draw the latest known results of every enabled detector for one camera."""
         with self._lock:
             face_enabled = self.face_enabled
             drone_enabled = self.drone_enabled
             weapon_enabled = self.knife_enabled or self.gun_enabled
 
         if face_enabled:
-            frame = self.face_detector.detect_faces(frame, force=force)
+            frame = self.face_detector.annotate(frame, stream_id=camera_id)
         if drone_enabled:
-            frame = self.drone_detector.detect_drones(frame, force=force)
+            frame = self.drone_detector.annotate(frame, stream_id=camera_id)
         if weapon_enabled:
-            frame = self.weapon_detector.detect_weapons(frame, force=force)
+            frame = self.weapon_detector.annotate(frame, stream_id=camera_id)
         return frame
 
-    def process_uploaded_frame(self, frame):
-        if frame is None:
-            return None
+    def _timed_job(self, name: str, job):
+        def run(context, force, camera_id):
+            started = time.perf_counter()
+            try:
+                job(context, force, camera_id)
+            finally:
+                self._interval_scheduler.record(name, time.perf_counter() - started)
 
-        frame = self._enhance_low_light(frame)
-        frame = self._apply_ai_pipeline(frame, force=True)
+        return run
 
-        self._draw_overlay_text(frame, "Source: Uploaded Media", (12, 34), (255, 240, 170), 0.72, 2)
-        return frame
+    def _record_remote_latency(self, name: str, seconds: float) -> None:
+        if self._interval_scheduler is not None:
+            self._interval_scheduler.record(name, seconds, remote=True)
 
-    def _reader_loop(self) -> None:
-        while True:
-            with self._lock:
-                if not self._is_running or self._capture is None or not self._capture.isOpened():
-                    break
-                capture = self._capture
-                recording = self._is_recording
-                writer = self._writer
+    def _is_ai_active(self) -> bool:
+        with self._lock:
+            return self.face_enabled or self.drone_enabled or self.knife_enabled or self.gun_enabled
 
-            ok, frame = capture.read()
-            if not ok:
-                time.sleep(0.03)
+    def _run_detectors(self, frame, force: bool = False, camera_id=None) -> None:
+        """Run every enabled detector concurrently on the same clean frame.
+
+        ``frame`` is normally a FrameContext, so derived views such as the gray
+        and letterboxed images are computed once and shared by all detectors.
+        Detectors only read the frame and store their results per camera, so
+        the frame costs as long as the slowest detector rather than the sum.
+        One detector runs on the calling thread and the rest on the shared pool.
+
+        With adaptive intervals, only the detectors the scheduler has due on
+        this frame run, and each run's duration is fed back to it.
+        """
+        with self._lock:
+            face_enabled = self.face_enabled
+            drone_enabled = self.drone_enabled
+            weapon_enabled = self.knife_enabled or self.gun_enabled
+
+        jobs = []
+        if face_enabled:
+            jobs.append(("face", self.face_detector.run_inference))
+        if drone_enabled:
+            jobs.append(("drone", self.drone_detector.run_inference))
+        if weapon_enabled:
+            jobs.append(("weapon", self.weapon_detector.run_inference))
+        if not jobs:
+            return
+
+        context = FrameContext.wrap(frame, camera_id=camera_id)
+        motion = None
+        if not force and self._motion_gate is not None:
+            motion = self._motion_gate.update(context, camera_id)
+            # Static frame: every detector keeps its last results and nothing has moved to track.
+            if not motion.should_infer:
+                return
+
+        if not force and self._tracker_options is not None:
+            # Every frame past the gate moves the tracked boxes, whether or not a detector runs on it.
+            if drone_enabled:
+                self.drone_detector.track(context, camera_id)
+            if weapon_enabled:
+                self.weapon_detector.track(context, camera_id)
+
+        scheduler = self._interval_scheduler
+        if scheduler is not None:
+            if not force:
+                tick = scheduler.next_tick(camera_id)
+                due = [(name, job) for name, job in jobs if scheduler.is_due(name, tick)]
+                if not due and motion is not None and motion.reason == "keepalive":
+                    # A keepalive frame is the only re-check of a still scene, so it
+                    # runs the detector whose turn is nearest rather than none.
+                    due = [min(jobs, key=lambda item: scheduler.ticks_until_due(item[0], tick))]
+                jobs = due
+                if not jobs:
+                    return
+            jobs = [(name, self._timed_job(name, job)) for name, job in jobs]
+
+        if motion is not None:
+            # Local detectors then look only at the motion crops (None = whole frame).
+            # Full-frame runs are counted for the detectors that examine this
+            # frame, not the ones that will skip it on their own interval.
+            detectors = {"face": self.face_detector, "drone": self.drone_detector, "weapon": self.weapon_detector}
+            running = [name for name, _ in jobs if detectors[name].is_due(camera_id)]
+            context.regions = self._motion_gate.regions_for(camera_id, running, motion.regions)
+
+        futures = [self._detector_pool.submit(job, context, force, camera_id) for _, job in jobs[1:]]
+        jobs[0][1](context, force, camera_id)
+        for future in futures:
+            try:
+                future.result()
+            except Exception as error:
+                logger.error("Detector failed on camera %s: %s", camera_id, error)
+
+    def _detect_frame(self, frame, force: bool = False, camera_id=None) -> None:
+        """Inference step of a camera stream: run the detectors, then start or extend an event clip."""
+        self._run_detectors(frame, force=force, camera_id=camera_id)
+        if self._event_recorder is not None:
+            self._trigger_events(camera_id)
+
+    def _trigger_events(self, camera_id) -> None:
+        recorder = self._event_recorder
+        weapon_counts = self.weapon_detector.get_weapon_counts(stream_id=camera_id)
+        counts = {
+            "drone": self.drone_detector.get_drone_count(stream_id=camera_id),
+            "knife": weapon_counts["knives_detected"],
+            "gun": weapon_counts["guns_detected"],
+        }
+        for kind, count in counts.items():
+            if count <= 0 or not recorder.handles(kind):
                 continue
+            detector = self.drone_detector if kind == "drone" else self.weapon_detector
+            tracks = [track for track in detector.get_tracks(stream_id=camera_id) if track["label"] == kind]
+            recorder.trigger(camera_id, kind, {"count": count, "tracks": tracks})
 
-            frame = self._enhance_low_light(frame)
-            
-            frame = self._apply_ai_pipeline(frame, force=False)
+    def _apply_ai_pipeline(self, frame, force: bool = False, camera_id=None):
+        context = FrameContext.wrap(frame, camera_id=camera_id)
+        self._run_detectors(context, force=force, camera_id=camera_id)
+        return self._annotate_frame(context.frame, camera_id)
 
-            with self._lock:
-                fps_value = self._update_fps()
-                frame = self._overlay_frame_metadata(frame, fps_value)
-                self._last_frame = frame
-                if recording and writer is not None:
-                    writer.write(frame)
-                elif recording and self._record_mode == "mjpeg" and self._record_file_handle is not None:
-                    ok_enc, encoded = cv2.imencode(".jpg", frame)
-                    if ok_enc:
-                        self._record_file_handle.write(encoded.tobytes())
-                        self._record_file_handle.write(b"\n--frame--\n")
-
-            time.sleep(max(1 / max(self._fps, 1), 0.01))
+    def process_uploaded_frame(self, frame):
+        if frame is None:
+            return None
+
+        with self._lock:
+            camera_id = self._primary_camera_id
+
+        # Uploaded media shares the primary camera's detector state, as it did
+        # when only one camera could be open.
+        # Uploads are measured on their own rather than reusing a camera's luminance estimate.
+        context = self._enhance_low_light(FrameContext(frame), force_estimate=True)
+        frame = self._apply_ai_pipeline(context, force=True, camera_id=camera_id)
+
+        self._draw_overlay_text(frame, "Source: Uploaded Media", (12, 34), (255, 240, 170), 0.72, 2)
+        return frame
 
     def get_available_cameras(self) -> List[Dict[str, object]]:
         """Fast camera detection with timeout protection."""
+        with self._lock:
+            open_indexes = set(self._streams)
+
         available = []
         for index in range(0, self._scan_max_index + 1):
+            if index in open_indexes:
+                # Devices are opened exclusively on some backends, so probing an
+                # open camera would fail even though it is streaming.
+                available.append({"index": index, "name": f"Camera {index}"})
+                continue
+
             try:
                 # Use a thread with timeout to prevent hanging
                 result_queue = queue.Queue()
@@ -352,308 +657,446 @@ class CameraManager:
         logger.info(f"Camera scan complete: found {len(available)} camera(s)")
         return available
 
-    def open_camera(self, index: int) -> Tuple[bool, str]:
+    def _open_capture(self, index: int) -> Tuple[bool, object]:
+        """Open and validate a camera device; returns (True, capture) or (False, message)."""
+        result_queue = queue.Queue()
+        
+        def open_and_validate():
+            try:
+                temp_cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+                if temp_cap is None or not temp_cap.isOpened():
+                    if temp_cap:
+                        temp_cap.release()
+                    result_queue.put((False, "Camera failed to open"))
+                    return
+                
+                # Configure camera
+                temp_cap.set(cv2.CAP_PROP_FRAME_WIDTH, self._frame_width)
+                temp_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self._frame_height)
+                temp_cap.set(cv2.CAP_PROP_FPS, self._fps)
+                temp_cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)
+                temp_cap.set(cv2.CAP_PROP_AUTO_WB, 1)
+                temp_cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
+                
+                # Validate can read frames
+                success, frame = temp_cap.read()
+                if not success or frame is None:
+                    temp_cap.release()
+                    result_queue.put((False, "Camera cannot read frames"))
+                    return
+                
+                result_queue.put((True, temp_cap))
+            except Exception as e:
+                result_queue.put((False, str(e)))
+        
+        open_thread = threading.Thread(target=open_and_validate, daemon=True)
+        open_thread.start()
+        open_thread.join(timeout=3.0)  # 3 second timeout to open and validate
+        
+        try:
+            success, result = result_queue.get_nowait()
+        except queue.Empty:
+            logger.warning(f"Camera {index} open timed out")
+            return False, f"Camera {index} timed out"
+
+        if not success:
+            logger.warning(f"Camera {index} validation failed: {result}")
+            return False, f"Camera {index} not available: {result}"
+        return True, result
+
+    def _start_stream(self, index: int, capture) -> CameraStream:
+        stream = CameraStream(
+            camera_id=index,
+            capture=capture,
+            enhance=self._enhance_low_light,
+            annotate=self._annotate_frame,
+            overlay=self._overlay_frame_metadata,
+            detect=self._detect_frame,
+            is_ai_active=self._is_ai_active,
+            fps=self._fps,
+            frame_width=self._frame_width,
+            frame_height=self._frame_height,
+            frame_buffer_size=self._frame_buffer_size,
+            jpeg_quality=self._stream_jpeg_quality,
+            recordings_dir=self._recordings_dir,
+            fallback_recordings_dir=self._fallback_recordings_dir,
+            recording_queue_size=self._recording_queue_size,
+            recording_drop_policy=self._recording_drop_policy,
+            recording_late_ms=self._recording_late_ms,
+            event_recorder=self._event_recorder,
+            on_processed=self._state_publisher.publish,
+        )
+        self._streams[index] = stream
+        # Results from uploaded media processed while no camera was open belong to no stream.
+        self._discard_detector_state(None)
+        stream.start()
+        logger.info("Camera opened index=%s", index)
+        return stream
+
+    def _discard_detector_state(self, camera_id) -> None:
+        self._low_light.discard_stream(camera_id)
+        if self._motion_gate is not None:
+            self._motion_gate.discard_stream(camera_id)
+        if self._interval_scheduler is not None:
+            self._interval_scheduler.discard_stream(camera_id)
+        self.face_detector.discard_stream(camera_id)
+        self.drone_detector.discard_stream(camera_id)
+        self.weapon_detector.discard_stream(camera_id)
+
+    def _close_stream(self, index: int) -> None:
+        stream = self._streams.pop(index, None)
+        if stream is not None:
+            stream.stop()
+        if self._event_recorder is not None:
+            self._event_recorder.drop_camera(index)
+        self._discard_detector_state(index)
+        if self._primary_camera_id == index:
+            self._primary_camera_id = next(iter(self._streams), None)
+
+    def _get_stream(self, camera_id: Optional[int] = None) -> Optional[CameraStream]:
         with self._lock:
-            if self._active_camera_index == index and self._capture is not None and self._capture.isOpened():
-                return True, f"Camera {index} already active"
+            if camera_id is None:
+                camera_id = self._primary_camera_id
+            if camera_id is None:
+                return None
+            return self._streams.get(camera_id)
 
-            # Always release current camera before opening a new one
-            if self._capture is not None:
-                logger.info(f"Switching from camera {self._active_camera_index} to {index}")
-            self.release_camera()
+    def open_camera(self, index: int, wait: bool = True) -> Tuple[bool, str]:
+        """Make ``index`` the only active camera (single-camera switch used by the dashboard).
 
-            # Open camera with timeout validation
-            result_queue = queue.Queue()
-            
-            def open_and_validate():
-                try:
-                    temp_cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-                    if temp_cap is None or not temp_cap.isOpened():
-                        if temp_cap:
-                            temp_cap.release()
-                        result_queue.put((False, "Camera failed to open"))
-                        return
-                    
-                    # Configure camera
-                    temp_cap.set(cv2.CAP_PROP_FRAME_WIDTH, self._frame_width)
-                    temp_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self._frame_height)
-                    temp_cap.set(cv2.CAP_PROP_FPS, self._fps)
-                    temp_cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)
-                    temp_cap.set(cv2.CAP_PROP_AUTO_WB, 1)
-                    temp_cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
-                    
-                    # Validate can read frames
-                    success, frame = temp_cap.read()
-                    if not success or frame is None:
-                        temp_cap.release()
-                        result_queue.put((False, "Camera cannot read frames"))
-                        return
-                    
-                    result_queue.put((True, temp_cap))
-                except Exception as e:
-                    result_queue.put((False, str(e)))
-            
-            open_thread = threading.Thread(target=open_and_validate, daemon=True)
-            open_thread.start()
-            open_thread.join(timeout=3.0)  # 3 second timeout to open and validate
-            
-            try:
-                success, result = result_queue.get_nowait()
-                if not success:
-                    logger.warning(f"Camera {index} validation failed: {result}")
-                    return False, f"Camera {index} not available: {result}"
-                capture = result
-            except queue.Empty:
-                logger.warning(f"Camera {index} open timed out")
-                return False, f"Camera {index} timed out"
-
-            self._capture = capture
-            self._active_camera_index = index
-            self._active_camera_name = f"Camera {index}"
-            self._is_running = True
-            self._is_recording = False
-            self._last_frame = None
-            self._reset_fps()
-
-            self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
-            self._reader_thread.start()
-            logger.info("Camera opened index=%s", index)
-            return True, f"Camera {index} selected"
+        The device is opened on a background thread while the camera reports
+        ``opening``; with ``wait`` the caller blocks for the outcome without
+        holding the manager lock.
+        """
+        with self._lock:
+            stream = self._streams.get(index)
+            if stream is not None and stream.is_running():
+                for other_index in [other for other in self._streams if other != index]:
+                    self._close_stream(other_index)
+                self._primary_camera_id = index
+                switched = True
+            else:
+                switched = False
+                transition = self._camera_transitions.get(index)
+                if transition is None or not transition.is_pending():
+                    # Always release current cameras before opening a new one
+                    if self._streams:
+                        logger.info(f"Switching from camera {self._primary_camera_id} to {index}")
+                    self.release_camera()
+                    transition = self._begin_camera_open(index, make_primary=True)
+        self._publish_state()
+        if switched:
+            return True, f"Camera {index} already active"
+        return self._camera_open_result(index, transition, wait)
+
+    def add_camera(self, index: int, wait: bool = True) -> Tuple[bool, str]:
+        """Open ``index`` alongside the cameras that are already running."""
+        with self._lock:
+            stream = self._streams.get(index)
+            if stream is not None and stream.is_running():
+                return True, f"Camera {index} already active"
+
+            transition = self._camera_transitions.get(index)
+            if transition is None or not transition.is_pending():
+                if stream is not None:
+                    self._close_stream(index)
+                opening = sum(1 for pending in self._camera_transitions.values() if pending.is_pending())
+                if len(self._streams) + opening >= self._max_streams:
+                    return False, f"Camera limit reached ({self._max_streams})"
+                transition = self._begin_camera_open(index, make_primary=False)
+        self._publish_state()
+        return self._camera_open_result(index, transition, wait)
+
+    def _begin_camera_open(self, index: int, make_primary: bool) -> _Transition:
+        transition = _Transition("opening")
+        self._camera_transitions[index] = transition
+        threading.Thread(
+            target=self._open_camera_worker,
+            args=(index, transition, make_primary),
+            name=f"camera-open-{index}",
+            daemon=True,
+        ).start()
+        return transition
+
+    def _open_camera_worker(self, index: int, transition: _Transition, make_primary: bool) -> None:
+        ok, result = self._open_capture(index)
+        self._finish_camera_open(index, transition, make_primary, ok, result)
+        self._publish_state()
+
+    def _finish_camera_open(self, index: int, transition: _Transition, make_primary: bool, ok: bool, result) -> None:
+        with self._lock:
+            if self._camera_transitions.get(index) is not transition:
+                # Closed or switched away while the device was opening.
+                if ok:
+                    result.release()
+                transition.finish("cancelled", False, f"Camera {index} open cancelled")
+                return
+            if not ok:
+                transition.finish("failed", False, result)
+                return
+
+            self._start_stream(index, result)
+            if make_primary or self._primary_camera_id is None:
+                self._primary_camera_id = index
+            del self._camera_transitions[index]
+            transition.finish("running", True, f"Camera {index} selected" if make_primary else f"Camera {index} opened")
+
+    def _camera_open_result(self, index: int, transition: _Transition, wait: bool) -> Tuple[bool, str]:
+        if wait:
+            transition.done.wait()
+        if transition.is_pending():
+            return True, f"Camera {index} opening"
+        return transition.ok, transition.message
+
+    def close_camera(self, index: int) -> Tuple[bool, str]:
+        """Stop a single camera and leave the others running."""
+        with self._lock:
+            self._camera_transitions.pop(index, None)
+            if index not in self._streams:
+                return True, f"Camera {index} already stopped"
+
+            self._close_stream(index)
+            if not self._streams:
+                self._reset_detection_toggles()
+        self._publish_state()
+        return True, f"Camera {index} stopped"
+
+    def _reset_detection_toggles(self) -> None:
+        if self.face_enabled:
+            self.face_enabled = self.face_detector.toggle_detection()
+        if self.drone_enabled:
+            self.drone_enabled = self.drone_detector.toggle_detection()
+        if self.knife_enabled:
+            self.knife_enabled = self.weapon_detector.toggle_knife_detection()
+        if self.gun_enabled:
+            self.gun_enabled = self.weapon_detector.toggle_gun_detection()
 
     def release_camera(self) -> None:
         with self._lock:
-            if self._writer is not None:
-                self._writer.release()
-                self._writer = None
-            if self._record_file_handle is not None:
-                self._record_file_handle.close()
-                self._record_file_handle = None
-            self._record_mode = None
-
-            if self._capture is not None:
-                self._capture.release()
-                self._capture = None
-
-            self._is_recording = False
-            self._is_running = False
-            self._last_frame = None
-            self._active_camera_index = None
-            self._active_camera_name = None
-            self._reader_thread = None
+            # Cameras still opening are dropped by their worker once the device answers.
+            self._camera_transitions.clear()
+            for index in list(self._streams):
+                self._close_stream(index)
+            self._primary_camera_id = None
             # Reset detection states
-            if self.face_enabled:
-                self.face_enabled = self.face_detector.toggle_detection()
-            if self.drone_enabled:
-                self.drone_enabled = self.drone_detector.toggle_detection()
-            if self.knife_enabled:
-                self.knife_enabled = self.weapon_detector.toggle_knife_detection()
-            if self.gun_enabled:
-                self.gun_enabled = self.weapon_detector.toggle_gun_detection()
-            self._reset_fps()
+            self._reset_detection_toggles()
             logger.info("Camera resources released")
 
-    def get_frame(self):
-        with self._lock:
-            if self._capture is None or not self._capture.isOpened() or not self._is_running:
-                return None
-            if self._last_frame is not None:
-                return self._last_frame.copy()
-
-        with self._lock:
-            if self._capture is None or not self._capture.isOpened() or not self._is_running:
-                return None
-            ok, frame = self._capture.read()
-            if not ok:
-                return None
-            frame = self._enhance_low_light(frame)
-            
-            frame = self._apply_ai_pipeline(frame, force=False)
-            
-            fps_value = self._update_fps()
-            frame = self._overlay_frame_metadata(frame, fps_value)
-            self._last_frame = frame
-            if self._is_recording and self._writer is not None:
-                self._writer.write(frame)
-            return frame.copy()
-
-    def get_encoded_frame(self) -> Optional[bytes]:
-        frame = self.get_frame()
-        if frame is None:
+    def get_frame(self, camera_id: Optional[int] = None):
+        stream = self._get_stream(camera_id)
+        if stream is None:
             return None
+        return stream.get_frame()
 
-        ok, encoded = cv2.imencode(".jpg", frame)
-        if not ok:
+    def get_encoded_frame(self, camera_id: Optional[int] = None) -> Optional[bytes]:
+        stream = self._get_stream(camera_id)
+        if stream is None:
             return None
+        return stream.get_encoded_frame()
 
-        return encoded.tobytes()
-
-    def capture_image(self) -> Tuple[bool, str, Optional[str]]:
-        with self._lock:
-            frame = self._last_frame
-            if frame is None:
-                frame = self.get_frame()
-
-            if frame is None:
-                return False, "No frame available to capture", None
+    def get_broadcaster(self, camera_id: Optional[int] = None) -> Optional[MjpegBroadcaster]:
+        """Broadcaster for ``camera_id``, or for the primary camera when it is None."""
+        stream = self._get_stream(camera_id)
+        if stream is None:
+            return None
+        return stream.get_broadcaster()
 
-            filename = f"capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-            ok, encoded = cv2.imencode(".jpg", frame)
-            if not ok:
-                return False, "Failed to encode image", None
+    def capture_image(self, camera_id: Optional[int] = None) -> Tuple[bool, str, Optional[str]]:
+        stream = self._get_stream(camera_id)
+        frame = stream.get_frame() if stream is not None else None
+        if frame is None:
+            return False, "No frame available to capture", None
 
-            self._captures_dir.mkdir(parents=True, exist_ok=True)
-            path = self._captures_dir / filename
+        filename = f"capture_cam{stream.camera_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
+        ok, encoded = cv2.imencode(".jpg", frame)
+        if not ok:
+            return False, "Failed to encode image", None
+
+        self._captures_dir.mkdir(parents=True, exist_ok=True)
+        path = self._captures_dir / filename
+        try:
+            path.write_bytes(encoded.tobytes())
+        except OSError:
+            fallback_path = self._fallback_captures_dir / filename
             try:
-                path.write_bytes(encoded.tobytes())
+                fallback_path.write_bytes(encoded.tobytes())
+                logger.warning("Primary capture path failed, saved to fallback: %s", fallback_path)
+                return True, "Image captured (fallback path)", filename
             except OSError:
-                fallback_path = self._fallback_captures_dir / filename
-                try:
-                    fallback_path.write_bytes(encoded.tobytes())
-                    logger.warning("Primary capture path failed, saved to fallback: %s", fallback_path)
-                    return True, "Image captured (fallback path)", filename
-                except OSError:
-                    return False, "Failed to save image", None
-
-            logger.info("Image captured: %s", path)
-            return True, "Image captured", filename
-
-    def start_recording(self) -> Tuple[bool, str, Optional[str]]:
-        with self._lock:
-            if self._is_recording:
-                return True, "Recording already in progress", None
-
-            if self._capture is None or not self._capture.isOpened() or not self._is_running:
-                return False, "Start camera before recording", None
-
-            width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or self._frame_width
-            height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self._frame_height
-
-            self._recordings_dir.mkdir(parents=True, exist_ok=True)
-            base_name = f"recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            writer = None
-            filename = None
-            selected_recording_path = None
-
-            codec_candidates = [
-                ("XVID", ".avi"),
-                ("MJPG", ".avi"),
-                ("mp4v", ".mp4"),
-            ]
-
-            for codec, extension in codec_candidates:
-                candidate_filename = f"{base_name}{extension}"
-                candidate_path = self._recordings_dir / candidate_filename
-                fourcc = cv2.VideoWriter_fourcc(*codec)
-                candidate_writer = cv2.VideoWriter(
-                    str(candidate_path),
-                    fourcc,
-                    float(max(self._fps, 1)),
-                    (width, height),
-                )
-                if candidate_writer.isOpened():
-                    writer = candidate_writer
-                    filename = candidate_filename
-                    self._record_mode = "video"
-                    selected_recording_path = candidate_path
-                    break
-                candidate_writer.release()
-
-            if writer is None or filename is None:
-                fallback_filename = f"{base_name}.mjpeg"
-                fallback_path = self._fallback_recordings_dir / fallback_filename
-                try:
-                    self._record_file_handle = open(fallback_path, "wb")
-                    self._record_mode = "mjpeg"
-                    self._writer = None
-                    self._is_recording = True
-                    logger.warning("OpenCV codecs unavailable, recording MJPEG fallback: %s", fallback_path)
-                    return True, "Recording started (mjpeg fallback)", fallback_filename
-                except OSError:
-                    return False, "Failed to start recording", None
-
-            self._writer = writer
-            self._is_recording = True
-            logger.info("Recording started: %s", selected_recording_path)
-            return True, "Recording started", filename
-
-    def stop_recording(self) -> Tuple[bool, str]:
-        with self._lock:
-            if not self._is_recording:
-                return True, "Recording is not active"
-
-            self._is_recording = False
-            if self._writer is not None:
-                self._writer.release()
-                self._writer = None
-            if self._record_file_handle is not None:
-                self._record_file_handle.close()
-                self._record_file_handle = None
-            self._record_mode = None
-
-            logger.info("Recording stopped")
-            return True, "Recording stopped"
+                return False, "Failed to save image", None
+
+        logger.info("Image captured: %s", path)
+        return True, "Image captured", filename
+
+    def start_recording(self, camera_id: Optional[int] = None) -> Tuple[bool, str, Optional[str]]:
+        stream = self._get_stream(camera_id)
+        if stream is None:
+            return False, "Start camera before recording", None
+        result = stream.start_recording()
+        self._publish_state()
+        return result
+
+    def stop_recording(self, camera_id: Optional[int] = None) -> Tuple[bool, str]:
+        stream = self._get_stream(camera_id)
+        if stream is None:
+            return True, "Recording is not active"
+        result = stream.stop_recording()
+        self._publish_state()
+        return result
 
     def stop_camera(self) -> Tuple[bool, str]:
         with self._lock:
-            if self._capture is None:
+            if not self._streams:
                 return True, "Camera already stopped"
 
             self.release_camera()
-            return True, "Camera stopped"
+        self._publish_state()
+        return True, "Camera stopped"
+
+    def _toggle_detector(
+        self, toggle: str, model: str, flip: Callable[[], bool], is_enabled: Callable[[], bool]
+    ) -> Tuple[bool, str]:
+        """Run ``flip`` (which may load ``model``) as a background transition; return the enabled and model state.
+
+        The manager lock is held only to register the transition and read the
+        result. A transition that outlasts _TOGGLE_WAIT_SECONDS keeps running,
+        reported as ``loading`` under ``detector_transitions`` in the status,
+        and the detector turns on when it finishes. Toggling the same
+        ``toggle`` again meanwhile is refused with the state ``busy``.
+        """
+        with self._lock:
+            transition = self._detector_transitions.get(toggle)
+            if transition is not None and transition.is_pending():
+                return is_enabled(), "busy"
+            transition = _Transition("loading")
+            self._detector_transitions[toggle] = transition
 
-    def toggle_face_detection(self) -> bool:
-        """Toggle face detection on/off."""
+        def run() -> None:
+            try:
+                enabled = flip()
+                if self._model_loaded(model):
+                    transition.finish("ready", True, "enabled" if enabled else "disabled")
+                else:
+                    transition.finish("failed", False, f"{model} model failed to load")
+            except Exception as error:
+                logger.error("Toggling %s detection failed: %s", model, error)
+                transition.finish("failed", False, str(error))
+            self._publish_state()
+
+        threading.Thread(target=run, name=f"toggle-{toggle}", daemon=True).start()
+        transition.done.wait(self._TOGGLE_WAIT_SECONDS)
         with self._lock:
-            if not self._ensure_face_model_loaded():
-                self.face_enabled = False
-                return False
-            self.face_enabled = self.face_detector.toggle_detection()
-            return self.face_enabled
+            enabled, state = is_enabled(), transition.state
+        self._publish_state()
+        return enabled, state
+
+    def _model_loaded(self, model: str) -> bool:
+        return {
+            "face": self._face_model_loaded,
+            "drone": self._drone_model_loaded,
+            "weapon": self._weapon_model_loaded,
+        }[model]
+
+    def _detector_transition_status(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {model: transition.to_status() for model, transition in self._detector_transitions.items()}
 
-    def toggle_drone_detection(self) -> bool:
-        """Toggle drone detection on/off."""
+    def get_model_state(self, *toggles: str) -> str:
+        """``loading`` while any of ``toggles`` is still in progress, ``failed`` if its model did not load, else ``ready``."""
         with self._lock:
+            states = [self._detector_transitions[toggle].state for toggle in toggles if toggle in self._detector_transitions]
+        for state in ("loading", "failed"):
+            if state in states:
+                return state
+        return "ready"
+
+    def toggle_face_detection(self) -> Tuple[bool, str]:
+        """Toggle face detection on/off."""
+
+        def flip() -> bool:
+            # A model still preloading is waited for here, outside the manager lock.
+            self._model_preloader.wait("face")
+            loaded = self._ensure_face_model_loaded()
+            with self._lock:
+                self.face_enabled = self.face_detector.toggle_detection() if loaded else False
+                return self.face_enabled
+
+        return self._toggle_detector("face", "face", flip, lambda: self.face_enabled)
+
+    def toggle_drone_detection(self) -> Tuple[bool, str]:
+        """Toggle drone detection on/off."""
+
+        def flip() -> bool:
+            self._model_preloader.wait("drone")
             if not self._ensure_drone_model_loaded():
-                self.drone_enabled = False
+                with self._lock:
+                    self.drone_enabled = False
                 return False
-            self.drone_enabled = self.drone_detector.toggle_detection()
-            return self.drone_enabled
+            # The detector may reload an evicted model here, so the manager lock is not held.
+            enabled = self.drone_detector.toggle_detection()
+            with self._lock:
+                self.drone_enabled = enabled
+            if not enabled:
+                self._release_preload_pin("drone")
+            return enabled
 
-    def toggle_knife_detection(self) -> bool:
-        """Toggle knife detection on/off."""
-        with self._lock:
+        return self._toggle_detector("drone", "drone", flip, lambda: self.drone_enabled)
+
+    def _toggle_weapon(self, toggle: Callable[[], bool], knife: bool, gun: bool) -> bool:
+        # Knife, gun and the combined toggle share one model: the first flip loads it and the others queue behind.
+        with self._weapon_toggle_lock:
+            self._model_preloader.wait("weapon")
             if not self._ensure_weapon_model_loaded():
-                self.knife_enabled = False
+                with self._lock:
+                    if knife:
+                        self.knife_enabled = False
+                    if gun:
+                        self.gun_enabled = False
                 return False
-            self.knife_enabled = self.weapon_detector.toggle_knife_detection()
-            return self.knife_enabled
+            enabled = toggle()
+            with self._lock:
+                if knife:
+                    self.knife_enabled = enabled
+                if gun:
+                    self.gun_enabled = enabled
+                weapon_enabled = self.knife_enabled or self.gun_enabled
+            if not weapon_enabled:
+                self._release_preload_pin("weapon")
+            return enabled
+
+    def toggle_knife_detection(self) -> Tuple[bool, str]:
+        """Toggle knife detection on/off."""
+        return self._toggle_detector(
+            "knife",
+            "weapon",
+            lambda: self._toggle_weapon(self.weapon_detector.toggle_knife_detection, knife=True, gun=False),
+            lambda: self.knife_enabled,
+        )
 
-    def toggle_gun_detection(self) -> bool:
+    def toggle_gun_detection(self) -> Tuple[bool, str]:
         """Toggle gun detection on/off."""
-        with self._lock:
-            if not self._ensure_weapon_model_loaded():
-                self.gun_enabled = False
-                return False
-            self.gun_enabled = self.weapon_detector.toggle_gun_detection()
-            return self.gun_enabled
+        return self._toggle_detector(
+            "gun",
+            "weapon",
+            lambda: self._toggle_weapon(self.weapon_detector.toggle_gun_detection, knife=False, gun=True),
+            lambda: self.gun_enabled,
+        )
 
-    def toggle_weapon_detection(self) -> bool:
+    def toggle_weapon_detection(self) -> Tuple[bool, str]:
         """Backward-compatible combined toggle."""
-        with self._lock:
-            if not self._ensure_weapon_model_loaded():
-                self.knife_enabled = False
-                self.gun_enabled = False
-                return False
-            enabled = self.weapon_detector.toggle_detection()
-            self.knife_enabled = enabled
-            self.gun_enabled = enabled
-            return enabled
+        return self._toggle_detector(
+            "weapon",
+            "weapon",
+            lambda: self._toggle_weapon(self.weapon_detector.toggle_detection, knife=True, gun=True),
+            lambda: self.knife_enabled or self.gun_enabled,
+        )
 
     def get_face_detection_status(self) -> Dict[str, object]:
         """Get face detection status."""
         with self._lock:
             return {
                 "enabled": self.face_enabled,
+                "model_state": self.get_model_state("face"),
                 "faces_detected": self.face_detector.get_face_count(),
             }
 
@@ -662,6 +1105,7 @@ class CameraManager:
         with self._lock:
             return {
                 "enabled": self.drone_enabled,
+                "model_state": self.get_model_state("drone"),
                 "drones_detected": self.drone_detector.get_drone_count(),
             }
 
@@ -675,6 +1119,7 @@ class CameraManager:
                 "knife_enabled": self.knife_enabled,
                 "gun_enabled": self.gun_enabled,
                 "weapon_enabled": self.knife_enabled or self.gun_enabled,
+                "model_state": self.get_model_state("knife", "gun", "weapon"),
                 "gun_available": gun_available,
                 "gun_backend": gun_backend,
                 "knives_detected": counts["knives_detected"],
@@ -683,9 +1128,16 @@ class CameraManager:
             }
 
     def analyze_audio_file(self, file_path: str) -> Dict[str, object]:
-        with self._lock:
-            self._ensure_audio_model_loaded()
-            return self.audio_drone_detector.detect_file(file_path)
+        # Loading TensorFlow and running the model can take seconds, so neither holds the manager lock.
+        self._model_preloader.wait("audio")
+        self._ensure_audio_model_loaded()
+        result = self.audio_drone_detector.detect_file(file_path)
+        if self._event_recorder is not None and result.get("success") and result.get("detected"):
+            # Audio is not tied to a camera, so every open camera saves a clip.
+            self._event_recorder.trigger_all(
+                "audio", {"prediction": result.get("prediction"), "confidence": result.get("confidence")}
+            )
+        return result
 
     def get_audio_drone_status(self) -> Dict[str, object]:
         with self._lock:
@@ -719,6 +1171,8 @@ class CameraManager:
                 "weapon_enabled": self.knife_enabled or self.gun_enabled,
                 "gun_available": gun_available,
                 "gun_backend": gun_backend,
+                "gun_backend_reachable": self.weapon_detector.is_gun_backend_reachable() if self._weapon_model_loaded else gun_available,
+                "drone_backend": self.drone_detector.get_active_backend(),
                 "faces_detected": self.face_detector.get_face_count(),
                 "drones_detected": self.drone_detector.get_drone_count(),
                 "knives_detected": weapon_counts["knives_detected"],
@@ -727,8 +1181,69 @@ class CameraManager:
                 "audio_drone_available": audio_status["available"],
                 "audio_drone_last_result": audio_status["last_result"],
                 "multi_ai_active": active_count >= 2,
+                "models": self._preload_status(),
+                "detector_transitions": self._detector_transition_status(),
             }
 
+    def get_ai_diagnostics(self) -> Dict[str, object]:
+        """Per-frame pipeline counters; kept out of the AI status snapshot because they change on every frame."""
+        with self._lock:
+            return {
+                "batch_inference": {
+                    "drone": self.drone_detector.get_batch_stats(),
+                    **self.weapon_detector.get_batch_stats(),
+                },
+                "shared_coco": self._shared_coco.get_stats() if self._shared_coco is not None else None,
+                "motion_gate": self._motion_gate.get_stats() if self._motion_gate is not None else None,
+                "detection_intervals": self._get_interval_stats(),
+                "model_registry": self._model_registry.get_stats(),
+                "event_recording": self._event_recorder.get_stats() if self._event_recorder is not None else None,
+                "tracking": {
+                    "enabled": self._tracker_options is not None,
+                    "drone": self.drone_detector.get_tracks(),
+                    "weapon": self.weapon_detector.get_tracks(),
+                },
+                "remote_inference": {
+                    **self._remote_client.get_stats(),
+                    "async_drone": self.drone_detector.get_async_stats(),
+                    "async_gun": self.weapon_detector.get_async_stats(),
+                    "result_cache": self._remote_cache.get_stats() if self._remote_cache is not None else None,
+                },
+            }
+
+    def _get_interval_stats(self) -> Dict[str, object]:
+        if self._interval_scheduler is not None:
+            return {"adaptive": True, **self._interval_scheduler.get_stats()}
+        return {
+            "adaptive": False,
+            "detectors": {name: {"interval": interval} for name, interval in self._static_intervals.items()},
+        }
+
+    def get_camera_status(self, camera_id: int, diagnostics: bool = True) -> Optional[Dict[str, object]]:
+        """Stream metrics and detection counts for a single open camera, plus motion gate and tracks if ``diagnostics``."""
+        stream = self._get_stream(camera_id)
+        if stream is None:
+            return None
+
+        status = stream.get_status()
+        weapon_counts = self.weapon_detector.get_weapon_counts(stream_id=camera_id)
+        status.update(
+            {
+                "faces_detected": self.face_detector.get_face_count(stream_id=camera_id),
+                "drones_detected": self.drone_detector.get_drone_count(stream_id=camera_id),
+                "knives_detected": weapon_counts["knives_detected"],
+                "guns_detected": weapon_counts["guns_detected"],
+                "total_weapons": weapon_counts["total_weapons"],
+            }
+        )
+        if diagnostics:
+            status["motion_gate"] = self._motion_gate.get_stats(camera_id) if self._motion_gate is not None else None
+            status["tracks"] = {
+                "drone": self.drone_detector.get_tracks(stream_id=camera_id),
+                "weapon": self.weapon_detector.get_tracks(stream_id=camera_id),
+            }
+        return status
+
     def get_state(self) -> Dict[str, object]:
         with self._lock:
             weapon_counts = self.weapon_detector.get_weapon_counts()
@@ -736,12 +1251,19 @@ class CameraManager:
             active_count = sum([self.face_enabled, self.drone_enabled, self.knife_enabled, self.gun_enabled])
             gun_available = self.weapon_detector.is_gun_available() if self._weapon_model_loaded else self._gun_configured
             gun_backend = self.weapon_detector.get_gun_backend() if self._weapon_model_loaded else ("configured" if self._gun_configured else "none")
+            cameras = [self.get_camera_status(camera_id, diagnostics=False) for camera_id in list(self._streams)]
+            primary = next((camera for camera in cameras if camera["camera_id"] == self._primary_camera_id), None)
             return {
-                "is_running": self._is_running,
-                "is_recording": self._is_recording,
-                "active_camera_index": self._active_camera_index,
-                "active_camera_name": self._active_camera_name,
-                "fps": round(self._current_fps, 2),
+                "is_running": bool(primary and primary["is_running"]),
+                "is_recording": bool(primary and primary["is_recording"]),
+                "active_camera_index": self._primary_camera_id,
+                "active_camera_name": primary["camera_name"] if primary else None,
+                "fps": primary["fps"] if primary else 0.0,
+                "inference_fps": primary["inference_fps"] if primary else 0.0,
+                "inference_dropped_frames": primary["inference_dropped_frames"] if primary else 0,
+                "stream_clients": primary["stream_clients"] if primary else 0,
+                "cameras": cameras,
+                "camera_transitions": {index: transition.to_status() for index, transition in self._camera_transitions.items()},
                 "face_enabled": self.face_enabled,
                 "drone_enabled": self.drone_enabled,
                 "knife_enabled": self.knife_enabled,
@@ -759,9 +1281,36 @@ class CameraManager:
                 "multi_ai_active": active_count >= 2,
             }
 
-    def get_fps(self) -> float:
+    def _build_state_snapshot(self):
         with self._lock:
-            return round(self._current_fps, 2)
+            streams = list(self._streams.items())
+        fps = {camera_id: stream.get_fps() for camera_id, stream in streams}
+        fps[None] = self.get_fps()
+        return self.get_state(), self.get_ai_status(), fps
+
+    def _publish_state(self) -> None:
+        """Publish the state right after a change; must be called without holding the manager lock."""
+        self._state_publisher.publish(force=True)
+
+    def get_state_snapshot(self) -> StateSnapshot:
+        """The latest published state; reading it takes no lock."""
+        return self._state_publisher.current()
+
+    def iter_state_events(self):
+        """Server-Sent Events stream of state changes for one ``/api/events`` client."""
+        return state_events(self._state_publisher, max_rate=self._state_events_max_rate)
+
+    def get_event_clips(self, limit: int = 20) -> List[Dict[str, object]]:
+        """Metadata of the most recent event clips, newest first."""
+        if self._event_recorder is None:
+            return []
+        return self._event_recorder.get_recent_clips(limit)
+
+    def get_fps(self, camera_id: Optional[int] = None) -> float:
+        stream = self._get_stream(camera_id)
+        if stream is None:
+            return 0.0
+        return stream.get_fps()
 
 
 # Global singleton-like manager for the process
@@ -775,14 +1324,38 @@ def init_camera_manager(app_config) -> CameraManager:
     return camera_manager
 
 
-def frame_generator(manager: CameraManager):
-    while True:
-        frame = manager.get_encoded_frame()
-        if frame is None:
-            time.sleep(0.05)
-            continue
+def frame_generator(manager: CameraManager, camera_id: Optional[int] = None):
+    """Yield each newly encoded frame exactly once; JPEG encoding is shared by all clients.
 
-        yield (
-            b"--frame\r\n"
-            b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
-        )
+    With ``camera_id`` None the generator follows the primary camera, switching
+    broadcasters when the dashboard selects a different camera.
+    """
+    broadcaster: Optional[MjpegBroadcaster] = None
+    sequence = 0
+    try:
+        while True:
+            current = manager.get_broadcaster(camera_id)
+            if current is not broadcaster:
+                if broadcaster is not None:
+                    broadcaster.remove_client()
+                broadcaster = current
+                sequence = 0
+                if broadcaster is not None:
+                    broadcaster.add_client()
+
+            if broadcaster is None:
+                time.sleep(0.05)
+                continue
+
+            latest = broadcaster.wait_for_frame(sequence, timeout=0.5)
+            if latest is None:
+                continue
+
+            sequence, frame = latest
+            yield (
+                b"--frame\r\n"
+                b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
+            )
+    finally:
+        if broadcaster is not None:
+            broadcaster.remove_client()
@@ -0,0 +1,326 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import cv2
+
+from camera_feed_app.app.services.frame_buffer import FrameRingBuffer
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.event_recorder import EventRecorder
+from camera_feed_app.app.services.mjpeg_broadcaster import MjpegBroadcaster
+from camera_feed_app.app.services.recording_writer import RecordingWriter, open_video_writer, write_mjpeg_frame
+
+
+logger = logging.getLogger(__name__)
+
+
+class FpsCounter:
+    def __init__(self, window: int = 20) -> None:
+        self._previous_time: Optional[float] = None
+        self._samples = deque(maxlen=window)
+        self.value: float = 0.0
+
+    def reset(self) -> None:
+        self._previous_time = None
+        self._samples.clear()
+        self.value = 0.0
+
+    def update(self) -> float:
+        now = time.time()
+        if self._previous_time is None:
+            self._previous_time = now
+            return self.value
+
+        elapsed = now - self._previous_time
+        self._previous_time = now
+        if elapsed <= 0:
+            return self.value
+
+        # Frames over elapsed time; averaging per-frame reciprocals overstates jittery rates.
+        self._samples.append(elapsed)
+        self.value = len(self._samples) / sum(self._samples)
+        return self.value
+
+
+class CameraStream:
+    """A single open camera with its own capture thread, inference thread, stream and recorder.
+
+    The stream owns no models. Low-light enhancement, detection and annotation
+    are supplied by the CameraManager as callables, so every stream shares the
+    same loaded detector weights while keeping its own detector state under its
+    ``camera_id``.
+    """
+
+    def __init__(
+        self,
+        camera_id: int,
+        capture,
+        enhance: Callable,
+        annotate: Callable,
+        overlay: Callable,
+        detect: Callable,
+        is_ai_active: Callable[[], bool],
+        fps: int = 20,
+        frame_width: int = 1280,
+        frame_height: int = 720,
+        frame_buffer_size: int = 3,
+        jpeg_quality: int = 95,
+        recordings_dir: Optional[Path] = None,
+        fallback_recordings_dir: Optional[Path] = None,
+        recording_queue_size: int = 64,
+        recording_drop_policy: str = RecordingWriter.DROP_OLDEST,
+        recording_late_ms: float = 500.0,
+        event_recorder: Optional[EventRecorder] = None,
+        on_processed: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._lock = threading.RLock()
+        self.camera_id = camera_id
+        self.name = f"Camera {camera_id}"
+
+        self._capture = capture
+        self._enhance = enhance
+        self._annotate = annotate
+        self._overlay = overlay
+        self._on_processed = on_processed
+        self._detect = detect
+        self._is_ai_active = is_ai_active
+
+        self._fps = fps
+        self._frame_width = frame_width
+        self._frame_height = frame_height
+        self._recordings_dir = Path(recordings_dir) if recordings_dir else Path(".")
+        self._fallback_recordings_dir = Path(fallback_recordings_dir) if fallback_recordings_dir else self._recordings_dir
+        self._recording_queue_size = recording_queue_size
+        self._recording_drop_policy = recording_drop_policy
+        self._recording_late_ms = recording_late_ms
+        self._event_recorder = event_recorder
+
+        self._frame_buffer = FrameRingBuffer(capacity=frame_buffer_size)
+        self._broadcaster = MjpegBroadcaster(jpeg_quality=jpeg_quality)
+        self._stream_fps = FpsCounter()
+        self._inference_fps = FpsCounter()
+        self._inference_dropped_frames = 0
+
+        # The current (or last finished) recording; its thread owns the file.
+        self._recorder: Optional[RecordingWriter] = None
+        self._record_mode: Optional[str] = None
+        self._is_recording = False
+        self._is_running = False
+        self._last_frame = None
+
+        self._capture_thread: Optional[threading.Thread] = None
+        self._inference_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._is_running:
+                return
+            self._is_running = True
+            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._inference_thread = threading.Thread(target=self._inference_loop, daemon=True)
+            self._capture_thread.start()
+            self._inference_thread.start()
+        logger.info("Camera stream started id=%s", self.camera_id)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._close_recording()
+            if self._capture is not None:
+                self._capture.release()
+                self._capture = None
+
+            self._is_running = False
+            self._last_frame = None
+            self._capture_thread = None
+            self._inference_thread = None
+            self._frame_buffer.clear()
+            self._broadcaster.clear()
+        logger.info("Camera stream stopped id=%s", self.camera_id)
+
+    def is_running(self) -> bool:
+        with self._lock:
+            return self._is_running and self._capture is not None and self._capture.isOpened()
+
+    def is_recording(self) -> bool:
+        with self._lock:
+            return self._is_recording
+
+    def get_broadcaster(self) -> MjpegBroadcaster:
+        return self._broadcaster
+
+    def get_fps(self) -> float:
+        with self._lock:
+            return round(self._stream_fps.value, 2)
+
+    def _capture_loop(self) -> None:
+        """Read frames at sensor rate and publish them for the stream, recorder and inference stage.
+
+        Detection results are drawn from the detectors' last known state, so a
+        slow model never holds back capture.read() and the driver buffer does
+        not fill up with stale frames.
+        """
+        frame_index = 0
+        while True:
+            with self._lock:
+                capture = self._capture
+                if not self._is_running or capture is None or not capture.isOpened():
+                    break
+
+            ok, frame = capture.read()
+            if not ok:
+                time.sleep(0.03)
+                continue
+
+            frame_index += 1
+            context = self._enhance(FrameContext(frame, camera_id=self.camera_id, sequence=frame_index))
+            self._frame_buffer.publish(context)
+
+            display_frame = self._annotate(context.frame.copy(), self.camera_id)
+
+            with self._lock:
+                if self._capture is not capture:
+                    break
+                fps_value = self._stream_fps.update()
+                display_frame = self._overlay(display_frame, self.name, fps_value)
+                self._last_frame = display_frame
+                recorder = self._recorder if self._is_recording else None
+
+            # Frames are never modified after this point, so the recorder can keep a reference.
+            if recorder is not None:
+                recorder.submit(display_frame)
+            self._broadcaster.publish(display_frame)
+            if self._event_recorder is not None and self._event_recorder.wants_frame(self.camera_id):
+                # The pre-event buffer reuses the stream's JPEG, encoded once for all viewers.
+                latest = self._broadcaster.latest()
+                if latest is not None:
+                    self._event_recorder.add_frame(self.camera_id, latest[1])
+
+    def _inference_loop(self) -> None:
+        """Run the enabled detectors on the newest captured frame, dropping stale ones."""
+        last_sequence = self._frame_buffer.get_sequence()
+        while True:
+            with self._lock:
+                if not self._is_running:
+                    break
+
+            entry = self._frame_buffer.wait_for_newer(last_sequence, timeout=0.5)
+            if entry is None:
+                continue
+
+            sequence, _, context = entry
+            skipped = sequence - last_sequence - 1
+            last_sequence = sequence
+            if self._is_ai_active():
+                # Detectors only read the buffered frame and share its cached views;
+                # drawing happens in the capture loop.
+                self._detect(context, False, self.camera_id)
+
+                with self._lock:
+                    if skipped > 0:
+                        self._inference_dropped_frames += skipped
+                    self._inference_fps.update()
+
+            if self._on_processed is not None:
+                self._on_processed()
+
+    def get_frame(self):
+        with self._lock:
+            if not self._is_running or self._last_frame is None:
+                return None
+            return self._last_frame.copy()
+
+    def get_encoded_frame(self) -> Optional[bytes]:
+        if not self.is_running():
+            return None
+        latest = self._broadcaster.latest()
+        if latest is None:
+            return None
+        return latest[1]
+
+    def start_recording(self) -> Tuple[bool, str, Optional[str]]:
+        with self._lock:
+            if self._is_recording:
+                return True, "Recording already in progress", None
+
+            if self._capture is None or not self._capture.isOpened() or not self._is_running:
+                return False, "Start camera before recording", None
+
+            width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or self._frame_width
+            height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self._frame_height
+
+            self._recordings_dir.mkdir(parents=True, exist_ok=True)
+            base_name = f"recording_cam{self.camera_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            writer, selected_recording_path = open_video_writer(self._recordings_dir, base_name, self._fps, (width, height))
+            filename = selected_recording_path.name if selected_recording_path is not None else None
+            if writer is not None:
+                self._record_mode = "video"
+
+            if writer is None or filename is None:
+                fallback_filename = f"{base_name}.mjpeg"
+                fallback_path = self._fallback_recordings_dir / fallback_filename
+                try:
+                    file_handle = open(fallback_path, "wb")
+                except OSError:
+                    return False, "Failed to start recording", None
+                self._record_mode = "mjpeg"
+                self._recorder = self._new_recorder(
+                    fallback_filename, lambda frame: self._write_mjpeg_frame(file_handle, frame), file_handle.close
+                )
+                self._is_recording = True
+                logger.warning("OpenCV codecs unavailable, recording MJPEG fallback: %s", fallback_path)
+                return True, "Recording started (mjpeg fallback)", fallback_filename
+
+            self._recorder = self._new_recorder(filename, writer.write, writer.release)
+            self._is_recording = True
+            logger.info("Recording started: %s", selected_recording_path)
+            return True, "Recording started", filename
+
+    def stop_recording(self) -> Tuple[bool, str]:
+        with self._lock:
+            if not self._is_recording:
+                return True, "Recording is not active"
+
+            self._close_recording()
+            logger.info("Recording stopped")
+            return True, "Recording stopped"
+
+    def _new_recorder(self, name: str, write: Callable, close: Callable[[], None]) -> RecordingWriter:
+        return RecordingWriter(
+            name,
+            write,
+            close,
+            queue_size=self._recording_queue_size,
+            drop_policy=self._recording_drop_policy,
+            late_ms=self._recording_late_ms,
+        )
+
+    @staticmethod
+    def _write_mjpeg_frame(file_handle, frame) -> None:
+        ok_enc, encoded = cv2.imencode(".jpg", frame)
+        if ok_enc:
+            write_mjpeg_frame(file_handle, encoded.tobytes())
+
+    def _close_recording(self) -> None:
+        self._is_recording = False
+        if self._recorder is not None:
+            # Queued frames are still written; the file is closed by the recorder thread.
+            self._recorder.close()
+        self._record_mode = None
+
+    def get_status(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "camera_id": self.camera_id,
+                "camera_name": self.name,
+                "is_running": self._is_running,
+                "is_recording": self._is_recording,
+                "fps": round(self._stream_fps.value, 2),
+                "inference_fps": round(self._inference_fps.value, 2),
+                "inference_dropped_frames": self._inference_dropped_frames,
+                "stream_clients": self._broadcaster.get_client_count(),
+                "recording": self._recorder.get_stats() if self._recorder is not None else None,
+            }
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one remote backend.
+
+    ``closed``: requests go through; ``failure_threshold`` consecutive
+    failures open the circuit. ``open``: requests fail immediately until the
+    reset timeout has passed. ``half_open``: a single trial request is let
+    through; success closes the circuit, failure re-opens it with the reset
+    timeout doubled (capped at ``max_reset_timeout``).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 2.0,
+        max_reset_timeout: float = 60.0,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._name = name
+        self._failure_threshold = max(1, int(failure_threshold))
+        self._base_reset_timeout = max(0.01, float(reset_timeout))
+        self._max_reset_timeout = max(self._base_reset_timeout, float(max_reset_timeout))
+
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._reset_timeout = self._base_reset_timeout
+        self._open_until = 0.0
+        self._trial_in_flight = False
+
+        self._times_opened = 0
+        self._rejected = 0
+        self._last_error: Optional[str] = None
+
+    def allow_request(self) -> bool:
+        """Whether a request may go out now; in half-open state only one trial is allowed at a time."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() >= self._open_until:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+                logger.info("Circuit %s half-open: sending a trial request", self._name)
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """True while requests would be rejected outright (open and not yet due for a trial)."""
+        with self._lock:
+            if self._state == self.OPEN:
+                return time.monotonic() < self._open_until
+            return self._state == self.HALF_OPEN and self._trial_in_flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit %s closed: backend recovered", self._name)
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._reset_timeout = self._base_reset_timeout
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._last_error = str(error) if error is not None else None
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN:
+                # The trial failed: back off further before the next one.
+                self._reset_timeout = min(self._max_reset_timeout, self._reset_timeout * 2.0)
+                self._trip()
+            elif self._state == self.CLOSED and self._consecutive_failures >= self._failure_threshold:
+                self._trip()
+
+    def record_neutral(self) -> None:
+        """Finish a request that says nothing about the backend's health (e.g. an HTTP 4xx), freeing a half-open trial."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._open_until = time.monotonic() + self._reset_timeout
+        self._trial_in_flight = False
+        self._times_opened += 1
+        logger.warning(
+            "Circuit %s open for %.1fs after %d consecutive failures (%s)",
+            self._name,
+            self._reset_timeout,
+            self._consecutive_failures,
+            self._last_error,
+        )
+
+    def get_state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            retry_in = max(0.0, self._open_until - time.monotonic()) if self._state == self.OPEN else 0.0
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+                "reset_timeout_s": round(self._reset_timeout, 2),
+                "retry_in_s": round(retry_in, 2),
+                "last_error": self._last_error,
+            }
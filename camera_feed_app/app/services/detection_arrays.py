@@ -0,0 +1,122 @@
+"""Compact detection arrays shared by the detectors.
+
+A set of detections is one ``float32`` NumPy array of shape ``(N, 6)`` with
+the columns x1, y1, x2, y2, confidence and class_id. Model results are read
+into it in bulk and filtering, IoU association and NMS work on whole arrays;
+services turn it into ``(x1, y1, x2, y2, confidence)`` tuples only where the
+results are stored for drawing and the status APIs.
+"""
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CONFIDENCE = 4
+CLASS_ID = 5
+
+
+def empty_detections() -> np.ndarray:
+    return np.zeros((0, 6), dtype=np.float32)
+
+
+def from_boxes_data(data) -> np.ndarray:
+    """Detections from an Ultralytics ``results.boxes.data`` tensor (or array) in one copy."""
+    if data is None:
+        return empty_detections()
+    if hasattr(data, "cpu"):
+        data = data.cpu().numpy()
+    # Always a copy: callers map the corners in place and must not touch the model's tensor.
+    array = np.array(data, dtype=np.float32)
+    if array.size == 0:
+        return empty_detections()
+    # Tracking-enabled results add a track-id column before conf and cls.
+    if array.shape[1] > 6:
+        array = np.concatenate([array[:, :4], array[:, -2:]], axis=1)
+    return array
+
+
+def from_center_predictions(predictions: Sequence[dict]) -> np.ndarray:
+    """Detections from Roboflow-style predictions (centre x/y, width, height, confidence, class_id)."""
+    if not predictions:
+        return empty_detections()
+    raw = np.array(
+        [
+            (
+                float(pred.get("x", 0)),
+                float(pred.get("y", 0)),
+                float(pred.get("width", 0)),
+                float(pred.get("height", 0)),
+                float(pred.get("confidence", 0.0)),
+                float(pred.get("class_id", 0)),
+            )
+            for pred in predictions
+        ],
+        dtype=np.float32,
+    )
+    half_w = raw[:, 2] / 2.0
+    half_h = raw[:, 3] / 2.0
+    return np.stack([raw[:, 0] - half_w, raw[:, 1] - half_h, raw[:, 0] + half_w, raw[:, 1] + half_h, raw[:, 4], raw[:, 5]], axis=1)
+
+
+def as_detections(value, class_id: int = 0) -> np.ndarray:
+    """Detection array from an array or from ``(x1, y1, x2, y2, conf[, class_id])`` tuples."""
+    if isinstance(value, np.ndarray):
+        return value
+    rows = [tuple(box[:6]) if len(box) >= 6 else tuple(box[:5]) + (class_id,) for box in value]
+    if not rows:
+        return empty_detections()
+    return np.array(rows, dtype=np.float32)
+
+
+def to_boxes(detections: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
+    """``(x1, y1, x2, y2, confidence)`` tuples with integer pixel corners, as stored for drawing."""
+    corners = detections[:, :4].astype(np.int32).tolist()
+    confidences = detections[:, CONFIDENCE].astype(np.float64).round(4).tolist()
+    return [(x1, y1, x2, y2, confidence) for (x1, y1, x2, y2), confidence in zip(corners, confidences)]
+
+
+def concat(*arrays: np.ndarray) -> np.ndarray:
+    arrays = [array for array in arrays if len(array)]
+    if not arrays:
+        return empty_detections()
+    return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+
+def select(detections: np.ndarray, class_ids: Optional[Iterable[int]] = None, min_confidence: float = 0.0) -> np.ndarray:
+    """Rows of ``class_ids`` (all classes when None) with at least ``min_confidence``."""
+    keep = detections[:, CONFIDENCE] >= min_confidence
+    if class_ids is not None:
+        keep &= np.isin(detections[:, CLASS_ID], np.asarray(list(class_ids), dtype=np.float32))
+    return detections[keep]
+
+
+def iou_matrix(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two ``(N, >=4)`` and ``(M, >=4)`` box arrays, shape ``(N, M)``."""
+    first = np.atleast_2d(np.asarray(first, dtype=np.float32))
+    second = np.atleast_2d(np.asarray(second, dtype=np.float32))
+    top_left = np.maximum(first[:, None, :2], second[None, :, :2])
+    bottom_right = np.minimum(first[:, None, 2:4], second[None, :, 2:4])
+    inter = np.prod(np.clip(bottom_right - top_left, 0.0, None), axis=2)
+    area_first = np.prod(np.clip(first[:, 2:4] - first[:, :2], 0.0, None), axis=1)
+    area_second = np.prod(np.clip(second[:, 2:4] - second[:, :2], 0.0, None), axis=1)
+    union = area_first[:, None] + area_second[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def nms(detections: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression, highest confidence first; each step suppresses against all remaining boxes at once."""
+    if len(detections) < 2:
+        return detections
+    order = np.argsort(-detections[:, CONFIDENCE], kind="stable")
+    ious = iou_matrix(detections, detections)
+    suppressed = np.zeros(len(detections), dtype=bool)
+    keep = []
+    for index in order:
+        if suppressed[index]:
+            continue
+        keep.append(index)
+        suppressed |= ious[index] > iou_threshold
+    return detections[np.array(keep)]
+
+
+def centers(detections: np.ndarray) -> np.ndarray:
+    return (detections[:, :2] + detections[:, 2:4]) / 2.0
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from camera_feed_app.app.services.frame_context import FrameContext
+
+logger = logging.getLogger(__name__)
+
+
+def dhash(gray) -> int:
+    """Difference hash of a small grayscale image: one bit per horizontally adjacent pixel pair."""
+    bits = gray[:, 1:] > gray[:, :-1]
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count("1")
+
+
+class PerceptualResultCache:
+    """Remote detection results keyed by a perceptual hash of the frame.
+
+    Fixed cameras produce long runs of near-identical frames. Before a frame
+    is uploaded, its dHash (``hash_size`` x ``hash_size`` bits, taken from
+    a tiny grayscale view of the FrameContext) is compared with the cached
+    frames of the same camera and model. A hash within ``max_distance`` bits
+    reuses that frame's boxes instead of calling the API. Entries are indexed
+    by namespace, so a lookup only compares hashes of its own camera.
+
+    Entries expire ``ttl`` seconds after they were fetched, whether or not
+    they were hit in the meantime, so even a perfectly static scene is
+    re-checked periodically. The least recently used entry is evicted once
+    ``max_entries`` is reached.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 10.0, max_distance: int = 8, hash_size: int = 16) -> None:
+        self._lock = threading.Lock()
+        self._max_entries = max(1, int(max_entries))
+        self._ttl = max(0.0, float(ttl))
+        self._max_distance = max(0, int(max_distance))
+        self._hash_size = max(4, int(hash_size))
+
+        # namespace -> frame_hash -> (detections, stored_at), so a lookup only scans its own camera and model.
+        self._namespaces: Dict[Hashable, Dict[int, Tuple[List[tuple], float]]] = {}
+        # (namespace, frame_hash) in the order they were stored (for expiry) and used (for eviction).
+        self._stored: "OrderedDict[Tuple[Hashable, int], float]" = OrderedDict()
+        self._used: "OrderedDict[Tuple[Hashable, int], None]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+    def frame_hash(self, context: FrameContext) -> int:
+        """dHash of the frame; the tiny view is memoized, so every remote detector shares it."""
+        return dhash(context.resized(self._hash_size + 1, self._hash_size).gray())
+
+    def _remove_locked(self, key: Tuple[Hashable, int]) -> None:
+        namespace, frame_hash = key
+        entries = self._namespaces.get(namespace)
+        if entries is not None:
+            entries.pop(frame_hash, None)
+            if not entries:
+                del self._namespaces[namespace]
+        self._stored.pop(key, None)
+        self._used.pop(key, None)
+
+    def _expire_locked(self, now: float) -> None:
+        # Entries are kept in storing order, so the expired ones are all at the front.
+        while self._stored:
+            key, stored_at = next(iter(self._stored.items()))
+            if now - stored_at <= self._ttl:
+                break
+            self._remove_locked(key)
+            self._expired += 1
+
+    def lookup(self, namespace: Hashable, frame_hash: int) -> Optional[List[tuple]]:
+        """Cached detections for the closest matching frame in ``namespace``, or None."""
+        with self._lock:
+            self._expire_locked(time.monotonic())
+            entries = self._namespaces.get(namespace, {})
+            best_hash = None
+            if frame_hash in entries:
+                best_hash = frame_hash
+            else:
+                best_distance = self._max_distance + 1
+                for cached_hash in entries:
+                    distance = hamming_distance(cached_hash, frame_hash)
+                    if distance < best_distance:
+                        best_hash = cached_hash
+                        best_distance = distance
+
+            if best_hash is None:
+                self._misses += 1
+                return None
+
+            self._used.move_to_end((namespace, best_hash))
+            self._hits += 1
+            return entries[best_hash][0]
+
+    def store(self, namespace: Hashable, frame_hash: int, detections: List[tuple]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire_locked(now)
+            key = (namespace, frame_hash)
+            self._remove_locked(key)
+            self._namespaces.setdefault(namespace, {})[frame_hash] = (list(detections), now)
+            self._stored[key] = now
+            self._used[key] = None
+            while len(self._used) > self._max_entries:
+                self._remove_locked(next(iter(self._used)))
+                self._evictions += 1
+
+    def discard_namespace(self, predicate) -> None:
+        """Drop every entry whose namespace matches ``predicate`` (e.g. a closed camera)."""
+        with self._lock:
+            for namespace in [namespace for namespace in self._namespaces if predicate(namespace)]:
+                for frame_hash in list(self._namespaces[namespace]):
+                    self._remove_locked((namespace, frame_hash))
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._stored),
+                "max_entries": self._max_entries,
+                "ttl_s": self._ttl,
+                "max_distance": self._max_distance,
+                "hash_bits": self._hash_size * self._hash_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,229 @@
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _DetectorTiming:
+    def __init__(self, name: str, interval: int, phase: int) -> None:
+        self.name = name
+        self.interval = interval
+        self.phase = phase
+        self.latency: Optional[float] = None
+        # Round trip of asynchronous remote runs, which return before their result arrives.
+        self.remote_latency: Optional[float] = None
+        self.samples = 0
+
+
+class AdaptiveIntervalScheduler:
+    """Choose how often each detector runs from its measured inference latency.
+
+    Every detector's latency is tracked as an exponentially weighted moving
+    average. About once a second the intervals are recomputed so that the
+    average detector time per frame, ``sum(latency / interval)``, fits both
+    the frame budget of ``target_fps`` per camera and the CPU budget
+    (``cpu_budget`` of all cores, shared by the active cameras). Starting
+    from every detector on every frame, the detector with the largest share
+    of the per-frame cost is slowed down one step at a time until both fit,
+    so fast detectors keep running often while slow ones back off.
+
+    A detector that sends frames to a remote backend without waiting reports
+    the round trip with ``record(..., remote=True)``. That time is spent
+    waiting on the network, not computing, so it stays out of the budget and
+    only sets a minimum interval of ``round trip x target_fps`` frames, so a
+    new request is not issued before the previous one would have returned.
+
+    Detectors named together in ``shared`` (consumers of one shared model
+    pass) are scheduled as one unit with the same interval and phase, so they
+    land on the same frames and the pass serves all of them. Other units get
+    different phases, so with equal intervals they fire on different frames
+    instead of all landing on the same one.
+    """
+
+    _STREAM_ACTIVITY_WINDOW_SECONDS = 2.0
+
+    def __init__(
+        self,
+        initial_intervals: Dict[str, int],
+        target_fps: float = 15.0,
+        cpu_budget: float = 0.5,
+        max_interval: int = 30,
+        smoothing: float = 0.2,
+        recompute_seconds: float = 1.0,
+        shared: Iterable[Iterable[str]] = (),
+    ) -> None:
+        self._lock = threading.Lock()
+        self._target_fps = max(0.1, float(target_fps))
+        self._cpu_cores = max(1, os.cpu_count() or 1) * min(1.0, max(0.01, float(cpu_budget)))
+        self._max_interval = max(1, int(max_interval))
+        self._smoothing = min(1.0, max(0.01, float(smoothing)))
+        self._recompute_seconds = max(0.1, float(recompute_seconds))
+
+        self._detectors: Dict[str, _DetectorTiming] = {}
+        for index, (name, interval) in enumerate(initial_intervals.items()):
+            self._detectors[name] = _DetectorTiming(name, max(1, int(interval)), index)
+
+        # Units of detectors that always run on the same frames; every other detector is a unit of its own.
+        groups = [set(group) for group in shared]
+        self._units: List[List[str]] = []
+        for name in self._detectors:
+            if any(name in unit for unit in self._units):
+                continue
+            group = next((group for group in groups if name in group), {name})
+            self._units.append([member for member in self._detectors if member in group])
+        for unit in self._units:
+            interval = min(self._detectors[name].interval for name in unit)
+            for name in unit:
+                self._detectors[name].interval = interval
+        self._restagger_locked()
+
+        self._ticks: Dict[object, int] = {}
+        self._stream_last_seen: Dict[object, float] = {}
+        self._last_recompute = 0.0
+
+    def next_tick(self, stream_id) -> int:
+        """Advance and return the detection tick counter of ``stream_id`` (one tick per examined frame)."""
+        now = time.monotonic()
+        with self._lock:
+            tick = self._ticks.get(stream_id, 0) + 1
+            self._ticks[stream_id] = tick
+            self._stream_last_seen[stream_id] = now
+            if now - self._last_recompute >= self._recompute_seconds:
+                self._last_recompute = now
+                self._recompute_locked(now)
+            return tick
+
+    def is_due(self, name: str, tick: int) -> bool:
+        with self._lock:
+            timing = self._detectors.get(name)
+            if timing is None:
+                return True
+            return (tick + timing.phase) % timing.interval == 0
+
+    def ticks_until_due(self, name: str, tick: int) -> int:
+        """How many ticks after ``tick`` detector ``name`` is next due (0 when it is due on ``tick``)."""
+        with self._lock:
+            timing = self._detectors.get(name)
+            if timing is None:
+                return 0
+            return -(tick + timing.phase) % timing.interval
+
+    def record(self, name: str, seconds: float, remote: bool = False) -> None:
+        """Feed one measured run of detector ``name``; ``remote`` for the completion of an asynchronous remote run."""
+        with self._lock:
+            timing = self._detectors.get(name)
+            if timing is None:
+                return
+            attribute = "remote_latency" if remote else "latency"
+            latency = getattr(timing, attribute)
+            if latency is None:
+                latency = seconds
+            else:
+                latency += self._smoothing * (seconds - latency)
+            setattr(timing, attribute, latency)
+            timing.samples += 1
+
+    def discard_stream(self, stream_id) -> None:
+        with self._lock:
+            self._ticks.pop(stream_id, None)
+            self._stream_last_seen.pop(stream_id, None)
+
+    def _active_streams_locked(self, now: float) -> int:
+        cutoff = now - self._STREAM_ACTIVITY_WINDOW_SECONDS
+        for stream_id in [stream_id for stream_id, seen in self._stream_last_seen.items() if seen < cutoff]:
+            del self._stream_last_seen[stream_id]
+        return max(1, len(self._stream_last_seen))
+
+    def _frame_budget_locked(self, now: float) -> float:
+        """Seconds of detector work allowed per examined frame of one camera."""
+        streams = self._active_streams_locked(now)
+        per_thread = 1.0 / self._target_fps
+        per_cpu = self._cpu_cores / (streams * self._target_fps)
+        return min(per_thread, per_cpu)
+
+    def _unit_timing_locked(self, unit: List[str]):
+        """``(cost, min_interval)`` of a unit, or None before any of its detectors was measured."""
+        timings = [self._detectors[name] for name in unit]
+        if all(timing.latency is None and timing.remote_latency is None for timing in timings):
+            return None
+        # Members of a unit run concurrently on one shared pass, so the unit costs its slowest member.
+        cost = max((timing.latency for timing in timings if timing.latency is not None), default=0.0)
+        round_trip = max((timing.remote_latency for timing in timings if timing.remote_latency is not None), default=0.0)
+        min_interval = min(self._max_interval, max(1, math.ceil(round_trip * self._target_fps)))
+        return cost, min_interval
+
+    def _recompute_locked(self, now: float) -> None:
+        measured = {}
+        for index, unit in enumerate(self._units):
+            timing = self._unit_timing_locked(unit)
+            if timing is not None:
+                measured[index] = timing
+        if not measured:
+            return
+
+        budget = self._frame_budget_locked(now)
+        intervals = {index: min_interval for index, (_, min_interval) in measured.items()}
+
+        def cost() -> float:
+            return sum(measured[index][0] / intervals[index] for index in measured)
+
+        while cost() > budget:
+            adjustable = [index for index in measured if intervals[index] < self._max_interval]
+            if not adjustable:
+                break
+            heaviest = max(adjustable, key=lambda index: measured[index][0] / intervals[index])
+            intervals[heaviest] += 1
+
+        changed = [
+            index for index, interval in intervals.items() if self._detectors[self._units[index][0]].interval != interval
+        ]
+        if not changed:
+            return
+        for index, interval in intervals.items():
+            for name in self._units[index]:
+                self._detectors[name].interval = interval
+        self._restagger_locked()
+        logger.info(
+            "Detection intervals now %s (budget %.1f ms/frame)",
+            ", ".join(f"{timing.name}={timing.interval}" for timing in self._detectors.values()),
+            budget * 1000.0,
+        )
+
+    def _restagger_locked(self) -> None:
+        # Spread phases across each unit's interval so equal intervals do not coincide;
+        # the detectors within a unit share their phase.
+        count = len(self._units)
+        for index, unit in enumerate(self._units):
+            for name in unit:
+                timing = self._detectors[name]
+                timing.phase = (index * timing.interval) // count if count else 0
+
+    def get_intervals(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: timing.interval for name, timing in self._detectors.items()}
+
+    def get_stats(self) -> Dict[str, object]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "target_fps": self._target_fps,
+                "cpu_cores_budget": round(self._cpu_cores, 2),
+                "frame_budget_ms": round(self._frame_budget_locked(now) * 1000.0, 1),
+                "active_streams": self._active_streams_locked(now),
+                "detectors": {
+                    name: {
+                        "interval": timing.interval,
+                        "phase": timing.phase,
+                        "latency_ms": round(timing.latency * 1000.0, 1) if timing.latency is not None else None,
+                        "remote_latency_ms": (
+                            round(timing.remote_latency * 1000.0, 1) if timing.remote_latency is not None else None
+                        ),
+                        "samples": timing.samples,
+                    }
+                    for name, timing in self._detectors.items()
+                },
+            }
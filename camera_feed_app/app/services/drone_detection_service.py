@@ -1,19 +1,50 @@
-import base64
-import json
 import logging
 import os
 import threading
-import urllib.request
-import urllib.error
-from io import BytesIO
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 
 import cv2
+import numpy as np
+
+from camera_feed_app.app.services.batch_inference import BatchInferenceScheduler
+from camera_feed_app.app.services.detection_arrays import (
+    CONFIDENCE,
+    as_detections,
+    centers,
+    concat,
+    from_center_predictions,
+    select,
+    to_boxes,
+)
+from camera_feed_app.app.services.detection_cache import PerceptualResultCache
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.model_registry import ModelHandle, ModelRegistry, model_key
+from camera_feed_app.app.services.object_tracker import ObjectTracker
+from camera_feed_app.app.services.remote_inference import RemoteInferenceClient, RemoteInferenceError
+from camera_feed_app.app.services.shared_coco_inference import SharedCocoInference
 
 logger = logging.getLogger(__name__)
 
 
+class _DroneStreamState:
+    """Per-camera drone results and temporal history; models are shared by all cameras."""
+
+    def __init__(self, tracker: Optional[ObjectTracker] = None) -> None:
+        self.frame_counter = 0
+        self.drone_count = 0
+        self.last_detections: List[Tuple[int, int, int, int, float]] = []
+        # Detection arrays of the last four runs, newest last.
+        self.detection_history: Deque[np.ndarray] = deque(maxlen=4)
+        # Source-frame timestamp of the results in last_detections; older async results are dropped.
+        self.result_timestamp = 0.0
+        self.remote_pending = False
+        # Moves the boxes between detection runs; None draws last_detections as they are.
+        self.tracker = tracker
+
+
 class DroneDetectionService:
     """Roboflow-based drone detector with local YOLO fallback.
 
@@ -48,8 +79,21 @@ class DroneDetectionService:
         roboflow_api_key: str = "",
         roboflow_model_id: str = "drone-dataset-jiusn/1",
         roboflow_size: int = 640,
+        roboflow_jpeg_quality: int = 80,
+        batch_max_size: int = 8,
+        batch_max_wait_ms: float = 15.0,
+        shared_coco: Optional[SharedCocoInference] = None,
+        remote_client: Optional[RemoteInferenceClient] = None,
+        remote_timeout: float = 10.0,
+        async_remote: bool = True,
+        remote_fallback_local: bool = False,
+        result_cache: Optional[PerceptualResultCache] = None,
+        tracker_options: Optional[Dict[str, object]] = None,
+        model_registry: Optional[ModelRegistry] = None,
+        remote_latency_callback: Optional[Callable[[float], None]] = None,
     ) -> None:
         self._lock = threading.RLock()
+        self._load_lock = threading.RLock()
 
         cache_dir = Path.home() / ".cache" / "vigilaxai" / "models"
         cache_dir.mkdir(parents=True, exist_ok=True)
@@ -68,45 +112,102 @@ class DroneDetectionService:
         # Roboflow API configuration
         self._roboflow_api_key = roboflow_api_key
         self._roboflow_model_id = roboflow_model_id
-        self._roboflow_size = roboflow_size
+        self._roboflow_size = int(roboflow_size)
+        self._jpeg_quality = min(100, max(10, int(roboflow_jpeg_quality)))
         self._use_roboflow = bool(roboflow_api_key)
+        self._remote_client = remote_client or RemoteInferenceClient()
+        self._remote_timeout = float(remote_timeout)
+        self._async_remote = bool(async_remote)
+        # Told the round trip of every asynchronous remote run, which the caller cannot time itself.
+        self._remote_latency_callback = remote_latency_callback
+        self._remote_fallback_local = bool(remote_fallback_local)
+        self._active_backend = "roboflow" if self._use_roboflow else "local"
+        self._result_cache = result_cache
+        self._tracker_options = tracker_options
+        self._async_stats: Dict[str, float] = {
+            "submitted": 0,
+            "applied": 0,
+            "stale": 0,
+            "failed": 0,
+            "skipped_busy": 0,
+            "last_age_ms": 0.0,
+        }
 
-        self._model = None
         self._enabled = False
-        self._drone_count = 0
-        self._frame_counter = 0
-        self._last_detections: List[Tuple[int, int, int, int, float]] = []
-        self._detection_history: List[List[Tuple[int, int, int, int, float]]] = []
+        self._streams: Dict[object, _DroneStreamState] = {}
+
+        # When the local fallback is the same COCO model the weapon detector uses,
+        # both read their classes from one shared forward pass.
+        self._shared_coco = shared_coco if not self._use_roboflow else None
+        if self._shared_coco is not None:
+            self._shared_coco.register("drone", self._drone_class_ids, self._confidence_threshold)
+            self._model_handle: Optional[ModelHandle] = self._shared_coco.model_handle
+        elif not self._use_roboflow or self._remote_fallback_local:
+            self._model_handle = (model_registry or ModelRegistry()).register(
+                model_key("yolo", self._model_path), self._build_model
+            )
+        else:
+            self._model_handle = None
+        # Set once the local model loaded; after an idle eviction it is reloaded when detection is enabled again.
+        self._model_available = False
+        self._batcher = BatchInferenceScheduler(
+            self._local_model,
+            max_batch_size=batch_max_size,
+            max_wait_ms=batch_max_wait_ms,
+            name="drone",
+            model_lock=self._model_handle.inference_lock if self._model_handle is not None else None,
+        )
+
+    def _local_model(self):
+        return self._model_handle.get() if self._model_handle is not None else None
+
+    def _build_model(self):
+        from ultralytics import YOLO
+
+        logger.info("Loading YOLO model from: %s", self._model_path)
+        if os.path.exists(self._model_path):
+            logger.info("Using existing model file: %s", self._model_path)
+        else:
+            logger.info("Model not found locally, ultralytics will download to cache...")
+        return YOLO(self._model_path)
+
+    def model_handles(self) -> List[ModelHandle]:
+        """Registry handles of the local models this service loaded."""
+        return [self._model_handle] if self._model_handle is not None and self._model_handle.is_loaded() else []
 
     def load_model(self) -> bool:
-        with self._lock:
+        # Loading holds only _load_lock, so counts and annotation never wait for a model import.
+        with self._load_lock:
             if self._use_roboflow:
                 logger.info(
                     "DroneDetectionService: Using Roboflow API (model_id=%s, api_key=%s...)",
                     self._roboflow_model_id,
                     self._roboflow_api_key[:10] + "***" if self._roboflow_api_key else "NOT_SET",
                 )
+                if self._remote_fallback_local and not self._model_available:
+                    # Optional standby model for when the circuit to Roboflow is open.
+                    if not self._load_local_model():
+                        logger.warning("DroneDetectionService: local fallback model unavailable")
                 return True  # No local model loading needed for API
 
+            return self._load_local_model()
+
+    def _load_local_model(self) -> bool:
+        with self._load_lock:
             # Fallback to local YOLO model
-            if self._model is not None:
+            if self._model_available and self._local_model() is not None:
                 return True
 
-            try:
-                from ultralytics import YOLO
-
-                logger.info("Loading YOLO model from: %s", self._model_path)
-                if os.path.exists(self._model_path):
-                    logger.info("Using existing model file: %s", self._model_path)
-                else:
-                    logger.info("Model not found locally, ultralytics will download to cache...")
-
-                model = YOLO(self._model_path)
-                if model is None:
-                    logger.error("Failed to load YOLO model from %s", self._model_path)
+            if self._shared_coco is not None:
+                if not self._shared_coco.load_model():
                     return False
+                self._model_available = True
+                logger.info("DroneDetectionService: using shared COCO pass for classes %s", self._drone_class_ids)
+                return True
 
-                self._model = model
+            try:
+                self._model_handle.load()
+                self._model_available = True
                 logger.info(
                     "DroneDetectionService: YOLO model loaded from %s, watching classes %s",
                     self._model_path,
@@ -124,211 +225,401 @@ class DroneDetectionService:
                 )
                 return False
 
-    def _roboflow_detect(self, frame) -> List[Tuple[int, int, int, int, float]]:
-        """Invoke Roboflow API for drone detection."""
+    def warmup(self, size: int = 640) -> None:
+        """Run one blank frame through the local model (if any) so the first live frame is not slowed by lazy setup."""
+        if self._shared_coco is not None:
+            self._shared_coco.warmup(size)
+        elif self._local_model() is not None:
+            dummy = np.zeros((size, size, 3), dtype=np.uint8)
+            self._batcher.infer(dummy, stream_id="warmup", verbose=False, imgsz=size, classes=self._drone_class_ids)
+
+    def _roboflow_payload(self, context: FrameContext):
+        """Upload view, JPEG buffer and query parameters for one Roboflow request, or None if encoding fails.
+
+        The frame is shrunk to ``roboflow_size`` first: the server resizes to
+        that size anyway, so uploading full resolution only costs bytes.
+        """
+        view = context.fit_within(self._roboflow_size)
+        image = view.clahe() if self._enable_preprocessing else view.frame
+        success, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self._jpeg_quality])
+        if not success:
+            logger.error("Failed to encode frame for Roboflow API")
+            return None
+        params = {
+            "api_key": self._roboflow_api_key,
+            "confidence": self._confidence_threshold,
+            "overlap": 30,
+        }
+        return view, buffer, params
+
+    @staticmethod
+    def _parse_roboflow_predictions(response_data, view: FrameContext) -> List[Tuple[int, int, int, int, float]]:
+        """Roboflow center boxes in ``view`` pixels as corner boxes in source-frame pixels."""
+        detections = from_center_predictions(response_data.get("predictions", []))
+        detections[:, :4] = view.to_source_boxes(detections[:, :4])
+        logger.debug("Roboflow API returned %d detections", len(detections))
+        return to_boxes(detections)
+
+    def _roboflow_detect(self, context: FrameContext) -> Optional[List[Tuple[int, int, int, int, float]]]:
+        """Invoke Roboflow API for drone detection; None when the request failed."""
         try:
-            # Encode frame to JPEG
-            success, buffer = cv2.imencode(".jpg", frame)
-            if not success:
-                logger.error("Failed to encode frame for Roboflow API")
+            payload = self._roboflow_payload(context)
+            if payload is None:
                 return []
-
-            # Base64 encode
-            img_data = base64.b64encode(buffer).decode("utf-8")
-
-            # Build Roboflow API request
-            api_url = f"https://detect.roboflow.com/{self._roboflow_model_id}"
-            params = f"?api_key={self._roboflow_api_key}&confidence={self._confidence_threshold}&overlap=30"
-            full_url = api_url + params
-
-            # Prepare multipart form data with base64 image
-            boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-            body = (
-                f"--{boundary}\r\n"
-                f'Content-Disposition: form-data; name="file"; filename="image.jpg"\r\n'
-                f"Content-Type: image/jpeg\r\n\r\n"
-            ).encode("utf-8")
-            body += base64.b64decode(img_data)
-            body += f"\r\n--{boundary}--\r\n".encode("utf-8")
-
-            request = urllib.request.Request(
-                full_url,
-                data=body,
-                method="POST",
-                headers={
-                    "Content-Type": f"multipart/form-data; boundary={boundary}",
-                },
+            view, buffer, params = payload
+            response_data = self._remote_client.infer(
+                self._roboflow_model_id,
+                buffer,
+                params,
+                timeout=self._remote_timeout,
             )
+            return self._parse_roboflow_predictions(response_data, view)
 
-            with urllib.request.urlopen(request, timeout=10) as response:
-                response_data = json.loads(response.read().decode("utf-8"))
-
-            detections: List[Tuple[int, int, int, int, float]] = []
-            if "predictions" in response_data:
-                for pred in response_data["predictions"]:
-                    x = pred["x"]
-                    y = pred["y"]
-                    width = pred["width"]
-                    height = pred["height"]
-                    confidence = pred["confidence"]
+        except RemoteInferenceError as error:
+            logger.error("Roboflow API error: %s", error)
+            return None
+        except Exception as error:
+            logger.error("Error calling Roboflow API: %s", error)
+            return None
+
+    def _probe_result_cache(self, context: FrameContext, stream_id):
+        """``(cache_entry, cached_detections)``; cache_entry is None when no cache is configured."""
+        if self._result_cache is None:
+            return None, None
+        namespace = (self._roboflow_model_id, stream_id, context.shape[:2])
+        frame_hash = self._result_cache.frame_hash(context)
+        return (namespace, frame_hash), self._result_cache.lookup(namespace, frame_hash)
+
+    def _submit_roboflow(self, context: FrameContext, state: _DroneStreamState, stream_id, cache_entry=None) -> None:
+        """Send this frame to Roboflow without waiting; the result is applied by _apply_remote_result."""
+        with self._lock:
+            if state.remote_pending:
+                # Keep showing the last detections; a newer frame is sent once this one returns.
+                self._async_stats["skipped_busy"] += 1
+                return
+            state.remote_pending = True
 
-                    # Convert from center (x, y, width, height) to corner coords (x1, y1, x2, y2)
-                    x1 = max(0, int(x - width / 2))
-                    y1 = max(0, int(y - height / 2))
-                    x2 = int(x + width / 2)
-                    y2 = int(y + height / 2)
+        try:
+            payload = self._roboflow_payload(context)
+            if payload is None:
+                with self._lock:
+                    state.remote_pending = False
+                return
+            view, buffer, params = payload
+            submitted_at = time.perf_counter()
+            future = self._remote_client.submit(
+                self._roboflow_model_id,
+                buffer,
+                params,
+                timeout=self._remote_timeout,
+            )
+        except Exception:
+            with self._lock:
+                state.remote_pending = False
+            raise
 
-                    detections.append((x1, y1, x2, y2, confidence))
+        with self._lock:
+            self._async_stats["submitted"] += 1
+        # Only the timestamp and the small upload view travel with the request.
+        frame_timestamp = context.timestamp
+        future.add_done_callback(
+            lambda done: self._apply_remote_result(done, view, state, stream_id, frame_timestamp, cache_entry, submitted_at)
+        )
 
-            logger.debug("Roboflow API returned %d detections", len(detections))
-            return detections
+    def _apply_remote_result(
+        self,
+        future,
+        view: FrameContext,
+        state: _DroneStreamState,
+        stream_id,
+        frame_timestamp: float,
+        cache_entry=None,
+        submitted_at: Optional[float] = None,
+    ) -> None:
+        if self._remote_latency_callback is not None and submitted_at is not None:
+            self._remote_latency_callback(time.perf_counter() - submitted_at)
+        with self._lock:
+            state.remote_pending = False
 
-        except urllib.error.HTTPError as e:
-            logger.error("Roboflow API HTTP error: %s", e.code)
-            return []
-        except urllib.error.URLError as e:
-            logger.error("Roboflow API connection error: %s", e.reason)
-            return []
+        try:
+            detections = self._parse_roboflow_predictions(future.result(), view)
+        except RemoteInferenceError as error:
+            with self._lock:
+                self._async_stats["failed"] += 1
+            logger.error("Roboflow API error: %s", error)
+            return
         except Exception as error:
+            with self._lock:
+                self._async_stats["failed"] += 1
             logger.error("Error calling Roboflow API: %s", error)
-            return []
+            return
 
-    def toggle_detection(self) -> bool:
         with self._lock:
-            self._enabled = not self._enabled
-            if not self._enabled:
-                self._drone_count = 0
-                self._last_detections = []
-                self._detection_history = []
-            logger.info("DroneDetectionService: detection %s", "enabled" if self._enabled else "disabled")
-            return self._enabled
+            # A stream that was discarded or re-created, or a result older than
+            # the one already shown, must not overwrite the current state.
+            if not self._enabled or self._streams.get(stream_id) is not state or frame_timestamp <= state.result_timestamp:
+                self._async_stats["stale"] += 1
+                return
+            boxes = self._store_detections(state, detections, frame_timestamp)
+            self._async_stats["applied"] += 1
+            self._async_stats["last_age_ms"] = round(1000.0 * (time.time() - frame_timestamp), 1)
+        if cache_entry is not None:
+            self._result_cache.store(*cache_entry, boxes)
+
+    def _store_detections(
+        self,
+        state: _DroneStreamState,
+        detections,
+        frame_timestamp: float,
+        smooth: bool = True,
+        filtered: bool = False,
+    ) -> List[Tuple[int, int, int, int, float]]:
+        """Filter a detection array (or box tuples), publish it as this stream's result and return the boxes.
+
+        Forced runs pass ``smooth=False`` so the tracker shows their boxes as
+        detected. Cached results were filtered when they were stored and pass
+        ``filtered=True``, so they are neither filtered again nor added to the
+        filter's history.
+        """
+        if filtered:
+            boxes = list(detections)
+        else:
+            boxes = to_boxes(self._filter_temporal_noise(state, as_detections(detections)))
+        state.last_detections = boxes
+        state.drone_count = len(boxes)
+        state.result_timestamp = frame_timestamp
+        if state.tracker is not None:
+            state.tracker.update("drone", boxes, frame_timestamp, smooth)
+        return boxes
+
+    def _get_stream_state(self, stream_id) -> _DroneStreamState:
+        state = self._streams.get(stream_id)
+        if state is None:
+            tracker = ObjectTracker(**self._tracker_options) if self._tracker_options is not None else None
+            state = _DroneStreamState(tracker)
+            self._streams[stream_id] = state
+        return state
+
+    def is_due(self, stream_id=None) -> bool:
+        """True when the next unforced run_inference call for ``stream_id`` will examine its frame."""
+        with self._lock:
+            state = self._streams.get(stream_id)
+            frame_counter = state.frame_counter if state is not None else 0
+            return (frame_counter + 1) % self._detection_interval == 0
 
-    def get_drone_count(self) -> int:
+    def discard_stream(self, stream_id) -> None:
+        with self._lock:
+            self._streams.pop(stream_id, None)
+        if self._result_cache is not None:
+            self._result_cache.discard_namespace(lambda namespace: namespace[:2] == (self._roboflow_model_id, stream_id))
+        if self._shared_coco is not None:
+            self._shared_coco.discard_stream(stream_id)
+
+    def toggle_detection(self) -> bool:
+        with self._lock:
+            enable = not self._enabled
+        # The local model is pinned in the registry only while detection is on,
+        # so a detector left off is evicted once the idle period passes.
+        if enable and self._model_available:
+            try:
+                self._model_handle.acquire("drone")
+            except Exception as error:
+                logger.error("Error reloading drone model: %s", error)
+                if not self._use_roboflow:
+                    return False
         with self._lock:
-            return self._drone_count
+            self._enabled = enable
+            if not enable:
+                self._streams.clear()
+            logger.info("DroneDetectionService: detection %s", "enabled" if enable else "disabled")
+        if not enable and self._model_handle is not None:
+            self._model_handle.release("drone")
+        return enable
+
+    def get_drone_count(self, stream_id=None) -> int:
+        """Drone count for one stream, or the total across all streams when ``stream_id`` is None."""
+        with self._lock:
+            if stream_id is None:
+                return sum(state.drone_count for state in self._streams.values())
+            state = self._streams.get(stream_id)
+            return state.drone_count if state is not None else 0
 
     def is_enabled(self) -> bool:
         with self._lock:
             return self._enabled
 
-    def detect_drones(self, frame, force: bool = False) -> Optional[object]:
-        if frame is None:
-            return frame
+    def get_batch_stats(self) -> Dict[str, object]:
+        return self._batcher.get_stats()
 
+    def get_active_backend(self) -> str:
+        """``roboflow``, ``local``, ``local_fallback`` (circuit open) or ``unavailable`` (circuit open, no fallback)."""
         with self._lock:
-            if not self._enabled:
-                return self._add_status_overlays(frame, [], False)
+            return self._active_backend
+
+    def get_async_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"enabled": self._use_roboflow and self._async_remote, **self._async_stats}
 
-            self._frame_counter += 1
-            if not force and self._frame_counter % self._detection_interval != 0:
-                frame = self._draw_detections(frame, self._last_detections)
-                return self._add_status_overlays(frame, self._last_detections, True)
+    def get_tracks(self, stream_id=None) -> List[Dict[str, object]]:
+        """Tracked drones of one stream, or of every stream (tagged with ``camera_id``) when ``stream_id`` is None."""
+        with self._lock:
+            states = [(stream_id, self._streams.get(stream_id))] if stream_id is not None else list(self._streams.items())
+        tracks = []
+        for camera_id, state in states:
+            if state is None or state.tracker is None:
+                continue
+            for track in state.tracker.get_tracks():
+                tracks.append(track if stream_id is not None else {"camera_id": camera_id, **track})
+        return tracks
+
+    def track(self, frame, stream_id=None) -> None:
+        """Move this stream's tracked boxes onto ``frame`` (a frame examined between detection runs)."""
+        state = self._streams.get(stream_id)
+        if state is not None and state.tracker is not None:
+            state.tracker.propagate(FrameContext.wrap(frame))
+
+    def annotate(self, frame, stream_id=None):
+        """Draw the most recent drone results without running inference."""
+        # last_detections is replaced, never mutated, so reading it lock-free
+        # keeps the live stream from waiting on an in-flight model call.
+        # Tracked boxes are drawn where the tracker expects the drones to be now.
+        state = self._streams.get(stream_id)
+        if state is None:
+            detections = []
+        elif state.tracker is not None:
+            detections = state.tracker.visible_boxes("drone")
+        else:
+            detections = state.last_detections
+        is_ready = self._enabled and (self._use_roboflow or self._local_model() is not None)
+        frame = self._draw_detections(frame, detections)
+        return self._add_status_overlays(frame, detections, is_ready)
 
-            processed_frame = self._preprocess_frame(frame) if self._enable_preprocessing else frame
+    def run_inference(self, frame, force: bool = False, stream_id=None) -> None:
+        """Update this stream's drone results without drawing on ``frame`` (an image or FrameContext)."""
+        if frame is None:
+            return
+        context = FrameContext.wrap(frame)
 
+        with self._lock:
+            if not self._enabled:
+                return
+
+            state = self._get_stream_state(stream_id)
+            state.frame_counter += 1
+            if not force and state.frame_counter % self._detection_interval != 0:
+                return
+
+            use_roboflow = self._use_roboflow
+            if not use_roboflow and self._local_model() is None:
+                logger.warning("Model not loaded yet, skipping detection")
+                return
+
+        if use_roboflow and self._remote_client.is_circuit_open(self._roboflow_model_id):
+            with self._lock:
+                if self._local_model() is None:
+                    # Backend down and no standby model: drop boxes that can no longer be confirmed.
+                    self._active_backend = "unavailable"
+                    if context.timestamp >= state.result_timestamp:
+                        self._store_detections(state, [], context.timestamp, smooth=not force)
+                    return
+                self._active_backend = "local_fallback"
+            use_roboflow = False
+        elif use_roboflow:
+            self._active_backend = "roboflow"
+
+        # The model call runs outside the service lock so frames from other
+        # cameras can join the same batch and annotate() is never held up.
+        # A near-identical frame seen recently reuses its boxes instead of an API call.
+        cache_entry = None
+        if use_roboflow and not force:
+            cache_entry, cached = self._probe_result_cache(context, stream_id)
+            if cached is not None:
+                with self._lock:
+                    if context.timestamp >= state.result_timestamp:
+                        self._store_detections(state, cached, context.timestamp, filtered=True)
+                return
+
+        # Remote frames are submitted without waiting, so neither this inference
+        # thread nor the other detectors are paced by the network round trip.
+        # Forced runs (uploaded images) still wait for their own result.
+        if use_roboflow and self._async_remote and not force:
             try:
-                # Use Roboflow API if configured, otherwise fall back to local YOLO
-                if self._use_roboflow:
-                    detections = self._roboflow_detect(processed_frame)
-                else:
-                    # Local YOLO detection
-                    if self._model is None:
-                        logger.warning("Model not loaded yet, skipping detection")
-                        return self._add_status_overlays(frame, [], False)
-
-                    results = self._model(
-                        processed_frame,
-                        verbose=False,
-                        conf=self._confidence_threshold,
-                        iou=self._iou_threshold,
-                        classes=self._drone_class_ids,
-                        max_det=20,
-                    )
-
-                    detections: List[Tuple[int, int, int, int, float]] = []
-                    for result in results:
-                        if not hasattr(result, "boxes"):
-                            continue
-
-                        for box in result.boxes:
-                            confidence = float(box.conf[0])
-                            if confidence < self._confidence_threshold:
-                                continue
-                            x1, y1, x2, y2 = map(int, box.xyxy[0])
-                            detections.append((x1, y1, x2, y2, confidence))
-
-                detections = self._filter_temporal_noise(detections)
-                self._last_detections = detections
-                self._drone_count = len(detections)
-
-                frame = self._draw_detections(frame, detections)
-                return self._add_status_overlays(frame, detections, True)
+                self._submit_roboflow(context, state, stream_id, cache_entry)
             except Exception as error:
-                logger.error("Error during drone detection: %s", error)
-                return self._add_status_overlays(frame, self._last_detections, True)
+                logger.error("Error submitting drone detection: %s", error)
+            return
 
-    def _preprocess_frame(self, frame):
         try:
-            lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-            lightness, channel_a, channel_b = cv2.split(lab)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-            lightness = clahe.apply(lightness)
-            merged = cv2.merge([lightness, channel_a, channel_b])
-            return cv2.cvtColor(merged, cv2.COLOR_LAB2BGR)
-        except Exception:
-            return frame
+            # Use Roboflow API if configured, otherwise fall back to local YOLO
+            if use_roboflow:
+                detections = self._roboflow_detect(context)
+                if detections is None:
+                    # A failed request clears the boxes but is not cached.
+                    detections, cache_entry = [], None
+            elif self._shared_coco is not None:
+                # The shared pass sees the clean frame so its boxes serve every consumer.
+                detections = self._shared_coco.detect(
+                    context,
+                    self._drone_class_ids,
+                    self._confidence_threshold,
+                    self._iou_threshold,
+                    stream_id=stream_id,
+                )
+            else:
+                # Letterbox once per frame or motion crop (shared with other models) and equalize the small image.
+                detections = self._batcher.infer_regions(
+                    context,
+                    stream_id=stream_id,
+                    preprocess=(lambda view: view.clahe()) if self._enable_preprocessing else None,
+                    verbose=False,
+                    conf=self._confidence_threshold,
+                    iou=self._iou_threshold,
+                    classes=self._drone_class_ids,
+                    max_det=20,
+                )
+                detections = select(detections, min_confidence=self._confidence_threshold)
+
+            boxes = None
+            with self._lock:
+                if context.timestamp >= state.result_timestamp:
+                    if not use_roboflow:
+                        # Only motion crops were examined; boxes elsewhere carry over.
+                        detections = concat(detections, as_detections(context.keep_outside_regions(state.last_detections)))
+                    boxes = self._store_detections(state, detections, context.timestamp, smooth=not force)
+            # The cache keeps the filtered boxes, so a hit is shown as is.
+            if cache_entry is not None and boxes is not None:
+                self._result_cache.store(*cache_entry, boxes)
+        except Exception as error:
+            logger.error("Error during drone detection: %s", error)
 
-    def _filter_temporal_noise(
-        self, detections: List[Tuple[int, int, int, int, float]]
-    ) -> List[Tuple[int, int, int, int, float]]:
-        if not detections:
-            self._detection_history.append([])
-            if len(self._detection_history) > 4:
-                self._detection_history.pop(0)
-            return []
+    def detect_drones(self, frame, force: bool = False, stream_id=None) -> Optional[object]:
+        if frame is None:
+            return frame
 
-        self._detection_history.append(detections)
-        if len(self._detection_history) > 4:
-            self._detection_history.pop(0)
+        context = FrameContext.wrap(frame)
+        self.run_inference(context, force=force, stream_id=stream_id)
+        return self.annotate(context.frame, stream_id=stream_id)
 
-        if len(self._detection_history) < 2:
+    def _filter_temporal_noise(self, state: _DroneStreamState, detections: np.ndarray) -> np.ndarray:
+        """Keep confident boxes, and weaker ones only if a box of the last three runs was within 90 px."""
+        previous = concat(*list(state.detection_history)[-3:])
+        state.detection_history.append(detections)
+        if len(state.detection_history) < 2 or not len(detections):
             return detections
 
-        filtered: List[Tuple[int, int, int, int, float]] = []
-        previous_frames = self._detection_history[:-1]
+        keep = detections[:, CONFIDENCE] >= 0.65
+        if len(previous):
+            offsets = centers(detections)[:, None, :] - centers(previous)[None, :, :]
+            keep |= (np.hypot(offsets[..., 0], offsets[..., 1]) < 90).any(axis=1)
+        return detections[keep]
 
+    def _draw_detections(self, frame, detections: List[tuple]):
         for detection in detections:
-            x1, y1, x2, y2, confidence = detection
-            center_x = (x1 + x2) / 2
-            center_y = (y1 + y2) / 2
-
-            if confidence >= 0.65:
-                filtered.append(detection)
-                continue
-
-            matched = False
-            for frame_detections in previous_frames:
-                for previous in frame_detections:
-                    px1, py1, px2, py2, _ = previous
-                    previous_center_x = (px1 + px2) / 2
-                    previous_center_y = (py1 + py2) / 2
-                    distance = ((center_x - previous_center_x) ** 2 + (center_y - previous_center_y) ** 2) ** 0.5
-                    if distance < 90:
-                        matched = True
-                        break
-                if matched:
-                    break
-
-            if matched:
-                filtered.append(detection)
-
-        return filtered
-
-    def _draw_detections(self, frame, detections: List[Tuple[int, int, int, int, float]]):
-        for x1, y1, x2, y2, confidence in detections:
+            x1, y1, x2, y2, confidence = detection[:5]
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
 
-            label = f"DRONE {confidence:.2f}"
+            # Tracked boxes carry their track ID as a sixth field.
+            label = f"DRONE #{detection[5]} {confidence:.2f}" if len(detection) > 5 else f"DRONE {confidence:.2f}"
             font = cv2.FONT_HERSHEY_SIMPLEX
             font_scale = 0.6
             thickness = 2
@@ -354,7 +645,7 @@ class DroneDetectionService:
 
         return frame
 
-    def _add_status_overlays(self, frame, detections: List[Tuple[int, int, int, int, float]], is_enabled: bool):
+    def _add_status_overlays(self, frame, detections: List[tuple], is_enabled: bool):
         frame_h, frame_w = frame.shape[:2]
 
         drone_label = f"Drones: {len(detections)}"
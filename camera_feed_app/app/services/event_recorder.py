@@ -0,0 +1,238 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from camera_feed_app.app.services.recording_writer import open_video_writer, write_mjpeg_frame
+
+logger = logging.getLogger(__name__)
+
+
+class _PreEventBuffer:
+    def __init__(self) -> None:
+        self.frames: "deque[Tuple[float, float, bytes]]" = deque()  # (monotonic, wall clock, jpeg)
+        self.bytes = 0
+        self.last_added = 0.0
+
+
+class _EventClip:
+    def __init__(self, camera_id: int, frames: List[Tuple[float, float, bytes]], ends_at: float, deadline: float) -> None:
+        self.camera_id = camera_id
+        self.frames = frames
+        self.bytes = sum(len(frame[2]) for frame in frames)
+        self.triggers: List[Dict[str, object]] = []
+        self.ends_at = ends_at
+        self.deadline = deadline
+
+
+class EventRecorder:
+    """Save a clip around each detection event instead of recording continuously.
+
+    Every camera keeps its last ``pre_seconds`` of frames as JPEG bytes (at
+    most ``buffer_fps`` frames a second and ``max_buffer_mb`` per camera).
+    When :meth:`trigger` reports a detection, that buffer becomes the start
+    of a clip, which keeps collecting frames until ``post_seconds`` after the
+    last trigger, up to ``max_clip_seconds``, and is finished early once it
+    holds ``max_buffer_mb`` of frames, so a long event is saved as several
+    clips instead of growing in memory. Further triggers while a clip is
+    open extend it and are added to its metadata instead of starting another
+    clip. Finished clips are written on a background thread as a video with a
+    JSON sidecar of the same name listing the detections that triggered it.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        fallback_dir: Optional[Path] = None,
+        pre_seconds: float = 5.0,
+        post_seconds: float = 5.0,
+        buffer_fps: float = 10.0,
+        max_buffer_mb: float = 64.0,
+        max_clip_seconds: float = 60.0,
+        triggers: Iterable[str] = ("drone", "knife", "gun", "audio"),
+    ) -> None:
+        self._output_dir = Path(output_dir)
+        self._fallback_dir = Path(fallback_dir) if fallback_dir else self._output_dir
+        self._pre_seconds = max(0.0, float(pre_seconds))
+        self._post_seconds = max(0.0, float(post_seconds))
+        self._frame_gap = 1.0 / buffer_fps if buffer_fps > 0 else 0.0
+        self._max_buffer_bytes = int(max(0.0, float(max_buffer_mb)) * 1e6)
+        self._max_clip_seconds = max(self._post_seconds, float(max_clip_seconds))
+        self._triggers = {name.strip().lower() for name in triggers if name.strip()}
+
+        self._condition = threading.Condition()
+        self._buffers: Dict[int, _PreEventBuffer] = {}
+        self._open_clips: Dict[int, _EventClip] = {}
+        self._recent_clips: "deque[Dict[str, object]]" = deque(maxlen=50)
+        self._clips_written = 0
+        self._clips_failed = 0
+        self._thread = threading.Thread(target=self._run, name="event-recorder", daemon=True)
+        self._thread.start()
+
+    def handles(self, kind: str) -> bool:
+        return kind in self._triggers
+
+    def wants_frame(self, camera_id: int) -> bool:
+        """True when ``camera_id`` is due a buffered frame; lets the caller skip fetching the JPEG otherwise."""
+        buffer = self._buffers.get(camera_id)
+        return buffer is None or time.monotonic() - buffer.last_added >= self._frame_gap
+
+    def add_frame(self, camera_id: int, jpeg: bytes) -> None:
+        now = time.monotonic()
+        entry = (now, time.time(), jpeg)
+        with self._condition:
+            buffer = self._buffers.setdefault(camera_id, _PreEventBuffer())
+            buffer.last_added = now
+            buffer.frames.append(entry)
+            buffer.bytes += len(jpeg)
+            cutoff = now - self._pre_seconds
+            while buffer.frames and (buffer.frames[0][0] < cutoff or buffer.bytes > self._max_buffer_bytes):
+                buffer.bytes -= len(buffer.frames.popleft()[2])
+
+            clip = self._open_clips.get(camera_id)
+            if clip is not None:
+                clip.frames.append(entry)
+                clip.bytes += len(jpeg)
+                if clip.bytes >= self._max_buffer_bytes:
+                    clip.deadline = min(clip.deadline, now)
+                if now >= clip.ends_at or now >= clip.deadline:
+                    self._condition.notify_all()
+
+    def trigger(self, camera_id: int, kind: str, detail: Optional[Dict[str, object]] = None) -> bool:
+        """Report a ``kind`` detection on ``camera_id``; returns True when it opened a new clip."""
+        if kind not in self._triggers:
+            return False
+        now = time.monotonic()
+        with self._condition:
+            clip = self._open_clips.get(camera_id)
+            opened = clip is None
+            if opened:
+                buffer = self._buffers.get(camera_id)
+                clip = _EventClip(
+                    camera_id,
+                    list(buffer.frames) if buffer is not None else [],
+                    ends_at=now + self._post_seconds,
+                    deadline=now + self._max_clip_seconds,
+                )
+                self._open_clips[camera_id] = clip
+                logger.info("Event clip started on camera %s by %s detection", camera_id, kind)
+            clip.ends_at = min(clip.deadline, now + self._post_seconds)
+            # A detection that stays in view extends the clip but is recorded once.
+            if not any(entry["kind"] == kind for entry in clip.triggers):
+                clip.triggers.append(
+                    {
+                        "kind": kind,
+                        "detected_at": datetime.now().isoformat(timespec="milliseconds"),
+                        "detail": detail or {},
+                    }
+                )
+            return opened
+
+    def trigger_all(self, kind: str, detail: Optional[Dict[str, object]] = None) -> None:
+        """Report a detection that belongs to no camera (audio) on every buffering camera."""
+        with self._condition:
+            camera_ids = list(self._buffers)
+        for camera_id in camera_ids:
+            self.trigger(camera_id, kind, detail)
+
+    def drop_camera(self, camera_id: int) -> None:
+        """Forget the camera's buffer and finish its open clip with the frames it has."""
+        with self._condition:
+            self._buffers.pop(camera_id, None)
+            clip = self._open_clips.get(camera_id)
+            if clip is not None:
+                clip.ends_at = 0.0
+                self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait(timeout=0.5)
+                now = time.monotonic()
+                finished = [clip for clip in self._open_clips.values() if now >= clip.ends_at or now >= clip.deadline]
+                for clip in finished:
+                    del self._open_clips[clip.camera_id]
+            for clip in finished:
+                try:
+                    metadata = self._write_clip(clip)
+                except Exception as error:
+                    metadata = None
+                    logger.error("Writing event clip for camera %s failed: %s", clip.camera_id, error)
+                with self._condition:
+                    if metadata is None:
+                        self._clips_failed += 1
+                    else:
+                        self._clips_written += 1
+                        self._recent_clips.appendleft(metadata)
+
+    def _write_clip(self, clip: _EventClip) -> Optional[Dict[str, object]]:
+        if not clip.frames:
+            logger.warning("Event clip for camera %s has no frames", clip.camera_id)
+            return None
+        first = cv2.imdecode(np.frombuffer(clip.frames[0][2], dtype=np.uint8), cv2.IMREAD_COLOR)
+        if first is None:
+            return None
+        height, width = first.shape[:2]
+        duration = clip.frames[-1][0] - clip.frames[0][0]
+        fps = (len(clip.frames) - 1) / duration if duration > 0 else 1.0
+
+        started = datetime.fromtimestamp(clip.frames[0][1])
+        base_name = f"event_cam{clip.camera_id}_{started.strftime('%Y%m%d_%H%M%S')}_{clip.triggers[0]['kind']}"
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        writer, path = open_video_writer(self._output_dir, base_name, round(fps), (width, height))
+        if writer is not None:
+            try:
+                for _, _, jpeg in clip.frames:
+                    frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    if frame is not None and frame.shape[:2] == (height, width):
+                        writer.write(frame)
+            finally:
+                writer.release()
+        else:
+            # No working codec: keep the JPEGs as they are, like the manual recording fallback.
+            self._fallback_dir.mkdir(parents=True, exist_ok=True)
+            path = self._fallback_dir / f"{base_name}.mjpeg"
+            with open(path, "wb") as file_handle:
+                for _, _, jpeg in clip.frames:
+                    write_mjpeg_frame(file_handle, jpeg)
+
+        metadata = {
+            "clip": path.name,
+            "camera_id": clip.camera_id,
+            "started_at": started.isoformat(timespec="milliseconds"),
+            "ended_at": datetime.fromtimestamp(clip.frames[-1][1]).isoformat(timespec="milliseconds"),
+            "duration_s": round(duration, 2),
+            "frames": len(clip.frames),
+            "fps": round(fps, 1),
+            "pre_seconds": self._pre_seconds,
+            "post_seconds": self._post_seconds,
+            "triggers": clip.triggers,
+        }
+        path.with_suffix(".json").write_text(json.dumps(metadata, indent=2, default=str))
+        logger.info("Event clip saved: %s (%s frames, %s)", path, len(clip.frames), ", ".join(t["kind"] for t in clip.triggers))
+        return metadata
+
+    def get_recent_clips(self, limit: int = 20) -> List[Dict[str, object]]:
+        with self._condition:
+            return list(self._recent_clips)[: max(0, limit)]
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                "triggers": sorted(self._triggers),
+                "buffered_mb": {
+                    camera_id: round(buffer.bytes / 1e6, 1) for camera_id, buffer in self._buffers.items()
+                },
+                "open_clips": {
+                    camera_id: [entry["kind"] for entry in clip.triggers] for camera_id, clip in self._open_clips.items()
+                },
+                "clips_written": self._clips_written,
+                "clips_failed": self._clips_failed,
+            }
@@ -1,7 +1,19 @@
 import threading
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 import cv2
+import numpy as np
+
+from camera_feed_app.app.services.frame_context import FrameContext
+
+
+class _FaceStreamState:
+    """Per-camera face results; the cascade itself is shared by all cameras."""
+
+    def __init__(self) -> None:
+        self.frame_counter = 0
+        self.face_count = 0
+        self.last_faces: List[Tuple[int, int, int, int]] = []
 
 
 class FaceDetectionService:
@@ -38,9 +50,7 @@ class FaceDetectionService:
         self._detection_interval = max(1, detection_interval)
 
         self._enabled = False
-        self._face_count = 0
-        self._frame_counter = 0
-        self._last_faces: List[Tuple[int, int, int, int]] = []
+        self._streams: Dict[object, _FaceStreamState] = {}
 
     def load_model(self) -> bool:
         with self._lock:
@@ -55,47 +65,101 @@ class FaceDetectionService:
             self._cascade = cascade
             return True
 
+    def warmup(self) -> None:
+        """Run the cascade once on a blank image so its first live frame is not slowed by lazy setup."""
+        cascade = self._cascade
+        if cascade is not None:
+            cascade.detectMultiScale(
+                np.zeros((480, 640), dtype=np.uint8),
+                scaleFactor=self._scale_factor,
+                minNeighbors=self._min_neighbors,
+                minSize=self._min_size,
+            )
+
+    def _get_stream_state(self, stream_id) -> _FaceStreamState:
+        state = self._streams.get(stream_id)
+        if state is None:
+            state = _FaceStreamState()
+            self._streams[stream_id] = state
+        return state
+
+    def is_due(self, stream_id=None) -> bool:
+        """True when the next unforced run_inference call for ``stream_id`` will examine its frame."""
+        with self._lock:
+            state = self._streams.get(stream_id)
+            frame_counter = state.frame_counter if state is not None else 0
+            return (frame_counter + 1) % self._detection_interval == 0
+
+    def discard_stream(self, stream_id) -> None:
+        with self._lock:
+            self._streams.pop(stream_id, None)
+
     def toggle_detection(self) -> bool:
         with self._lock:
             self._enabled = not self._enabled
             if not self._enabled:
-                self._face_count = 0
-                self._last_faces = []
+                self._streams.clear()
             return self._enabled
 
-    def get_face_count(self) -> int:
+    def get_face_count(self, stream_id=None) -> int:
+        """Face count for one stream, or the total across all streams when ``stream_id`` is None."""
         with self._lock:
-            return int(self._face_count)
+            if stream_id is None:
+                return sum(state.face_count for state in self._streams.values())
+            state = self._streams.get(stream_id)
+            return int(state.face_count) if state is not None else 0
 
     def is_enabled(self) -> bool:
         with self._lock:
             return bool(self._enabled)
 
-    def detect_faces(self, frame, force: bool = False):
+    def run_inference(self, frame, force: bool = False, stream_id=None) -> None:
+        """Update this stream's face results without drawing on ``frame`` (an image or FrameContext)."""
+        context = FrameContext.wrap(frame)
         with self._lock:
             enabled = self._enabled
             has_model = self._cascade is not None or self.load_model()
-            self._frame_counter += 1
-
-            if enabled and has_model and (force or self._frame_counter % self._detection_interval == 0):
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                detected = self._cascade.detectMultiScale(
-                    gray,
-                    scaleFactor=self._scale_factor,
-                    minNeighbors=self._min_neighbors,
-                    minSize=self._min_size,
-                )
-                self._last_faces = [tuple(face) for face in detected]
-                self._face_count = len(self._last_faces)
+            state = self._get_stream_state(stream_id)
+            state.frame_counter += 1
+
+            if enabled and has_model and (force or state.frame_counter % self._detection_interval == 0):
+                faces = []
+                # Scan only the motion crops when the pipeline provides them.
+                for view in context.region_views():
+                    detected = self._cascade.detectMultiScale(
+                        view.gray(),
+                        scaleFactor=self._scale_factor,
+                        minNeighbors=self._min_neighbors,
+                        minSize=self._min_size,
+                    )
+                    for x, y, w, h in detected:
+                        x1, y1, x2, y2 = view.to_source_box(x, y, x + w, y + h)
+                        faces.append((x1, y1, x2 - x1, y2 - y1))
+                if context.regions:
+                    kept = context.keep_outside_regions([(x, y, x + w, y + h) for x, y, w, h in state.last_faces])
+                    faces.extend((x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in kept)
+                state.last_faces = faces
+                state.face_count = len(state.last_faces)
 
             if not enabled:
-                self._face_count = 0
-                self._last_faces = []
-
-            faces_to_draw = list(self._last_faces)
-            face_count = self._face_count
-            detection_text = "ON" if enabled and has_model else "OFF"
-
+                state.face_count = 0
+                state.last_faces = []
+
+    def detect_faces(self, frame, force: bool = False, stream_id=None):
+        context = FrameContext.wrap(frame)
+        self.run_inference(context, force=force, stream_id=stream_id)
+        return self.annotate(context.frame, stream_id=stream_id)
+
+    def annotate(self, frame, stream_id=None):
+        """Draw the most recent face results without running the cascade."""
+        # last_faces is replaced, never mutated, so this read does not need the
+        # lock and never waits behind a running detectMultiScale call.
+        state = self._streams.get(stream_id)
+        faces_to_draw = state.last_faces if state is not None else []
+        detection_text = "ON" if self._enabled and self._cascade is not None else "OFF"
+        return self._draw_faces(frame, faces_to_draw, len(faces_to_draw), detection_text)
+
+    def _draw_faces(self, frame, faces_to_draw: List[Tuple[int, int, int, int]], face_count: int, detection_text: str):
         for (x, y, w, h) in faces_to_draw:
             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 255), 2)
 
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+
+class FrameRingBuffer:
+    """Small ring buffer holding the most recent captured frames.
+
+    The capture thread publishes every frame it reads; consumers such as the
+    inference stage always take the newest entry and skip anything older, so a
+    slow consumer never forces the producer to wait or queue stale frames.
+    """
+
+    def __init__(self, capacity: int = 3) -> None:
+        self._condition = threading.Condition()
+        self._frames = deque(maxlen=max(1, capacity))
+        self._sequence = 0
+        self._closed = False
+
+    def publish(self, frame) -> int:
+        with self._condition:
+            self._sequence += 1
+            self._frames.append((self._sequence, time.time(), frame))
+            self._closed = False
+            self._condition.notify_all()
+            return self._sequence
+
+    def latest(self) -> Optional[Tuple[int, float, object]]:
+        with self._condition:
+            if not self._frames:
+                return None
+            return self._frames[-1]
+
+    def wait_for_newer(self, sequence: int, timeout: float = 0.5) -> Optional[Tuple[int, float, object]]:
+        """Block until a frame newer than ``sequence`` is published and return the newest one."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._closed or (self._frames and self._frames[-1][0] > sequence),
+                timeout=timeout,
+            )
+            if self._closed or not self._frames or self._frames[-1][0] <= sequence:
+                return None
+            return self._frames[-1]
+
+    def get_sequence(self) -> int:
+        with self._condition:
+            return self._sequence
+
+    def clear(self) -> None:
+        """Drop buffered frames and wake any waiting consumers."""
+        with self._condition:
+            self._frames.clear()
+            self._closed = True
+            self._condition.notify_all()
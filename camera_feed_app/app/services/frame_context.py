@@ -0,0 +1,232 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+_clahe_local = threading.local()
+
+
+def get_clahe(clip_limit: float = 2.0, tile_grid_size: Tuple[int, int] = (8, 8)):
+    """Return a cached CLAHE object for this thread; OpenCV CLAHE instances are not thread-safe."""
+    instances = getattr(_clahe_local, "instances", None)
+    if instances is None:
+        instances = {}
+        _clahe_local.instances = instances
+
+    key = (float(clip_limit), tuple(tile_grid_size))
+    clahe = instances.get(key)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=key[0], tileGridSize=key[1])
+        instances[key] = clahe
+    return clahe
+
+
+def boxes_intersect(first: Sequence[float], second: Sequence[float]) -> bool:
+    return first[0] < second[2] and second[0] < first[2] and first[1] < second[3] and second[1] < first[3]
+
+
+def region_inference_size(views: Sequence["FrameContext"], max_size: int = 640, step: int = 160) -> int:
+    """Model input size for a set of region crops: the largest crop side rounded up to ``step``, at most ``max_size``.
+
+    Crops are letterboxed to one shared size, so all crops of a frame go to
+    the model as a single batch without being blown up to full resolution.
+    """
+    longest = max((max(view.shape[:2]) for view in views), default=max_size)
+    return int(min(max_size, max(step, -(-longest // step) * step)))
+
+
+class FrameContext:
+    """A captured frame plus lazily computed views shared by everything that looks at it.
+
+    Low-light probing, face detection, drone preprocessing and the YOLO models
+    all need derived images of the same frame. Each view is computed on first
+    use and memoized, so it is built at most once per frame no matter how many
+    detectors ask for it. Resized and letterboxed views are themselves
+    FrameContexts, which lets views compose (``ctx.letterbox().clahe()``) and
+    lets boxes found in a view be mapped back with :meth:`to_source_box`.
+
+    ``regions`` optionally lists the parts of the frame worth examining
+    (motion crops); ``None`` means the whole frame.
+
+    The frame and every view are shared between threads and must be treated as
+    read-only.
+    """
+
+    def __init__(
+        self,
+        frame,
+        camera_id=None,
+        sequence: int = 0,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        self.frame = frame
+        self.camera_id = camera_id
+        self.sequence = sequence
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+        self._lock = threading.RLock()
+        self._views: Dict[object, object] = {}
+        # (scale_x, scale_y, pad_x, pad_y, source_width, source_height) when this is a view of another frame.
+        self._source_transform: Optional[Tuple[float, float, int, int, int, int]] = None
+        # Set when the frame this view came from is itself a view, so mapping continues up the chain.
+        self._source_view: Optional["FrameContext"] = None
+        self.regions: Optional[List[Tuple[int, int, int, int]]] = None
+
+    @classmethod
+    def wrap(cls, frame, camera_id=None) -> "FrameContext":
+        """Return ``frame`` if it already is a FrameContext, otherwise a new context around it."""
+        if isinstance(frame, FrameContext):
+            return frame
+        return cls(frame, camera_id=camera_id)
+
+    def derive(self, frame) -> "FrameContext":
+        """A context for a transformed copy of this frame, keeping its identity but none of its views."""
+        return FrameContext(frame, camera_id=self.camera_id, sequence=self.sequence, timestamp=self.timestamp)
+
+    @property
+    def shape(self):
+        return self.frame.shape
+
+    def _view(self, key, build: Callable[[], object]):
+        with self._lock:
+            view = self._views.get(key)
+            if view is None:
+                view = build()
+                self._views[key] = view
+            return view
+
+    def gray(self):
+        return self._view("gray", lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY))
+
+    def lab(self):
+        return self._view("lab", lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2LAB))
+
+    def clahe(self, clip_limit: float = 2.0, tile_grid_size: Tuple[int, int] = (8, 8)):
+        """BGR image with CLAHE applied to the LAB lightness channel."""
+
+        def build():
+            lightness, channel_a, channel_b = cv2.split(self.lab())
+            lightness = get_clahe(clip_limit, tile_grid_size).apply(lightness)
+            return cv2.cvtColor(cv2.merge((lightness, channel_a, channel_b)), cv2.COLOR_LAB2BGR)
+
+        return self._view(("clahe", float(clip_limit), tuple(tile_grid_size)), build)
+
+    def resized(self, width: int, height: int) -> "FrameContext":
+        """Downscaled view of the frame, e.g. for cheap luminance or motion probes."""
+
+        def build():
+            source_h, source_w = self.frame.shape[:2]
+            image = self.frame
+            if (width, height) != (source_w, source_h):
+                image = cv2.resize(self.frame, (width, height), interpolation=cv2.INTER_AREA)
+            return self._make_view(image, (width / float(source_w), height / float(source_h), 0, 0, source_w, source_h))
+
+        return self._view(("resized", int(width), int(height)), build)
+
+    def fit_within(self, max_side: int) -> "FrameContext":
+        """Aspect-preserving view whose longer side is at most ``max_side``; never upscales (0 keeps the size)."""
+        source_h, source_w = self.frame.shape[:2]
+        scale = 1.0
+        if max_side > 0:
+            scale = min(1.0, max_side / float(max(source_w, source_h)))
+        width = max(1, int(round(source_w * scale)))
+        height = max(1, int(round(source_h * scale)))
+        return self.resized(width, height)
+
+    def letterbox(self, size: int = 640, stride: int = 32) -> "FrameContext":
+        """Aspect-preserving resize to ``size`` with stride-aligned padding, as ultralytics does internally.
+
+        Feeding this view to a YOLO model makes its own letterbox a no-op, so
+        several models reading the same frame share one resize, and frames of
+        the same aspect ratio from different cameras batch together.
+        """
+
+        def build():
+            source_h, source_w = self.frame.shape[:2]
+            scale = min(size / float(source_h), size / float(source_w))
+            new_w, new_h = int(round(source_w * scale)), int(round(source_h * scale))
+            image = self.frame
+            if (new_w, new_h) != (source_w, source_h):
+                image = cv2.resize(self.frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+            pad_w = (-new_w) % stride
+            pad_h = (-new_h) % stride
+            left = pad_w // 2
+            top = pad_h // 2
+            if pad_w or pad_h:
+                image = cv2.copyMakeBorder(
+                    image,
+                    top,
+                    pad_h - top,
+                    left,
+                    pad_w - left,
+                    cv2.BORDER_CONSTANT,
+                    value=(114, 114, 114),
+                )
+
+            return self._make_view(image, (scale, scale, left, top, source_w, source_h))
+
+        return self._view(("letterbox", int(size), int(stride)), build)
+
+    def crop(self, x1: int, y1: int, x2: int, y2: int) -> "FrameContext":
+        """View of a rectangle of the frame (no copy); boxes found in it map back with :meth:`to_source_box`."""
+        source_h, source_w = self.frame.shape[:2]
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(source_w, int(x2)), min(source_h, int(y2))
+
+        def build():
+            return self._make_view(self.frame[y1:y2, x1:x2], (1.0, 1.0, -x1, -y1, source_w, source_h))
+
+        return self._view(("crop", x1, y1, x2, y2), build)
+
+    def region_views(self) -> List["FrameContext"]:
+        """Crops of :attr:`regions`, or just this context when the whole frame should be examined."""
+        if not self.regions:
+            return [self]
+        return [self.crop(*region) for region in self.regions]
+
+    def keep_outside_regions(self, boxes: Sequence[tuple]) -> List[tuple]:
+        """Boxes (x1, y1, x2, y2, ...) that no region covers; they carry over when only regions are re-examined."""
+        if not self.regions:
+            return []
+        return [box for box in boxes if not any(boxes_intersect(box, region) for region in self.regions)]
+
+    def _make_view(self, image, transform: Tuple[float, float, int, int, int, int]) -> "FrameContext":
+        view = self.derive(image)
+        view._source_transform = transform
+        if self._source_transform is not None:
+            view._source_view = self
+        return view
+
+    def _map_to_source(self, x1: float, y1: float, x2: float, y2: float) -> Tuple[float, float, float, float]:
+        if self._source_transform is None:
+            return x1, y1, x2, y2
+
+        scale_x, scale_y, pad_x, pad_y, source_w, source_h = self._source_transform
+        mapped = (
+            max(0.0, min(source_w, (x1 - pad_x) / scale_x)),
+            max(0.0, min(source_h, (y1 - pad_y) / scale_y)),
+            max(0.0, min(source_w, (x2 - pad_x) / scale_x)),
+            max(0.0, min(source_h, (y2 - pad_y) / scale_y)),
+        )
+        if self._source_view is not None:
+            return self._source_view._map_to_source(*mapped)
+        return mapped
+
+    def to_source_box(self, x1: float, y1: float, x2: float, y2: float) -> Tuple[int, int, int, int]:
+        """Map a box found in this view back to the coordinates of the original frame, through any chain of views."""
+        mapped = self._map_to_source(x1, y1, x2, y2)
+        return int(mapped[0]), int(mapped[1]), int(mapped[2]), int(mapped[3])
+
+    def to_source_boxes(self, boxes) -> np.ndarray:
+        """Vectorized :meth:`to_source_box` for an ``(N, 4)`` corner array; returns float32 source-frame corners."""
+        mapped = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+        view = self
+        while view is not None and view._source_transform is not None:
+            scale_x, scale_y, pad_x, pad_y, source_w, source_h = view._source_transform
+            mapped[:, 0::2] = np.clip((mapped[:, 0::2] - pad_x) / scale_x, 0.0, source_w)
+            mapped[:, 1::2] = np.clip((mapped[:, 1::2] - pad_y) / scale_y, 0.0, source_h)
+            view = view._source_view
+        return mapped
@@ -0,0 +1,159 @@
+import logging
+import threading
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from camera_feed_app.app.services.frame_context import FrameContext, get_clahe
+
+logger = logging.getLogger(__name__)
+
+
+class _LowLightStreamState:
+    """Per-camera luminance estimate; LUTs are shared by all cameras."""
+
+    def __init__(self) -> None:
+        self.frame_counter = 0
+        self.is_dark = False
+        self.gain = 1.0
+        self.luma: Optional[float] = None
+
+
+class LowLightEnhancer:
+    """Brighten dark camera frames.
+
+    ``quality`` mode measures every frame and runs gain, a full-resolution LAB
+    CLAHE and a gamma LUT as separate passes. ``fast`` mode keeps the same
+    look at a fraction of the cost:
+
+    - luminance is re-estimated only every ``estimate_interval`` frames, with
+      hysteresis so scenes near the threshold do not flicker on and off;
+    - gain and gamma are folded into one 256-entry LUT, cached per gain step;
+    - CLAHE runs on the luma channel only (YCrCb rather than LAB, avoiding the
+      costly non-linear conversion), at ``clahe_scale`` of the frame size, and
+      the resulting correction is upsampled onto the full resolution channel.
+    """
+
+    MODES = ("fast", "quality")
+    _GAIN_STEP = 0.05
+
+    def __init__(
+        self,
+        luma_threshold: float = 70,
+        clahe_clip_limit: float = 2.8,
+        gamma: float = 1.35,
+        max_gain: float = 2.8,
+        mode: str = "fast",
+        estimate_interval: int = 10,
+        hysteresis: float = 6.0,
+        clahe_scale: float = 0.5,
+    ) -> None:
+        self._lock = threading.RLock()
+
+        self._luma_threshold = float(luma_threshold)
+        self._clahe_clip_limit = float(clahe_clip_limit)
+        self._gamma = max(float(gamma), 0.1)
+        self._max_gain = max(1.0, float(max_gain))
+        self._mode = mode if mode in self.MODES else "fast"
+        if mode not in self.MODES:
+            logger.warning("Unknown LOW_LIGHT_MODE %r, using 'fast'", mode)
+        self._estimate_interval = max(1, int(estimate_interval))
+        self._hysteresis = max(0.0, float(hysteresis))
+        self._clahe_scale = min(1.0, max(0.1, float(clahe_scale)))
+
+        self._streams: Dict[object, _LowLightStreamState] = {}
+        self._luts: Dict[float, np.ndarray] = {}
+        self._gamma_lut = self._build_lut(1.0)
+
+    def get_mode(self) -> str:
+        return self._mode
+
+    def discard_stream(self, stream_id) -> None:
+        with self._lock:
+            self._streams.pop(stream_id, None)
+
+    def enhance(self, context: FrameContext, stream_id=None, force_estimate: bool = False) -> FrameContext:
+        """Return ``context`` untouched for bright frames, or a context for the enhanced frame."""
+        if self._mode == "quality":
+            return self._enhance_quality(context)
+
+        gain = self._update_estimate(context, stream_id, force_estimate)
+        if gain is None:
+            return context
+        return context.derive(self._enhance_fast(context.frame, gain))
+
+    def _measure_luma(self, context: FrameContext) -> float:
+        return float(context.resized(160, 90).gray().mean())
+
+    def _update_estimate(self, context: FrameContext, stream_id, force_estimate: bool) -> Optional[float]:
+        with self._lock:
+            state = self._streams.get(stream_id)
+            if state is None:
+                state = _LowLightStreamState()
+                self._streams[stream_id] = state
+            state.frame_counter += 1
+            should_measure = force_estimate or state.luma is None or state.frame_counter % self._estimate_interval == 0
+            if not should_measure:
+                return state.gain if state.is_dark else None
+
+        luma = self._measure_luma(context)
+
+        with self._lock:
+            state.luma = luma
+            if state.is_dark:
+                state.is_dark = luma < self._luma_threshold + self._hysteresis
+            else:
+                state.is_dark = luma < self._luma_threshold
+
+            if state.is_dark:
+                raw_gain = min(self._max_gain, self._luma_threshold / max(luma, 1.0))
+                # Quantized so the fused LUT is reused until the scene changes noticeably.
+                state.gain = max(1.0, round(raw_gain / self._GAIN_STEP) * self._GAIN_STEP)
+            else:
+                state.gain = 1.0
+            return state.gain if state.is_dark else None
+
+    def _build_lut(self, gain: float) -> np.ndarray:
+        inv_gamma = 1.0 / self._gamma
+        values = np.clip(np.arange(256, dtype=np.float32) * gain, 0, 255) / 255.0
+        return np.clip((values ** inv_gamma) * 255.0, 0, 255).astype(np.uint8)
+
+    def _get_lut(self, gain: float) -> np.ndarray:
+        with self._lock:
+            lut = self._luts.get(gain)
+            if lut is None:
+                lut = self._build_lut(gain)
+                self._luts[gain] = lut
+            return lut
+
+    def _equalize_lightness(self, lightness):
+        clahe = get_clahe(self._clahe_clip_limit, (8, 8))
+        if self._clahe_scale >= 1.0:
+            return clahe.apply(lightness)
+
+        height, width = lightness.shape[:2]
+        small_size = (max(8, int(width * self._clahe_scale)), max(8, int(height * self._clahe_scale)))
+        small = cv2.resize(lightness, small_size, interpolation=cv2.INTER_AREA)
+        correction = cv2.subtract(clahe.apply(small), small, dtype=cv2.CV_16S)
+        correction = cv2.resize(correction, (width, height), interpolation=cv2.INTER_LINEAR)
+        return cv2.add(lightness, correction, dtype=cv2.CV_8U)
+
+    def _enhance_fast(self, frame, gain: float):
+        brightened = cv2.LUT(frame, self._get_lut(gain))
+        # YCrCb is a linear transform, several times cheaper than the LAB round-trip,
+        # and its Y channel carries the lightness that CLAHE needs.
+        luma, chroma_r, chroma_b = cv2.split(cv2.cvtColor(brightened, cv2.COLOR_BGR2YCrCb))
+        luma = self._equalize_lightness(luma)
+        return cv2.cvtColor(cv2.merge((luma, chroma_r, chroma_b)), cv2.COLOR_YCrCb2BGR)
+
+    def _enhance_quality(self, context: FrameContext) -> FrameContext:
+        avg_luma = self._measure_luma(context)
+        if avg_luma >= self._luma_threshold:
+            return context
+
+        gain = min(self._max_gain, self._luma_threshold / max(avg_luma, 1.0))
+        frame_gain = cv2.convertScaleAbs(context.frame, alpha=gain, beta=0)
+
+        enhanced_bgr = context.derive(frame_gain).clahe(self._clahe_clip_limit)
+        return context.derive(cv2.LUT(enhanced_bgr, self._gamma_lut))
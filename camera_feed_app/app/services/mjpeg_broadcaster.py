@@ -0,0 +1,103 @@
+import threading
+from typing import Optional, Tuple
+
+import cv2
+
+
+class MjpegBroadcaster:
+    """Encode each published frame once and fan the JPEG out to every stream client.
+
+    Frames are tagged with a monotonically increasing sequence number. Clients
+    block on a condition variable until a sequence newer than the one they last
+    sent is available, so they never receive duplicates and the encode cost
+    does not grow with the number of viewers. Frames published while nobody is
+    watching are only encoded if someone asks for them.
+    """
+
+    def __init__(self, jpeg_quality: int = 95) -> None:
+        self._condition = threading.Condition()
+        self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(max(1, min(100, jpeg_quality)))]
+        self._sequence = 0
+        self._pending_frame = None
+        self._encoded: Optional[bytes] = None
+        self._encoded_sequence = 0
+        self._clients = 0
+        self._encode_count = 0
+
+    def add_client(self) -> None:
+        with self._condition:
+            self._clients += 1
+
+    def remove_client(self) -> None:
+        with self._condition:
+            self._clients = max(0, self._clients - 1)
+
+    def get_client_count(self) -> int:
+        with self._condition:
+            return self._clients
+
+    def get_encode_count(self) -> int:
+        with self._condition:
+            return self._encode_count
+
+    def publish(self, frame) -> int:
+        """Publish a frame that will not be modified afterwards."""
+        with self._condition:
+            self._sequence += 1
+            sequence = self._sequence
+            if self._clients == 0:
+                # Nobody is watching: keep the frame and encode it only on demand.
+                self._pending_frame = frame
+                return sequence
+            self._pending_frame = None
+
+        # Encode outside the condition so waiting clients and status calls are not held up.
+        encoded = self._encode(frame)
+        with self._condition:
+            if encoded is not None and sequence > self._encoded_sequence:
+                self._encoded = encoded
+                self._encoded_sequence = sequence
+                self._encode_count += 1
+            self._condition.notify_all()
+        return sequence
+
+    def latest(self) -> Optional[Tuple[int, bytes]]:
+        with self._condition:
+            self._encode_pending_locked()
+            if self._encoded is None:
+                return None
+            return self._encoded_sequence, self._encoded
+
+    def wait_for_frame(self, after_sequence: int, timeout: float = 1.0) -> Optional[Tuple[int, bytes]]:
+        """Block until a frame newer than ``after_sequence`` is encoded and return it."""
+        with self._condition:
+            self._encode_pending_locked()
+            self._condition.wait_for(
+                lambda: self._encoded is not None and self._encoded_sequence > after_sequence,
+                timeout=timeout,
+            )
+            if self._encoded is None or self._encoded_sequence <= after_sequence:
+                return None
+            return self._encoded_sequence, self._encoded
+
+    def clear(self) -> None:
+        """Forget the last frame so new clients do not see a stale image."""
+        with self._condition:
+            self._pending_frame = None
+            self._encoded = None
+
+    def _encode_pending_locked(self) -> None:
+        if self._pending_frame is None:
+            return
+        encoded = self._encode(self._pending_frame)
+        self._pending_frame = None
+        if encoded is not None:
+            self._encoded = encoded
+            self._encoded_sequence = self._sequence
+            self._encode_count += 1
+
+    def _encode(self, frame) -> Optional[bytes]:
+        ok, encoded = cv2.imencode(".jpg", frame, self._encode_params)
+        if not ok:
+            return None
+        return encoded.tobytes()
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PreloadJob:
+    def __init__(self, name: str, load: Callable[[], bool], warmup: Optional[Callable[[], None]]) -> None:
+        self.name = name
+        self.load = load
+        self.warmup = warmup
+        self.state = ModelPreloader.PENDING
+        self.load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+
+class ModelPreloader:
+    """Load configured models on a background thread at startup and warm them up.
+
+    Each registered model goes ``pending`` -> ``loading`` -> ``warming`` ->
+    ``ready`` (or ``failed`` when its loader returns False or raises). The
+    warmup runs one inference on a blank frame, so lazy framework setup is
+    paid before the first live frame. Models are loaded one after another on
+    a single daemon thread; callers that need a model can :meth:`wait` for it
+    without holding any lock the rest of the app uses.
+    """
+
+    PENDING = "pending"
+    LOADING = "loading"
+    WARMING = "warming"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, _PreloadJob]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, load: Callable[[], bool], warmup: Optional[Callable[[], None]] = None) -> None:
+        with self._lock:
+            self._jobs[name] = _PreloadJob(name, load, warmup)
+
+    def start(self) -> None:
+        """Start the background loader once; later calls do nothing."""
+        with self._lock:
+            if self._thread is not None or not self._jobs:
+                return
+            self._thread = threading.Thread(target=self._run, name="model-preload", daemon=True)
+            self._thread.start()
+
+    def is_started(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def _run(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self._run_job(job)
+        logger.info(
+            "Model preload finished: %s",
+            ", ".join(f"{job.name}={job.state}" for job in jobs),
+        )
+
+    def _run_job(self, job: _PreloadJob) -> None:
+        job.state = self.LOADING
+        started = time.perf_counter()
+        try:
+            loaded = bool(job.load())
+        except Exception as error:
+            loaded = False
+            job.error = str(error)
+        job.load_ms = round(1000.0 * (time.perf_counter() - started), 1)
+        if not loaded:
+            job.state = self.FAILED
+            job.error = job.error or "model failed to load"
+            logger.warning("Preloading %s failed after %.0f ms: %s", job.name, job.load_ms, job.error)
+            job.done.set()
+            return
+
+        if job.warmup is not None:
+            job.state = self.WARMING
+            started = time.perf_counter()
+            try:
+                job.warmup()
+            except Exception as error:
+                # A failed warmup only means the first live frame pays the setup cost.
+                job.error = f"warmup failed: {error}"
+                logger.warning("Warmup of %s failed: %s", job.name, error)
+            job.warmup_ms = round(1000.0 * (time.perf_counter() - started), 1)
+
+        job.state = self.READY
+        logger.info("Model %s ready (load %.0f ms, warmup %s ms)", job.name, job.load_ms, job.warmup_ms)
+        job.done.set()
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Block until ``name`` finished preloading; True when it is ready.
+
+        Returns False at once for models that are not registered or whose
+        preload has not been started, so callers fall back to loading them
+        lazily.
+        """
+        with self._lock:
+            job = self._jobs.get(name)
+            started = self._thread is not None
+        if job is None or not started:
+            return False
+        job.done.wait(timeout)
+        return job.state == self.READY
+
+    def get_state(self, name: str) -> Optional[str]:
+        with self._lock:
+            job = self._jobs.get(name)
+            return job.state if job is not None else None
+
+    def get_status(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                name: {
+                    "state": job.state,
+                    "load_ms": job.load_ms,
+                    "warmup_ms": job.warmup_ms,
+                    "error": job.error,
+                }
+                for name, job in self._jobs.items()
+            }
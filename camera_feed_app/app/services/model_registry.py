@@ -0,0 +1,259 @@
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def model_key(kind: str, path: str) -> str:
+    """Registry key for the weights at ``path``; services loading the same file get the same key."""
+    return f"{kind}:{os.path.realpath(os.path.expanduser(str(path)))}"
+
+
+def _process_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def _parameter_bytes(model) -> Optional[int]:
+    """Bytes held by a model's weights: torch parameters and buffers (Ultralytics wraps them in ``.model``) or Keras weights."""
+    module = getattr(model, "model", model)
+    try:
+        if callable(getattr(module, "parameters", None)):
+            tensors = list(module.parameters())
+            if callable(getattr(module, "buffers", None)):
+                tensors += list(module.buffers())
+            return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+        if callable(getattr(model, "get_weights", None)):
+            return sum(weight.nbytes for weight in model.get_weights())
+    except Exception as error:
+        logger.debug("Could not size model weights: %s", error)
+    return None
+
+
+class _RegisteredModel:
+    def __init__(self, key: str, loader: Callable[[], object]) -> None:
+        self.key = key
+        self.loader = loader
+        self.model = None
+        self.users: Set[str] = set()
+        self.last_used = time.monotonic()
+        self.last_used_at = time.time()
+        self.loads = 0
+        self.evictions = 0
+        self.load_ms: Optional[float] = None
+        self.memory_bytes: Optional[int] = None
+        self.memory_source: Optional[str] = None
+        self.load_lock = threading.Lock()
+        # Held around every model call: a deduplicated model may be used by several batch workers.
+        self.inference_lock = threading.Lock()
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+        self.last_used_at = time.time()
+
+
+class ModelHandle:
+    """A service's reference to one registry model; the model itself stays owned by the registry."""
+
+    def __init__(self, registry: "ModelRegistry", entry: _RegisteredModel) -> None:
+        self._registry = registry
+        self._entry = entry
+
+    @property
+    def key(self) -> str:
+        return self._entry.key
+
+    @property
+    def inference_lock(self) -> threading.Lock:
+        return self._entry.inference_lock
+
+    def load(self):
+        """Return the model, loading it first if it was never loaded or has been evicted. Loader errors propagate."""
+        return self._registry._load(self._entry)
+
+    def acquire(self, user: str):
+        """Pin the model for ``user`` (it is not evicted while any user holds it) and return it, loading if needed."""
+        with self._registry._lock:
+            self._entry.users.add(user)
+            self._entry.touch()
+        try:
+            return self._registry._load(self._entry)
+        except Exception:
+            self.release(user)
+            raise
+
+    def release(self, user: str) -> None:
+        """Unpin the model for ``user``; once no user holds it, it is evicted after the registry's idle period."""
+        with self._registry._lock:
+            self._entry.users.discard(user)
+            self._entry.touch()
+
+    def get(self):
+        """The loaded model, or None when it is not loaded; never loads."""
+        entry = self._entry
+        model = entry.model
+        if model is not None:
+            entry.touch()
+        return model
+
+    def is_loaded(self) -> bool:
+        return self._entry.model is not None
+
+
+class ModelRegistry:
+    """Process-wide owner of the loaded models.
+
+    Services register their weights under a :func:`model_key`, so two
+    services asking for the same file share one loaded instance. A service
+    ``acquire``s the model while its detector is enabled and ``release``s it
+    when the detector is turned off; a model that no service holds and that
+    has not been used for ``idle_seconds`` is dropped, and loaded again the
+    next time a service asks for it. ``idle_seconds`` of 0 keeps every model
+    for the life of the process.
+
+    Each model's memory is reported from its weight tensors when they can be
+    sized, otherwise from the growth of the process's resident set while it
+    was loading.
+    """
+
+    def __init__(self, idle_seconds: float = 0.0, check_seconds: Optional[float] = None) -> None:
+        self._lock = threading.RLock()
+        self._idle_seconds = max(0.0, float(idle_seconds))
+        if check_seconds is None:
+            check_seconds = min(60.0, self._idle_seconds / 4.0)
+        self._check_seconds = max(1.0, float(check_seconds))
+        self._models: Dict[str, _RegisteredModel] = {}
+        self._sweeper: Optional[threading.Thread] = None
+
+    def register(self, key: str, loader: Callable[[], object]) -> ModelHandle:
+        """Handle to the model under ``key``; the first registration's ``loader`` is the one used."""
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                entry = _RegisteredModel(key, loader)
+                self._models[key] = entry
+            else:
+                logger.info("ModelRegistry: reusing %s", key)
+            self._ensure_sweeper_locked()
+            return ModelHandle(self, entry)
+
+    def _ensure_sweeper_locked(self) -> None:
+        if self._idle_seconds <= 0 or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="model-registry", daemon=True)
+        self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while True:
+            time.sleep(self._check_seconds)
+            try:
+                self.evict_idle()
+            except Exception as error:
+                logger.error("ModelRegistry: eviction check failed: %s", error)
+
+    def _load(self, entry: _RegisteredModel):
+        # Per-model lock: one slow load never holds up the registry or other models.
+        with entry.load_lock:
+            if entry.model is not None:
+                entry.touch()
+                return entry.model
+
+            rss_before = _process_rss_bytes()
+            started = time.perf_counter()
+            model = entry.loader()
+            if model is None:
+                raise RuntimeError(f"loader for {entry.key} returned no model")
+            load_ms = round(1000.0 * (time.perf_counter() - started), 1)
+            rss_after = _process_rss_bytes()
+
+            memory = _parameter_bytes(model)
+            source = "weights"
+            if memory is None and rss_before is not None and rss_after is not None:
+                memory = max(0, rss_after - rss_before)
+                source = "rss_delta"
+
+            with self._lock:
+                entry.model = model
+                entry.loads += 1
+                entry.load_ms = load_ms
+                entry.memory_bytes = memory
+                entry.memory_source = source if memory is not None else None
+                entry.touch()
+            logger.info(
+                "ModelRegistry: loaded %s in %.0f ms (%s)",
+                entry.key,
+                load_ms,
+                f"{memory / 1e6:.1f} MB" if memory is not None else "size unknown",
+            )
+            return model
+
+    def evict_idle(self) -> List[str]:
+        """Drop every model without users that has been idle for ``idle_seconds``; returns the evicted keys."""
+        if self._idle_seconds <= 0:
+            return []
+        cutoff = time.monotonic() - self._idle_seconds
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._models.items()
+                if entry.model is not None and not entry.users and entry.last_used <= cutoff
+            ]
+        return [key for key in keys if self.evict(key)]
+
+    def evict(self, key: str) -> bool:
+        """Drop the model under ``key`` unless a service holds it or it is loading; it reloads on the next request."""
+        with self._lock:
+            entry = self._models.get(key)
+        if entry is None or not entry.load_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                if entry.model is None or entry.users:
+                    return False
+                entry.model = None
+                entry.evictions += 1
+        finally:
+            entry.load_lock.release()
+
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info("ModelRegistry: evicted idle model %s", key)
+        return True
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            models = {}
+            resident = 0
+            for key, entry in self._models.items():
+                loaded = entry.model is not None
+                if loaded and entry.memory_bytes:
+                    resident += entry.memory_bytes
+                models[key] = {
+                    "loaded": loaded,
+                    "users": sorted(entry.users),
+                    "refcount": len(entry.users),
+                    "memory_mb": round(entry.memory_bytes / 1e6, 1) if entry.memory_bytes is not None else None,
+                    "memory_source": entry.memory_source,
+                    "load_ms": entry.load_ms,
+                    "loads": entry.loads,
+                    "evictions": entry.evictions,
+                    # Wall-clock time rather than an age, so an idle registry reports identical stats.
+                    "last_used_at": round(entry.last_used_at),
+                }
+        rss = _process_rss_bytes()
+        return {
+            "idle_seconds": self._idle_seconds,
+            "resident_models_mb": round(resident / 1e6, 1),
+            "process_rss_mb": round(rss / 1e6) if rss is not None else None,
+            "models": models,
+        }
@@ -0,0 +1,292 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from camera_feed_app.app.services.frame_context import FrameContext, boxes_intersect
+
+logger = logging.getLogger(__name__)
+
+
+class MotionResult:
+    """Outcome of one motion check: whether detectors should run, the low-resolution change mask,
+    and the candidate frame regions to examine (``None`` = whole frame).
+
+    The regions are final only after :meth:`MotionGate.regions_for` has
+    checked which of the detectors that run on the frame are due a full frame.
+    """
+
+    def __init__(
+        self,
+        should_infer: bool,
+        motion: bool,
+        changed_ratio: float,
+        mask=None,
+        reason: str = "",
+        regions: Optional[List[Tuple[int, int, int, int]]] = None,
+    ) -> None:
+        self.should_infer = should_infer
+        self.motion = motion
+        self.changed_ratio = changed_ratio
+        self.mask = mask
+        self.reason = reason
+        self.regions = regions
+
+
+class _MotionStreamState:
+    """Per-camera background model and gating counters."""
+
+    def __init__(self) -> None:
+        self.background: Optional[np.ndarray] = None
+        self.hold_remaining = 0
+        self.last_inference_at = 0.0
+        self.frames_checked = 0
+        self.frames_gated = 0
+        self.changed_ratio = 0.0
+        self.motion = False
+        self.last_regions: Optional[List[Tuple[int, int, int, int]]] = None
+        # Region runs since each detector last examined a full frame.
+        self.runs_since_full_frame: Dict[str, int] = {}
+        self.last_run_on_regions = False
+        self.region_runs = 0
+        self.full_frame_runs = 0
+
+
+class MotionGate:
+    """Skip detector runs on frames where nothing in the scene has changed.
+
+    Each camera keeps a running-average background of a small, blurred
+    grayscale view of its frames (``width`` pixels wide, shared with the
+    low-light probe through the FrameContext). A pixel counts as changed when
+    it differs from the background by more than ``pixel_threshold``, and the
+    frame counts as motion when more than ``min_area_ratio`` of the pixels
+    changed. Detectors keep running for ``hold_frames`` checks after motion
+    stops, and once every ``keepalive`` seconds regardless, so lighting
+    drifts and objects that stopped moving are still re-examined.
+
+    With ``roi_enabled``, motion frames also get up to ``max_regions`` padded
+    crops around the changed areas, so detectors can skip the still parts of
+    the frame. Keepalive runs and frames where the crops would cover more
+    than ``max_coverage`` of the image are examined in full, and so is every
+    ``full_frame_every``-th run of each detector (counted per detector, since
+    detectors run at different intervals; see :meth:`regions_for`).
+    """
+
+    def __init__(
+        self,
+        width: int = 160,
+        pixel_threshold: int = 25,
+        min_area_ratio: float = 0.002,
+        hold_frames: int = 10,
+        keepalive: float = 5.0,
+        learning_rate: float = 0.05,
+        roi_enabled: bool = False,
+        max_regions: int = 3,
+        roi_padding: int = 48,
+        min_region_size: int = 96,
+        full_frame_every: int = 10,
+        max_coverage: float = 0.5,
+    ) -> None:
+        self._lock = threading.RLock()
+        self._width = max(32, int(width))
+        self._pixel_threshold = max(1, int(pixel_threshold))
+        self._min_area_ratio = max(0.0, float(min_area_ratio))
+        self._hold_frames = max(0, int(hold_frames))
+        self._keepalive = max(0.0, float(keepalive))
+        self._learning_rate = min(1.0, max(0.001, float(learning_rate)))
+        self._roi_enabled = bool(roi_enabled)
+        self._max_regions = max(1, int(max_regions))
+        self._roi_padding = max(0, int(roi_padding))
+        self._min_region_size = max(16, int(min_region_size))
+        self._full_frame_every = max(1, int(full_frame_every))
+        self._max_coverage = min(1.0, max(0.0, float(max_coverage)))
+        self._streams: Dict[object, _MotionStreamState] = {}
+
+    def discard_stream(self, stream_id) -> None:
+        with self._lock:
+            self._streams.pop(stream_id, None)
+
+    def _get_stream_state(self, stream_id) -> _MotionStreamState:
+        with self._lock:
+            state = self._streams.get(stream_id)
+            if state is None:
+                state = _MotionStreamState()
+                self._streams[stream_id] = state
+            return state
+
+    def _small_gray(self, context: FrameContext):
+        height, width = context.shape[:2]
+        small_height = max(1, int(round(height * self._width / float(width))))
+        gray = context.resized(self._width, small_height).gray()
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def update(self, context: FrameContext, stream_id=None) -> MotionResult:
+        """Feed the next frame of ``stream_id`` and decide whether detectors should run on it."""
+        # Each camera is checked from its own inference thread, so the state
+        # is only touched by one caller at a time.
+        state = self._get_stream_state(stream_id)
+        gray = self._small_gray(context)
+        now = time.monotonic()
+
+        if state.background is None or state.background.shape != gray.shape:
+            state.background = gray.astype(np.float32)
+            state.last_inference_at = now
+            state.frames_checked += 1
+            return MotionResult(True, True, 1.0, None, "first_frame")
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(state.background))
+        _, mask = cv2.threshold(diff, self._pixel_threshold, 255, cv2.THRESH_BINARY)
+        changed_ratio = cv2.countNonZero(mask) / float(mask.size)
+        cv2.accumulateWeighted(gray, state.background, self._learning_rate)
+
+        motion = changed_ratio > self._min_area_ratio
+        if motion:
+            state.hold_remaining = self._hold_frames
+            reason = "motion"
+        elif state.hold_remaining > 0:
+            state.hold_remaining -= 1
+            reason = "hold"
+        elif self._keepalive > 0 and now - state.last_inference_at >= self._keepalive:
+            reason = "keepalive"
+        else:
+            reason = ""
+
+        should_infer = bool(reason)
+        regions = None
+        if should_infer and self._roi_enabled and reason in ("motion", "hold"):
+            if motion:
+                state.last_regions = self._extract_regions(mask, context.shape)
+            regions = state.last_regions
+
+        with self._lock:
+            state.frames_checked += 1
+            state.changed_ratio = changed_ratio
+            state.motion = motion
+            if should_infer:
+                state.last_inference_at = now
+            else:
+                state.frames_gated += 1
+        return MotionResult(should_infer, motion, changed_ratio, mask, reason, regions)
+
+    def regions_for(self, stream_id, detectors: List[str], regions: Optional[List[Tuple[int, int, int, int]]]):
+        """Regions that ``detectors``, the ones actually running on this frame, should examine.
+
+        Returns None (the whole frame) when there are no candidate regions or
+        when any of them has run on crops ``full_frame_every - 1`` times in a
+        row, so boxes carried over outside the crops are re-checked and expire.
+        """
+        if not detectors:
+            return regions
+        with self._lock:
+            state = self._get_stream_state(stream_id)
+            counts = state.runs_since_full_frame
+            if regions is not None and all(counts.get(name, 0) + 1 < self._full_frame_every for name in detectors):
+                for name in detectors:
+                    counts[name] = counts.get(name, 0) + 1
+                state.region_runs += 1
+                state.last_run_on_regions = True
+                return regions
+            for name in detectors:
+                counts[name] = 0
+            state.full_frame_runs += 1
+            state.last_run_on_regions = False
+            return None
+
+    def _extract_regions(self, mask, frame_shape) -> Optional[List[Tuple[int, int, int, int]]]:
+        """Padded, merged frame-coordinate boxes around the changed pixels, or None to use the whole frame."""
+        mask_h, mask_w = mask.shape[:2]
+        frame_h, frame_w = frame_shape[:2]
+        scale_x = frame_w / float(mask_w)
+        scale_y = frame_h / float(mask_h)
+
+        # Dilation joins the fragments of one moving object before contours are taken.
+        contours = cv2.findContours(cv2.dilate(mask, None, iterations=2), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+        rects = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            rects.append(self._pad_rect(x * scale_x, y * scale_y, (x + w) * scale_x, (y + h) * scale_y, frame_w, frame_h))
+        rects = self._merge_rects(rects)
+        if not rects:
+            return None
+
+        covered = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in rects)
+        if covered > self._max_coverage * frame_w * frame_h:
+            return None
+        return rects
+
+    def _pad_rect(self, x1: float, y1: float, x2: float, y2: float, frame_w: int, frame_h: int) -> Tuple[int, int, int, int]:
+        x1 -= self._roi_padding
+        y1 -= self._roi_padding
+        x2 += self._roi_padding
+        y2 += self._roi_padding
+        # Grow tiny regions around their centre so detectors get some context.
+        width = max(x2 - x1, min(self._min_region_size, frame_w))
+        height = max(y2 - y1, min(self._min_region_size, frame_h))
+        center_x = (x1 + x2) / 2.0
+        center_y = (y1 + y2) / 2.0
+        x1 = min(max(0.0, center_x - width / 2.0), frame_w - width)
+        y1 = min(max(0.0, center_y - height / 2.0), frame_h - height)
+        x1, y1 = max(0.0, x1), max(0.0, y1)
+        return int(x1), int(y1), int(min(frame_w, x1 + width)), int(min(frame_h, y1 + height))
+
+    @staticmethod
+    def _union(first, second) -> Tuple[int, int, int, int]:
+        return (min(first[0], second[0]), min(first[1], second[1]), max(first[2], second[2]), max(first[3], second[3]))
+
+    @staticmethod
+    def _area(rect) -> int:
+        return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+    def _merge_overlapping(self, rects: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        merged: List[Tuple[int, int, int, int]] = []
+        for rect in rects:
+            # Fold every existing box this one touches into it, then keep it.
+            overlapping = [other for other in merged if boxes_intersect(rect, other)]
+            while overlapping:
+                for other in overlapping:
+                    merged.remove(other)
+                    rect = self._union(rect, other)
+                overlapping = [other for other in merged if boxes_intersect(rect, other)]
+            merged.append(rect)
+        return merged
+
+    def _merge_rects(self, rects: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        """Merge overlapping boxes, then the pairs whose union wastes least area, until at most ``max_regions`` remain."""
+        rects = self._merge_overlapping(rects)
+        while len(rects) > self._max_regions:
+            best = None
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    combined = self._union(rects[i], rects[j])
+                    growth = self._area(combined) - self._area(rects[i]) - self._area(rects[j])
+                    if best is None or growth < best[0]:
+                        best = (growth, i, j, combined)
+            _, i, j, combined = best
+            rects = [rect for index, rect in enumerate(rects) if index not in (i, j)] + [combined]
+            rects = self._merge_overlapping(rects)
+        return rects
+
+    def get_stats(self, stream_id=None) -> Dict[str, object]:
+        """Gating counters for one stream, or totals across all streams when ``stream_id`` is None."""
+        with self._lock:
+            if stream_id is not None:
+                states = [self._streams[stream_id]] if stream_id in self._streams else []
+            else:
+                states = list(self._streams.values())
+            checked = sum(state.frames_checked for state in states)
+            gated = sum(state.frames_gated for state in states)
+            stats: Dict[str, object] = {
+                "frames_checked": checked,
+                "frames_gated": gated,
+                "gated_ratio": round(gated / checked, 3) if checked else 0.0,
+                "region_runs": sum(state.region_runs for state in states),
+                "full_frame_runs": sum(state.full_frame_runs for state in states),
+            }
+            if stream_id is not None and states:
+                stats["motion"] = states[0].motion
+                stats["changed_ratio"] = round(states[0].changed_ratio, 4)
+                stats["regions"] = states[0].last_regions if states[0].last_run_on_regions else None
+            return stats
@@ -0,0 +1,278 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from camera_feed_app.app.services.detection_arrays import iou_matrix
+from camera_feed_app.app.services.frame_context import FrameContext
+
+logger = logging.getLogger(__name__)
+
+
+class _Track:
+    """One tracked object: a constant-velocity Kalman filter over (cx, cy, w, h) plus its flow points."""
+
+    def __init__(self, track_id: int, label: str, box: Sequence[float], confidence: float, timestamp: float) -> None:
+        self.track_id = track_id
+        self.label = label
+        self.confidence = confidence
+        self.hits = 1
+        self.misses = 0
+        self.created_at = timestamp
+        self.timestamp = timestamp
+        # Feature points in the tracker's previous flow image and each point's offset
+        # to the box centre (source pixels) when it was seeded; reseeded after every detection.
+        self.points: Optional[np.ndarray] = None
+        self.offsets: Optional[np.ndarray] = None
+
+        x1, y1, x2, y2 = box
+        self.kalman = cv2.KalmanFilter(6, 4)
+        self.kalman.measurementMatrix = np.eye(4, 6, dtype=np.float32)
+        self.kalman.statePost = np.array([[(x1 + x2) / 2.0], [(y1 + y2) / 2.0], [x2 - x1], [y2 - y1], [0.0], [0.0]], dtype=np.float32)
+        self.kalman.errorCovPost = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0]).astype(np.float32)
+
+    def predict(self, timestamp: float) -> None:
+        dt = max(0.0, timestamp - self.timestamp)
+        if dt <= 0:
+            return
+        transition = np.eye(6, dtype=np.float32)
+        transition[0, 4] = dt
+        transition[1, 5] = dt
+        self.kalman.transitionMatrix = transition
+        # Position uncertainty grows with the square of the gap, velocity linearly.
+        self.kalman.processNoiseCov = np.diag([dt * dt * 400.0] * 4 + [dt * 400.0] * 2).astype(np.float32)
+        # predict() also copies the prior into statePost, so box() reflects it until the next correct().
+        self.kalman.predict()
+        self.timestamp = timestamp
+
+    def correct(self, box: Sequence[float], noise: float) -> None:
+        x1, y1, x2, y2 = box
+        self.kalman.measurementNoiseCov = np.eye(4, dtype=np.float32) * noise
+        # correct() starts from the prior in statePre, which is only filled in by
+        # predict(). A track that has not moved in time since its last correction
+        # (new, or updated twice for one timestamp) would otherwise be corrected
+        # from an all-zero prior, so start from the current estimate instead.
+        self.kalman.statePre = self.kalman.statePost.copy()
+        self.kalman.errorCovPre = self.kalman.errorCovPost.copy()
+        self.kalman.correct(np.array([[(x1 + x2) / 2.0], [(y1 + y2) / 2.0], [x2 - x1], [y2 - y1]], dtype=np.float32))
+
+    def box(self, timestamp: Optional[float] = None) -> Tuple[float, float, float, float]:
+        cx, cy, w, h, vx, vy = self.kalman.statePost[:, 0]
+        if timestamp is not None:
+            dt = timestamp - self.timestamp
+            cx += vx * dt
+            cy += vy * dt
+        return cx - w / 2.0, cy - h / 2.0, cx + w / 2.0, cy + h / 2.0
+
+    def velocity(self) -> Tuple[float, float]:
+        return float(self.kalman.statePost[4, 0]), float(self.kalman.statePost[5, 0])
+
+
+class ObjectTracker:
+    """Keep detector boxes moving between detection runs, with stable track IDs.
+
+    Detection results (``update``) are matched to existing tracks of the same
+    label by IoU, after stepping each track back to the time the detected
+    frame was captured, so late asynchronous results still land on the right
+    track. Every frame past the motion gate (``propagate``) moves the
+    tracks by the median Lucas-Kanade optical flow of feature points inside
+    their boxes, measured on a ``flow_width``-pixel gray view of the frame;
+    both feed a constant-velocity Kalman filter. When drawing, boxes are
+    extrapolated from the last examined frame to the current time by at most
+    ``max_extrapolation`` seconds.
+
+    Only tracks confirmed by the latest detection run are visible; a track
+    unmatched for more than ``max_missed`` runs is dropped, so a briefly
+    missed object keeps its ID.
+    """
+
+    _DETECTION_NOISE = 4.0
+    _FLOW_NOISE = 9.0
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_missed: int = 2,
+        flow_width: int = 320,
+        max_points: int = 20,
+        max_extrapolation: float = 0.25,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._iou_threshold = max(0.0, float(iou_threshold))
+        self._max_missed = max(0, int(max_missed))
+        self._flow_width = max(64, int(flow_width))
+        self._max_points = max(4, int(max_points))
+        self._max_extrapolation = max(0.0, float(max_extrapolation))
+        self._ids = itertools.count(1)
+        self._tracks: List[_Track] = []
+        self._prev_gray: Optional[np.ndarray] = None
+
+    def update(self, label: str, detections: Sequence[tuple], frame_timestamp: float, smooth: bool = True) -> None:
+        """Fold one detection run of ``label`` (boxes ``(x1, y1, x2, y2, conf)``) captured at ``frame_timestamp``.
+
+        With ``smooth`` False (independent images such as uploads) the label's
+        tracks are replaced by the detections as they are.
+        """
+        with self._lock:
+            if not smooth:
+                self._tracks = [track for track in self._tracks if track.label != label]
+                for detection in detections:
+                    self._tracks.append(_Track(next(self._ids), label, detection[:4], detection[4], frame_timestamp))
+                return
+
+            tracks = [track for track in self._tracks if track.label == label]
+            # Where each track was when the detected frame was captured.
+            past_boxes = [track.box(frame_timestamp) for track in tracks]
+
+            candidates = []
+            if len(detections) and tracks:
+                ious = iou_matrix(np.array([detection[:4] for detection in detections], dtype=np.float32), np.array(past_boxes, dtype=np.float32))
+                det_indexes, track_indexes = np.nonzero(ious >= self._iou_threshold)
+                candidates = sorted(
+                    zip(ious[det_indexes, track_indexes].tolist(), det_indexes.tolist(), track_indexes.tolist()),
+                    reverse=True,
+                )
+
+            matched_detections = set()
+            matched_tracks = set()
+            for _, det_index, track_index in candidates:
+                if det_index in matched_detections or track_index in matched_tracks:
+                    continue
+                matched_detections.add(det_index)
+                matched_tracks.add(track_index)
+                track = tracks[track_index]
+                x1, y1, x2, y2, confidence = detections[det_index][:5]
+                # Carry the detection forward by the motion since its frame was captured.
+                vx, vy = track.velocity()
+                age = max(0.0, track.timestamp - frame_timestamp)
+                track.correct((x1 + vx * age, y1 + vy * age, x2 + vx * age, y2 + vy * age), self._DETECTION_NOISE)
+                track.confidence = confidence
+                track.hits += 1
+                track.misses = 0
+                track.points = None
+
+            for track_index, track in enumerate(tracks):
+                if track_index not in matched_tracks:
+                    track.misses += 1
+
+            now = max([frame_timestamp] + [track.timestamp for track in tracks])
+            for det_index, detection in enumerate(detections):
+                if det_index not in matched_detections:
+                    track = _Track(next(self._ids), label, detection[:4], detection[4], frame_timestamp)
+                    track.predict(now)
+                    self._tracks.append(track)
+
+            self._tracks = [track for track in self._tracks if track.misses <= self._max_missed]
+
+    def clear(self, label: Optional[str] = None) -> None:
+        with self._lock:
+            if label is None:
+                self._tracks = []
+            else:
+                self._tracks = [track for track in self._tracks if track.label != label]
+
+    def propagate(self, context: FrameContext) -> None:
+        """Move every track to ``context``'s frame using sparse optical flow from the previous examined frame."""
+        with self._lock:
+            if not self._tracks:
+                # Nothing to move: skip the flow image. A new track is predicted on its
+                # first frame and followed by flow from the one after.
+                self._prev_gray = None
+                return
+            gray = context.fit_within(self._flow_width).gray()
+            scale = gray.shape[1] / float(context.shape[1])
+            prev_gray = self._prev_gray
+            self._prev_gray = gray
+
+            if prev_gray is None or prev_gray.shape != gray.shape:
+                for track in self._tracks:
+                    track.predict(context.timestamp)
+                    track.points = None
+                return
+
+            # Seed points for new or freshly corrected tracks in the previous image, then flow all tracks at once.
+            point_sets = []
+            for track in self._tracks:
+                if track.points is None or len(track.points) < 4:
+                    self._seed_points(track, prev_gray, scale)
+                point_sets.append(track.points)
+
+            counts = [len(points) for points in point_sets]
+            moved = None
+            if sum(counts):
+                previous = np.concatenate([points for points in point_sets if len(points)])
+                moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, previous, None, winSize=(15, 15), maxLevel=2)
+
+            offset = 0
+            for track, count in zip(self._tracks, counts):
+                track.predict(context.timestamp)
+                if count and moved is not None:
+                    good = status[offset:offset + count, 0] == 1
+                    new_points = moved[offset:offset + count][good]
+                    offsets = track.offsets[good]
+                    if len(new_points) >= 3:
+                        # Each point votes for the box centre it was seeded with, so
+                        # flow errors do not accumulate between detections.
+                        center_x, center_y = np.median(new_points.reshape(-1, 2) / scale + offsets, axis=0)
+                        x1, y1, x2, y2 = track.box()
+                        half_w, half_h = (x2 - x1) / 2.0, (y2 - y1) / 2.0
+                        track.correct((center_x - half_w, center_y - half_h, center_x + half_w, center_y + half_h), self._FLOW_NOISE)
+                        track.points = new_points.reshape(-1, 1, 2)
+                        track.offsets = offsets
+                    else:
+                        track.points = None
+                offset += count
+
+    def _seed_points(self, track: _Track, gray: np.ndarray, scale: float) -> None:
+        box = track.box()
+        height, width = gray.shape[:2]
+        x1 = int(max(0, min(width - 1, box[0] * scale)))
+        y1 = int(max(0, min(height - 1, box[1] * scale)))
+        x2 = int(max(x1 + 1, min(width, box[2] * scale)))
+        y2 = int(max(y1 + 1, min(height, box[3] * scale)))
+        mask = np.zeros_like(gray)
+        mask[y1:y2, x1:x2] = 255
+        points = cv2.goodFeaturesToTrack(gray, maxCorners=self._max_points, qualityLevel=0.01, minDistance=3, mask=mask)
+        if points is None:
+            track.points = np.empty((0, 1, 2), dtype=np.float32)
+            track.offsets = np.empty((0, 2), dtype=np.float32)
+            return
+        track.points = points.astype(np.float32)
+        center = np.array([(box[0] + box[2]) / 2.0, (box[1] + box[3]) / 2.0], dtype=np.float32)
+        track.offsets = center - track.points.reshape(-1, 2) / scale
+
+    def visible_boxes(self, label: str, now: Optional[float] = None) -> List[Tuple[int, int, int, int, float, int]]:
+        """Confirmed boxes of ``label`` at ``now`` as ``(x1, y1, x2, y2, conf, track_id)``."""
+        now = time.time() if now is None else now
+        with self._lock:
+            boxes = []
+            for track in self._tracks:
+                if track.label != label or track.misses:
+                    continue
+                at = track.timestamp + min(self._max_extrapolation, max(0.0, now - track.timestamp))
+                x1, y1, x2, y2 = track.box(at)
+                boxes.append((int(round(x1)), int(round(y1)), int(round(x2)), int(round(y2)), track.confidence, track.track_id))
+            return boxes
+
+    def get_tracks(self) -> List[Dict[str, object]]:
+        with self._lock:
+            tracks = []
+            for track in self._tracks:
+                vx, vy = track.velocity()
+                tracks.append(
+                    {
+                        "id": track.track_id,
+                        "label": track.label,
+                        "box": [int(round(value)) for value in track.box()],
+                        "confidence": round(float(track.confidence), 3),
+                        "velocity": [round(vx, 1), round(vy, 1)],
+                        "hits": track.hits,
+                        "visible": track.misses == 0,
+                        "age_s": round(track.timestamp - track.created_at, 2),
+                    }
+                )
+            return tracks
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Tried in order; the first codec OpenCV can open on this system is used.
+VIDEO_CODECS = (("XVID", ".avi"), ("MJPG", ".avi"), ("mp4v", ".mp4"))
+
+
+def open_video_writer(directory: Path, base_name: str, fps: float, size: Tuple[int, int]) -> Tuple[Optional[cv2.VideoWriter], Optional[Path]]:
+    """Open ``directory/base_name`` with the first working codec; ``(None, None)`` when none is available."""
+    for codec, extension in VIDEO_CODECS:
+        path = Path(directory) / f"{base_name}{extension}"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*codec), float(max(fps, 1)), size)
+        if writer.isOpened():
+            return writer, path
+        writer.release()
+    return None, None
+
+
+def write_mjpeg_frame(file_handle, jpeg: bytes) -> None:
+    """Append one JPEG to an MJPEG fallback recording."""
+    file_handle.write(jpeg)
+    file_handle.write(b"\n--frame--\n")
+
+
+class RecordingWriter:
+    """Write recorded frames on a dedicated thread fed by a bounded queue.
+
+    The capture loop only hands frames to :meth:`submit`; encoding and disk
+    writes happen on the writer thread, so a slow codec or stalled storage
+    never holds up capture, the live stream or status calls. When the queue
+    is full, ``drop_oldest`` discards the oldest queued frame to make room,
+    while ``block`` makes the submitting thread wait for space (and drops
+    the new frame if the writer closes meanwhile). A frame written more than
+    ``late_ms`` after it was submitted is counted as late.
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[object], None],
+        close: Callable[[], None],
+        queue_size: int = 64,
+        drop_policy: str = DROP_OLDEST,
+        late_ms: float = 500.0,
+    ) -> None:
+        if drop_policy not in (self.DROP_OLDEST, self.BLOCK):
+            logger.warning("Unknown recording drop policy %r, using %s", drop_policy, self.DROP_OLDEST)
+            drop_policy = self.DROP_OLDEST
+        self.name = name
+        self._write = write
+        self._close = close
+        self._queue_size = max(1, int(queue_size))
+        self._drop_policy = drop_policy
+        self._late_seconds = max(0.0, float(late_ms)) / 1000.0
+
+        self._condition = threading.Condition()
+        self._frames = deque()
+        self._closing = False
+        self._closed = False
+        self._written = 0
+        self._dropped = 0
+        self._late = 0
+        self._failed = 0
+        self._max_depth = 0
+        self._write_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=f"recorder-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame) -> bool:
+        """Queue ``frame`` for writing; False when it was dropped instead."""
+        with self._condition:
+            if self._closing:
+                return False
+            if len(self._frames) >= self._queue_size:
+                if self._drop_policy == self.BLOCK:
+                    self._condition.wait_for(lambda: self._closing or len(self._frames) < self._queue_size)
+                    if self._closing:
+                        self._dropped += 1
+                        return False
+                else:
+                    self._frames.popleft()
+                    self._dropped += 1
+            self._frames.append((time.monotonic(), frame))
+            self._max_depth = max(self._max_depth, len(self._frames))
+            self._condition.notify_all()
+            return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting frames; the thread writes what is queued, then closes the file.
+
+        With ``timeout`` None this returns at once and the file is finished in
+        the background.
+        """
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if timeout is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closing or self._frames)
+                if not self._frames:
+                    break
+                submitted_at, frame = self._frames.popleft()
+                # Wakes a capture thread blocked on a full queue.
+                self._condition.notify_all()
+
+            started = time.monotonic()
+            try:
+                self._write(frame)
+            except Exception as error:
+                with self._condition:
+                    self._failed += 1
+                logger.error("Recording %s: writing frame failed: %s", self.name, error)
+                continue
+            finished = time.monotonic()
+
+            with self._condition:
+                self._written += 1
+                elapsed_ms = 1000.0 * (finished - started)
+                # Moving average of the time one frame takes to encode and write.
+                self._write_ms = elapsed_ms if self._written == 1 else 0.9 * self._write_ms + 0.1 * elapsed_ms
+                if finished - submitted_at > self._late_seconds:
+                    self._late += 1
+
+        try:
+            self._close()
+        except Exception as error:
+            logger.error("Recording %s: closing failed: %s", self.name, error)
+        with self._condition:
+            self._closed = True
+        logger.info(
+            "Recording %s finished: %s frames written, %s dropped, %s late",
+            self.name,
+            self._written,
+            self._dropped,
+            self._late,
+        )
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                "drop_policy": self._drop_policy,
+                "queue_size": self._queue_size,
+                "queued": len(self._frames),
+                "max_queued": self._max_depth,
+                "written": self._written,
+                "dropped": self._dropped,
+                "late": self._late,
+                "failed": self._failed,
+                "avg_write_ms": round(self._write_ms, 2),
+                "finished": self._closed,
+            }
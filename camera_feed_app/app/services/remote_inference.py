@@ -0,0 +1,325 @@
+import http.client
+import json
+import logging
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from camera_feed_app.app.services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteInferenceError(Exception):
+    """A remote inference request failed, timed out or was rejected because the pool was full."""
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        timed_out: bool = False,
+        circuit_open: bool = False,
+        connection_error: bool = False,
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.timed_out = timed_out
+        self.circuit_open = circuit_open
+        self.connection_error = connection_error
+
+    @property
+    def config_error(self) -> bool:
+        """An HTTP 4xx other than 429: the request itself is wrong (API key, model id), so retrying will not help."""
+        return self.status is not None and 400 <= self.status < 500 and self.status != 429
+
+    @property
+    def backend_failure(self) -> bool:
+        """A timeout, connection error, 5xx or 429: the failures that count towards opening the circuit."""
+        if self.timed_out or self.connection_error:
+            return True
+        return self.status is not None and (self.status >= 500 or self.status == 429)
+
+
+class RemoteInferenceClient:
+    """Keep-alive HTTP client for Roboflow-style detection endpoints.
+
+    One client is shared by every remote detector. It keeps a small pool of
+    persistent connections, so each frame skips the TCP/TLS handshake. A
+    semaphore bounds the number of requests in flight. The multipart body is
+    sent straight from the ``cv2.imencode`` buffer without base64 or extra
+    copies. Every request carries a deadline, and the request fails fast
+    once the deadline is spent, whether it is waiting for a slot or for the
+    server. Each model id has its own circuit breaker, so an unreachable
+    backend is rejected immediately instead of costing a deadline per frame.
+    """
+
+    _BOUNDARY = "----VigilaxAIFormBoundary7MA4YWxkTrZu0gW"
+
+    def __init__(
+        self,
+        base_url: str = "https://detect.roboflow.com",
+        max_in_flight: int = 4,
+        default_timeout: float = 10.0,
+        breaker_failure_threshold: int = 3,
+        breaker_reset_timeout: float = 2.0,
+        breaker_max_reset_timeout: float = 60.0,
+    ) -> None:
+        parsed = urllib.parse.urlsplit(base_url if "://" in base_url else f"https://{base_url}")
+        self._scheme = parsed.scheme or "https"
+        self._host = parsed.hostname or "detect.roboflow.com"
+        self._port = parsed.port
+        self._base_path = parsed.path.rstrip("/")
+        self._default_timeout = float(default_timeout)
+
+        self._max_in_flight = max(1, int(max_in_flight))
+        self._slots = threading.BoundedSemaphore(self._max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_in_flight, thread_name_prefix="remote-inference")
+        self._ssl_context = ssl.create_default_context() if self._scheme == "https" else None
+
+        self._lock = threading.Lock()
+        self._idle: List[http.client.HTTPConnection] = []
+        self._pending = 0
+
+        self._requests = 0
+        self._failures = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._connections_opened = 0
+        self._connections_reused = 0
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        self._latency_total = 0.0
+        self._last_latency = 0.0
+        # model_id -> [requests, bytes_sent, latency_total]
+        self._per_model: Dict[str, List[float]] = {}
+        # model_id -> message of the last request the backend rejected as invalid; cleared by a success.
+        self._config_errors: Dict[str, str] = {}
+
+        self._breaker_settings = (breaker_failure_threshold, breaker_reset_timeout, breaker_max_reset_timeout)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get_base_url(self) -> str:
+        port = f":{self._port}" if self._port else ""
+        return f"{self._scheme}://{self._host}{port}{self._base_path}"
+
+    def _breaker(self, model_id: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model_id)
+            if breaker is None:
+                failure_threshold, reset_timeout, max_reset_timeout = self._breaker_settings
+                breaker = CircuitBreaker(model_id, failure_threshold, reset_timeout, max_reset_timeout)
+                self._breakers[model_id] = breaker
+            return breaker
+
+    def is_circuit_open(self, model_id: str) -> bool:
+        """True while requests to ``model_id`` are being rejected without reaching the network."""
+        return self._breaker(model_id).is_open()
+
+    def infer(self, model_id: str, image_buffer, params: Dict[str, object], timeout: Optional[float] = None) -> Dict:
+        """POST a JPEG buffer to ``/<model_id>`` and return the decoded JSON response."""
+        deadline = time.monotonic() + (timeout if timeout is not None else self._default_timeout)
+        return self._infer_until(deadline, model_id, image_buffer, params)
+
+    def submit(self, model_id: str, image_buffer, params: Dict[str, object], timeout: Optional[float] = None) -> Future:
+        """Queue a request on the client's worker pool; the deadline starts now, so queueing counts against it."""
+        deadline = time.monotonic() + (timeout if timeout is not None else self._default_timeout)
+        with self._lock:
+            if self._pending >= 2 * self._max_in_flight:
+                self._rejected += 1
+                future: Future = Future()
+                future.set_exception(RemoteInferenceError("remote inference queue is full"))
+                return future
+            self._pending += 1
+
+        def run():
+            try:
+                return self._infer_until(deadline, model_id, image_buffer, params)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+        return self._executor.submit(run)
+
+    def _infer_until(self, deadline: float, model_id: str, image_buffer, params: Dict[str, object]) -> Dict:
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            with self._lock:
+                self._rejected += 1
+            raise RemoteInferenceError("no free remote inference slot before the deadline", timed_out=True)
+        try:
+            # Checked once a slot is held, so a half-open trial is never lost to slot congestion.
+            breaker = self._breaker(model_id)
+            if not breaker.allow_request():
+                raise RemoteInferenceError(f"circuit open for {model_id}", circuit_open=True)
+            try:
+                response = self._request(deadline, model_id, image_buffer, params)
+            except RemoteInferenceError as error:
+                if error.backend_failure:
+                    breaker.record_failure(error)
+                else:
+                    # The backend answered; a rejected request or a bad body is not an outage.
+                    breaker.record_neutral()
+                    if error.config_error:
+                        with self._lock:
+                            self._config_errors[model_id] = str(error)
+                raise
+            except Exception:
+                breaker.record_neutral()
+                raise
+            breaker.record_success()
+            with self._lock:
+                self._config_errors.pop(model_id, None)
+            return response
+        finally:
+            self._slots.release()
+
+    def _build_body(self, image_buffer):
+        prefix = (
+            f"--{self._BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="image.jpg"\r\n'
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode("ascii")
+        suffix = f"\r\n--{self._BOUNDARY}--\r\n".encode("ascii")
+        # imencode returns an (N, 1) uint8 array; a flat view of it is sent as-is.
+        payload = memoryview(image_buffer).cast("B") if not isinstance(image_buffer, (bytes, bytearray)) else memoryview(image_buffer)
+        return [prefix, payload, suffix], len(prefix) + payload.nbytes + len(suffix)
+
+    def _new_connection(self, timeout: float) -> http.client.HTTPConnection:
+        if self._ssl_context is not None:
+            connection = http.client.HTTPSConnection(self._host, self._port, timeout=timeout, context=self._ssl_context)
+        else:
+            connection = http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+        connection.connect()
+        # Headers and body are written separately; without NODELAY Nagle can stall the last segment.
+        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._lock:
+            self._connections_opened += 1
+        return connection
+
+    def _checkout(self, timeout: float):
+        with self._lock:
+            if self._idle:
+                self._connections_reused += 1
+                return self._idle.pop(), True
+        return self._new_connection(timeout), False
+
+    def _checkin(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_in_flight:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _request(self, deadline: float, model_id: str, image_buffer, params: Dict[str, object]) -> Dict:
+        body, content_length = self._build_body(image_buffer)
+        path = f"{self._base_path}/{model_id.strip('/')}?{urllib.parse.urlencode(params)}"
+        headers = {
+            "Content-Type": f"multipart/form-data; boundary={self._BOUNDARY}",
+            "Content-Length": str(content_length),
+            "Connection": "keep-alive",
+        }
+
+        started = time.monotonic()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._record(model_id, started, 0, 0, failed=True, timed_out=True)
+                raise RemoteInferenceError("remote inference deadline expired", timed_out=True)
+
+            reused = False
+            connection = None
+            try:
+                connection, reused = self._checkout(remaining)
+                connection.sock.settimeout(remaining)
+                connection.request("POST", path, body=body, headers=headers)
+                response = connection.getresponse()
+                payload = response.read()
+            except (OSError, http.client.HTTPException) as error:
+                if connection is not None:
+                    connection.close()
+                if reused and not isinstance(error, socket.timeout):
+                    # The server dropped an idle keep-alive connection; retry once on a fresh one.
+                    continue
+                timed_out = isinstance(error, socket.timeout)
+                self._record(model_id, started, content_length, 0, failed=True, timed_out=timed_out)
+                raise RemoteInferenceError(
+                    f"remote inference request failed: {error}", timed_out=timed_out, connection_error=not timed_out
+                ) from error
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._checkin(connection)
+
+            if response.status != 200:
+                self._record(model_id, started, content_length, len(payload), failed=True)
+                error = RemoteInferenceError(f"remote inference HTTP {response.status}", status=response.status)
+                if error.config_error:
+                    # Not counted by the breaker: every frame would fail the same way until the settings change.
+                    raise RemoteInferenceError(
+                        f"remote inference HTTP {response.status} for {model_id}: check the API key and model id",
+                        status=response.status,
+                    )
+                raise error
+
+            self._record(model_id, started, content_length, len(payload))
+            try:
+                return json.loads(payload.decode("utf-8"))
+            except ValueError as error:
+                raise RemoteInferenceError(f"invalid JSON from remote inference: {error}") from error
+
+    def _record(self, model_id: str, started: float, sent: int, received: int, failed: bool = False, timed_out: bool = False) -> None:
+        latency = time.monotonic() - started
+        with self._lock:
+            totals = self._per_model.setdefault(model_id, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += sent
+            totals[2] += latency
+            self._requests += 1
+            self._bytes_sent += sent
+            self._bytes_received += received
+            self._latency_total += latency
+            self._last_latency = latency
+            if failed:
+                self._failures += 1
+            if timed_out:
+                self._timeouts += 1
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "base_url": self.get_base_url(),
+                "max_in_flight": self._max_in_flight,
+                "pending": self._pending,
+                "idle_connections": len(self._idle),
+                "requests": self._requests,
+                "failures": self._failures,
+                "timeouts": self._timeouts,
+                "rejected": self._rejected,
+                "connections_opened": self._connections_opened,
+                "connections_reused": self._connections_reused,
+                "bytes_sent": self._bytes_sent,
+                "bytes_received": self._bytes_received,
+                "average_latency_ms": round(1000.0 * self._latency_total / self._requests, 1) if self._requests else 0.0,
+                "last_latency_ms": round(1000.0 * self._last_latency, 1),
+                "models": {
+                    model_id: {
+                        "requests": int(requests),
+                        "average_upload_bytes": int(sent / requests),
+                        "average_latency_ms": round(1000.0 * latency / requests, 1),
+                    }
+                    for model_id, (requests, sent, latency) in self._per_model.items()
+                    if requests
+                },
+                "circuit_breakers": {model_id: breaker.get_stats() for model_id, breaker in self._breakers.items()},
+                "config_errors": dict(self._config_errors),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
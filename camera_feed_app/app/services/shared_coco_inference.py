@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from camera_feed_app.app.services.batch_inference import BatchInferenceScheduler
+from camera_feed_app.app.services.detection_arrays import empty_detections, select
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.model_registry import ModelHandle, ModelRegistry, model_key
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedPass:
+    def __init__(self, context: FrameContext) -> None:
+        # Holding the context keeps its id() from being reused while the pass is cached.
+        self.context = context
+        self.done = threading.Event()
+        self.detections: np.ndarray = empty_detections()
+        self.error: Optional[BaseException] = None
+
+
+class SharedCocoInference:
+    """One COCO YOLO model and one forward pass per frame for several detectors.
+
+    The local drone fallback (COCO class 4) and knife detection (COCO class 43)
+    both register their classes here. The first detector to ask about a frame
+    runs the model once with the union of registered classes, so the frame is
+    letterboxed and pushed through the backbone a single time. Any other
+    detector asking about the same frame waits for that pass and filters the
+    shared boxes down to its own classes and confidence threshold.
+    """
+
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        batch_max_size: int = 8,
+        batch_max_wait_ms: float = 15.0,
+        model_registry: Optional[ModelRegistry] = None,
+    ) -> None:
+        self._lock = threading.RLock()
+
+        cache_dir = Path.home() / ".cache" / "vigilaxai" / "models"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        if not os.path.isabs(model_path) and os.path.sep not in model_path:
+            self._model_path = str(cache_dir / model_path)
+        else:
+            self._model_path = model_path
+
+        # The registry owns the weights; consumers acquire this handle while their detector is enabled.
+        self._model_handle = (model_registry or ModelRegistry()).register(
+            model_key("yolo", self._model_path), self._build_model
+        )
+        self._consumers: Dict[str, Tuple[List[int], float]] = {}
+        self._passes: Dict[object, _SharedPass] = {}
+        self._passes_run = 0
+        self._passes_reused = 0
+        self._batcher = BatchInferenceScheduler(
+            self._model_handle.get,
+            max_batch_size=batch_max_size,
+            max_wait_ms=batch_max_wait_ms,
+            name="coco",
+            model_lock=self._model_handle.inference_lock,
+        )
+
+    def _build_model(self):
+        from ultralytics import YOLO
+
+        logger.info("SharedCocoInference: Loading YOLO model from %s", self._model_path)
+        return YOLO(self._model_path)
+
+    @property
+    def model_handle(self) -> ModelHandle:
+        return self._model_handle
+
+    def load_model(self) -> bool:
+        try:
+            self._model_handle.load()
+            return True
+        except ImportError as error:
+            logger.error("ultralytics package not installed: %s", error)
+            return False
+        except Exception as error:
+            logger.error("Error loading shared COCO model: %s", error)
+            return False
+
+    def warmup(self, size: int = 640) -> None:
+        """Push one blank frame through the model so the first live frame does not pay for lazy initialization."""
+        if self._model_handle.is_loaded():
+            self._batcher.infer(np.zeros((size, size, 3), dtype=np.uint8), stream_id="warmup", verbose=False, imgsz=size)
+
+    def register(self, consumer: str, class_ids: List[int], confidence_threshold: float) -> None:
+        """Declare the COCO classes and minimum confidence a detector needs from the shared pass."""
+        with self._lock:
+            self._consumers[consumer] = (list(class_ids), float(confidence_threshold))
+
+    def discard_stream(self, stream_id) -> None:
+        with self._lock:
+            self._passes.pop(stream_id, None)
+
+    def detect(
+        self,
+        context: FrameContext,
+        class_ids: List[int],
+        confidence_threshold: float,
+        iou_threshold: float = 0.45,
+        stream_id=None,
+    ) -> np.ndarray:
+        """Return the ``(N, 6)`` detection array of ``class_ids`` for the frame in ``context``."""
+        with self._lock:
+            shared_pass = self._passes.get(stream_id)
+            is_owner = shared_pass is None or shared_pass.context is not context
+            if is_owner:
+                shared_pass = _SharedPass(context)
+                self._passes[stream_id] = shared_pass
+                self._passes_run += 1
+                union_classes = sorted({class_id for classes, _ in self._consumers.values() for class_id in classes})
+                min_confidence = min((conf for _, conf in self._consumers.values()), default=confidence_threshold)
+                max_det = 20 * max(1, len(self._consumers))
+            else:
+                self._passes_reused += 1
+
+        if is_owner:
+            try:
+                # Motion crops, when the context has them, are batched into one call.
+                shared_pass.detections = self._batcher.infer_regions(
+                    context,
+                    stream_id=stream_id,
+                    verbose=False,
+                    conf=min_confidence,
+                    iou=iou_threshold,
+                    classes=union_classes or list(class_ids),
+                    max_det=max_det,
+                )
+            except Exception as error:
+                shared_pass.error = error
+            finally:
+                shared_pass.done.set()
+        elif not shared_pass.done.wait(30.0):
+            raise TimeoutError("Shared COCO pass timed out")
+
+        if shared_pass.error is not None:
+            raise shared_pass.error
+
+        return select(shared_pass.detections, class_ids, confidence_threshold)
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = {
+                "model_path": self._model_path,
+                "consumers": sorted(self._consumers),
+                "passes_run": self._passes_run,
+                "passes_reused": self._passes_reused,
+            }
+        stats.update(self._batcher.get_stats())
+        return stats
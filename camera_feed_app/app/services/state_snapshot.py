@@ -0,0 +1,170 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class StateSnapshot:
+    """One published view of the manager state, never modified once published.
+
+    Holds the ``/api/status`` and ``/api/ai_status`` payloads both as dicts
+    and as encoded JSON bodies with a content ETag, plus the stream FPS of
+    every camera (``None`` = primary camera). ``version`` increases only when
+    the content differs from the previous snapshot.
+    """
+
+    __slots__ = ("version", "published_at", "status", "ai_status", "fps", "status_body", "status_etag", "ai_status_body", "ai_status_etag")
+
+    def __init__(self, version: int, status: Dict[str, object], ai_status: Dict[str, object], fps: Dict[Optional[int], float]) -> None:
+        self.version = version
+        self.published_at = time.monotonic()
+        self.status = status
+        self.ai_status = ai_status
+        self.fps = fps
+        self.status_body = _encode({"success": True, "state": status})
+        self.status_etag = _etag(self.status_body)
+        self.ai_status_body = _encode(ai_status)
+        self.ai_status_etag = _etag(self.ai_status_body)
+
+    def fps_response(self, camera_id: Optional[int] = None) -> Tuple[bytes, str]:
+        """Encoded ``/api/fps`` body and ETag for ``camera_id``; cameras not in the snapshot report 0."""
+        body = _encode({"fps": self.fps.get(camera_id, 0.0)})
+        return body, _etag(body)
+
+    def same_content(self, other: "StateSnapshot") -> bool:
+        return self.status_etag == other.status_etag and self.ai_status_etag == other.ai_status_etag and self.fps == other.fps
+
+
+class StatePublisher:
+    """Publish :class:`StateSnapshot`s that readers fetch without taking any lock.
+
+    The camera pipeline calls :meth:`publish` after every processed frame;
+    snapshots are rebuilt at most every ``min_interval`` seconds and a frame
+    that finds another rebuild in progress skips its own. State-changing
+    actions publish with ``force`` so their effect is visible immediately.
+    :meth:`current` is a plain attribute read; only when no frame has
+    published for ``max_age`` seconds (no camera running) does the reader
+    rebuild the snapshot itself.
+
+    ``build`` returns ``(status, ai_status, fps)`` and must not be called
+    while holding a lock it takes, since publishers serialize on their own lock.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Tuple[Dict[str, object], Dict[str, object], Dict[Optional[int], float]]],
+        min_interval: float = 0.2,
+        max_age: float = 1.0,
+    ) -> None:
+        self._build = build
+        self._min_interval = max(0.0, float(min_interval))
+        self._max_age = max(self._min_interval, float(max_age))
+        self._publish_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._snapshot: Optional[StateSnapshot] = None
+
+    def current(self) -> StateSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.published_at > self._max_age:
+            return self.publish(force=True)
+        return snapshot
+
+    def publish(self, force: bool = False) -> StateSnapshot:
+        previous = self._snapshot
+        if not force and previous is not None and time.monotonic() - previous.published_at < self._min_interval:
+            return previous
+        if not self._publish_lock.acquire(blocking=force):
+            return previous
+        try:
+            previous = self._snapshot
+            status, ai_status, fps = self._build()
+            version = previous.version if previous is not None else 0
+            snapshot = StateSnapshot(version + 1, status, ai_status, fps)
+            if previous is not None and snapshot.same_content(previous):
+                snapshot.version = previous.version
+            # Replacing the reference is atomic, so readers see either the old or the new snapshot.
+            self._snapshot = snapshot
+            if previous is None or snapshot.version != previous.version:
+                with self._changed:
+                    self._changed.notify_all()
+            return snapshot
+        except Exception as error:
+            logger.error("Publishing state snapshot failed: %s", error)
+            if previous is None:
+                raise
+            return previous
+        finally:
+            self._publish_lock.release()
+
+    def wait_for_change(self, version: int, timeout: float) -> StateSnapshot:
+        """Block until a snapshot newer than ``version`` is published or ``timeout`` passes; returns the current one."""
+        with self._changed:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version <= version:
+                self._changed.wait(timeout)
+        return self.current()
+
+
+def _changed_keys(previous: Dict[str, object], current: Dict[str, object]) -> Dict[str, object]:
+    return {key: value for key, value in current.items() if key not in previous or previous[key] != value}
+
+
+def state_events(publisher: StatePublisher, max_rate: float = 2.0, keepalive: float = 15.0) -> Iterator[bytes]:
+    """Server-Sent Events stream of state changes for one client.
+
+    The first ``state`` event carries the full ``status``, ``ai_status`` and
+    primary-camera ``fps`` with ``"full": true``; later events carry only the
+    top-level keys whose value changed since the last event sent to this
+    client. Events are sent at most ``max_rate`` times a second: snapshots
+    published in between are folded into the next event. A comment line is
+    sent after ``keepalive`` seconds without changes, so dead clients are
+    noticed.
+    """
+    min_gap = 1.0 / max_rate if max_rate > 0 else 0.0
+    sent_status: Dict[str, object] = {}
+    sent_ai_status: Dict[str, object] = {}
+    sent_fps: Optional[float] = None
+    version = -1
+    last_event = 0.0
+    last_write = time.monotonic()
+    # Browsers reconnect after this many milliseconds when the stream drops.
+    yield b"retry: 3000\n\n"
+    while True:
+        delay = last_event + min_gap - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        snapshot = publisher.wait_for_change(version, timeout=1.0)
+        if snapshot.version == version:
+            if time.monotonic() - last_write >= keepalive:
+                last_write = time.monotonic()
+                yield b": keepalive\n\n"
+            continue
+
+        delta: Dict[str, object] = {"version": snapshot.version}
+        if version < 0:
+            delta["full"] = True
+        version = snapshot.version
+        status = _changed_keys(sent_status, snapshot.status)
+        if status:
+            delta["status"] = status
+        ai_status = _changed_keys(sent_ai_status, snapshot.ai_status)
+        if ai_status:
+            delta["ai_status"] = ai_status
+        fps = snapshot.fps.get(None, 0.0)
+        if fps != sent_fps:
+            delta["fps"] = fps
+        sent_status, sent_ai_status, sent_fps = snapshot.status, snapshot.ai_status, fps
+        last_event = last_write = time.monotonic()
+        yield b"id: %d\nevent: state\ndata: %s\n\n" % (version, _encode(delta))
@@ -1,14 +1,21 @@
-import base64
-import json
 import logging
 import os
 import threading
-import urllib.error
-import urllib.request
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import cv2
+import numpy as np
+
+from camera_feed_app.app.services.batch_inference import BatchInferenceScheduler
+from camera_feed_app.app.services.detection_arrays import as_detections, concat, empty_detections, from_center_predictions, nms, select, to_boxes
+from camera_feed_app.app.services.detection_cache import PerceptualResultCache
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.model_registry import ModelHandle, ModelRegistry, model_key
+from camera_feed_app.app.services.object_tracker import ObjectTracker
+from camera_feed_app.app.services.remote_inference import RemoteInferenceClient, RemoteInferenceError
+from camera_feed_app.app.services.shared_coco_inference import SharedCocoInference
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,55 @@ COLOR_LABEL_BG_GUN = (255, 0, 0)
 COLOR_TEXT = (255, 255, 255)    # White
 
 
+class _WeaponStreamState:
+    """Per-camera knife/gun results; models are shared by all cameras."""
+
+    def __init__(self, tracker: Optional[ObjectTracker] = None) -> None:
+        self.frame_counter = 0
+        self.knife_count = 0
+        self.gun_count = 0
+        self.last_knife_detections: List[Tuple[int, int, int, int, float]] = []
+        self.last_gun_detections: List[Tuple[int, int, int, int, float]] = []
+        # Source-frame timestamp of last_gun_detections; older async gun results are dropped.
+        self.gun_result_timestamp = 0.0
+        self.gun_remote_pending = False
+        # Moves knife and gun boxes between detection runs; None draws the last results as they are.
+        self.tracker = tracker
+
+    def set_knives(self, detections: List[Tuple[int, int, int, int, float]], frame_timestamp: float, smooth: bool = True) -> None:
+        self.last_knife_detections = detections
+        self.knife_count = len(detections)
+        if self.tracker is not None:
+            self.tracker.update("knife", detections, frame_timestamp, smooth)
+
+    def set_guns(self, detections: List[Tuple[int, int, int, int, float]], frame_timestamp: float, smooth: bool = True) -> None:
+        self.last_gun_detections = detections
+        self.gun_count = len(detections)
+        self.gun_result_timestamp = frame_timestamp
+        if self.tracker is not None:
+            self.tracker.update("gun", detections, frame_timestamp, smooth)
+
+    def clear_knives(self) -> None:
+        self.knife_count = 0
+        self.last_knife_detections = []
+        if self.tracker is not None:
+            self.tracker.clear("knife")
+
+    def clear_guns(self) -> None:
+        self.gun_count = 0
+        self.last_gun_detections = []
+        # Results for frames captured before the reset must not reappear.
+        self.gun_result_timestamp = time.time()
+        if self.tracker is not None:
+            self.tracker.clear("gun")
+
+    def drawn_detections(self, label: str) -> List[tuple]:
+        """Boxes to draw for ``label``: tracked positions with IDs, or the last results."""
+        if self.tracker is not None:
+            return self.tracker.visible_boxes(label)
+        return self.last_knife_detections if label == "knife" else self.last_gun_detections
+
+
 class WeaponDetectionService:
     """YOLO-based weapon (knife + gun) detector.
 
@@ -57,8 +113,20 @@ class WeaponDetectionService:
         gun_roboflow_api_key: str = "",
         gun_roboflow_model_id: str = "",
         gun_roboflow_size: int = 640,
+        roboflow_jpeg_quality: int = 80,
+        batch_max_size: int = 8,
+        batch_max_wait_ms: float = 15.0,
+        shared_coco: Optional[SharedCocoInference] = None,
+        remote_client: Optional[RemoteInferenceClient] = None,
+        remote_timeout: float = 10.0,
+        async_remote: bool = True,
+        result_cache: Optional[PerceptualResultCache] = None,
+        tracker_options: Optional[Dict[str, object]] = None,
+        model_registry: Optional[ModelRegistry] = None,
+        remote_latency_callback: Optional[Callable[[float], None]] = None,
     ) -> None:
         self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
 
         # Model paths
         cache_dir = Path.home() / ".cache" / "vigilaxai" / "models"
@@ -73,32 +141,89 @@ class WeaponDetectionService:
         self._gun_roboflow_api_key = gun_roboflow_api_key
         self._gun_roboflow_model_id = gun_roboflow_model_id
         self._gun_roboflow_size = int(gun_roboflow_size)
+        self._jpeg_quality = min(100, max(10, int(roboflow_jpeg_quality)))
         self._gun_use_roboflow = bool(gun_roboflow_api_key and gun_roboflow_model_id)
+        self._remote_client = remote_client or RemoteInferenceClient()
+        self._remote_timeout = float(remote_timeout)
+        self._async_remote = bool(async_remote)
+        # Told the round trip of every asynchronous remote run, which the caller cannot time itself.
+        self._remote_latency_callback = remote_latency_callback
+        self._result_cache = result_cache
+        self._tracker_options = tracker_options
+        self._async_stats: Dict[str, float] = {
+            "submitted": 0,
+            "applied": 0,
+            "stale": 0,
+            "failed": 0,
+            "skipped_busy": 0,
+            "last_age_ms": 0.0,
+        }
 
         self._confidence_threshold = confidence_threshold
         self._detection_interval = max(1, detection_interval)
         self._iou_threshold = iou_threshold
 
-        self._base_model = None
-        self._gun_model = None
         self._gun_backend = "none"
         self._knife_enabled = False
         self._gun_enabled = False
-        self._knife_count = 0
-        self._gun_count = 0
-        self._frame_counter = 0
-        self._last_knife_detections: List[Tuple[int, int, int, int, float]] = []
-        self._last_gun_detections: List[Tuple[int, int, int, int, float]] = []
+        self._streams: Dict[object, _WeaponStreamState] = {}
+
+        # Knife boxes come from the shared COCO pass when the drone fallback uses the same weights.
+        # Otherwise the registry still shares the weights with any other service loading the same file.
+        model_registry = model_registry or ModelRegistry()
+        self._shared_coco = shared_coco
+        if self._shared_coco is not None:
+            self._shared_coco.register("knife", [KNIFE_COCO_CLASS_ID], self._confidence_threshold)
+            self._base_handle = self._shared_coco.model_handle
+        else:
+            self._base_handle = model_registry.register(
+                model_key("yolo", self._base_model_path), lambda: self._build_model(self._base_model_path)
+            )
+        self._gun_handle: Optional[ModelHandle] = None
+        if self._gun_model_path:
+            self._gun_handle = model_registry.register(
+                model_key("yolo", self._gun_model_path), lambda: self._build_model(self._gun_model_path)
+            )
+        # Set once load_model() succeeded; evicted models are reloaded when detection is enabled again.
+        self._models_loaded = False
+
+        # One scheduler per model so knife and gun frames from every camera are batched separately.
+        self._knife_batcher = BatchInferenceScheduler(
+            self._base_handle.get,
+            max_batch_size=batch_max_size,
+            max_wait_ms=batch_max_wait_ms,
+            name="knife",
+            model_lock=self._base_handle.inference_lock,
+        )
+        self._gun_batcher = BatchInferenceScheduler(
+            self._gun_model,
+            max_batch_size=batch_max_size,
+            max_wait_ms=batch_max_wait_ms,
+            name="gun",
+            model_lock=self._gun_handle.inference_lock if self._gun_handle is not None else None,
+        )
+
+    @staticmethod
+    def _build_model(model_path: str):
+        from ultralytics import YOLO
+
+        return YOLO(model_path)
+
+    def _gun_model(self):
+        return self._gun_handle.get() if self._gun_handle is not None else None
+
+    def model_handles(self) -> List[ModelHandle]:
+        """Registry handles of the local models this service loaded."""
+        return [handle for handle in (self._base_handle, self._gun_handle) if handle is not None and handle.is_loaded()]
 
     def load_model(self) -> bool:
         """Load YOLO models for weapon detection."""
-        with self._lock:
-            if self._base_model is not None:
+        # Loading holds only _load_lock, so counts and annotation never wait for a model import.
+        with self._load_lock:
+            if self._models_loaded and self._base_handle.is_loaded():
                 return True
 
             try:
-                from ultralytics import YOLO
-
                 # Load base model for knife detection (COCO class 43)
                 logger.info("WeaponDetectionService: Loading base YOLO model from %s", self._base_model_path)
                 if os.path.exists(self._base_model_path):
@@ -106,12 +231,16 @@ class WeaponDetectionService:
                 else:
                     logger.info("Base model not found locally, ultralytics will download...")
 
-                self._base_model = YOLO(self._base_model_path)
+                if self._shared_coco is not None:
+                    if not self._shared_coco.load_model():
+                        return False
+                else:
+                    self._base_handle.load()
 
                 # Optionally load custom gun model
                 if self._gun_model_path and os.path.exists(self._gun_model_path):
                     logger.info("Loading custom gun model from %s", self._gun_model_path)
-                    self._gun_model = YOLO(self._gun_model_path)
+                    self._gun_handle.load()
                     self._gun_backend = "custom_yolo"
                     logger.info("Gun model loaded successfully")
                 elif self._gun_use_roboflow:
@@ -127,6 +256,7 @@ class WeaponDetectionService:
 
                 logger.info("WeaponDetectionService: Models loaded (knife=COCO:43, gun=%s)",
                             self._gun_backend)
+                self._models_loaded = True
                 return True
 
             except ImportError as error:
@@ -136,16 +266,75 @@ class WeaponDetectionService:
                 logger.error("Error loading weapon models: %s", error)
                 return False
 
+    def warmup(self, size: int = 640) -> None:
+        """Run one blank frame through the knife and custom gun models so the first live frame is not slowed by lazy setup."""
+        dummy = np.zeros((size, size, 3), dtype=np.uint8)
+        if self._shared_coco is not None:
+            self._shared_coco.warmup(size)
+        elif self._base_handle.is_loaded():
+            self._knife_batcher.infer(dummy, stream_id="warmup", verbose=False, imgsz=size, classes=[KNIFE_COCO_CLASS_ID])
+        if self._gun_model() is not None:
+            self._gun_batcher.infer(dummy, stream_id="warmup", verbose=False, imgsz=size)
+
+    def _get_stream_state(self, stream_id) -> _WeaponStreamState:
+        state = self._streams.get(stream_id)
+        if state is None:
+            tracker = ObjectTracker(**self._tracker_options) if self._tracker_options is not None else None
+            state = _WeaponStreamState(tracker)
+            self._streams[stream_id] = state
+        return state
+
+    def is_due(self, stream_id=None) -> bool:
+        """True when the next unforced run_inference call for ``stream_id`` will examine its frame."""
+        with self._lock:
+            state = self._streams.get(stream_id)
+            frame_counter = state.frame_counter if state is not None else 0
+            return (frame_counter + 1) % self._detection_interval == 0
+
+    def discard_stream(self, stream_id) -> None:
+        with self._lock:
+            self._streams.pop(stream_id, None)
+        if self._result_cache is not None:
+            self._result_cache.discard_namespace(lambda namespace: namespace[:2] == (self._gun_roboflow_model_id, stream_id))
+        if self._shared_coco is not None:
+            self._shared_coco.discard_stream(stream_id)
+
+    def _pin_models(self, knife: bool, gun: bool) -> bool:
+        """Hold the registry models of the enabled detectors (reloading evicted ones) and let the others age out.
+
+        Returns False when a model that should be held could not be loaded again.
+        """
+        pins = [(self._base_handle, "knife", knife)]
+        if self._gun_backend == "custom_yolo":
+            pins.append((self._gun_handle, "gun", gun))
+        for handle, user, pinned in pins:
+            if not pinned:
+                handle.release(user)
+                continue
+            try:
+                handle.acquire(user)
+            except Exception as error:
+                logger.error("Error reloading %s model: %s", user, error)
+                return False
+        return True
+
     def toggle_knife_detection(self) -> bool:
         """Toggle knife detection on/off."""
         with self._lock:
-            self._knife_enabled = not self._knife_enabled
+            enable = not self._knife_enabled
+            gun_enabled = self._gun_enabled
+        if enable and not self._pin_models(True, gun_enabled):
+            return False
+        with self._lock:
+            self._knife_enabled = enable
             if not self._knife_enabled:
-                self._knife_count = 0
-                self._last_knife_detections = []
+                for state in self._streams.values():
+                    state.clear_knives()
             logger.info("WeaponDetectionService: knife detection %s",
                         "enabled" if self._knife_enabled else "disabled")
-            return self._knife_enabled
+        if not enable:
+            self._pin_models(False, gun_enabled)
+        return enable
 
     def toggle_gun_detection(self) -> bool:
         """Toggle gun detection on/off."""
@@ -153,59 +342,75 @@ class WeaponDetectionService:
             if not self.is_gun_available():
                 logger.warning("Gun detection toggle requested but no gun backend is configured")
                 self._gun_enabled = False
-                self._gun_count = 0
-                self._last_gun_detections = []
+                for state in self._streams.values():
+                    state.clear_guns()
                 return False
+            enable = not self._gun_enabled
+            knife_enabled = self._knife_enabled
 
-            self._gun_enabled = not self._gun_enabled
+        if enable and not self._pin_models(knife_enabled, True):
+            return False
+        with self._lock:
+            self._gun_enabled = enable
             if not self._gun_enabled:
-                self._gun_count = 0
-                self._last_gun_detections = []
+                for state in self._streams.values():
+                    state.clear_guns()
             logger.info("WeaponDetectionService: gun detection %s",
                         "enabled" if self._gun_enabled else "disabled")
-            return self._gun_enabled
+        if not enable:
+            self._pin_models(knife_enabled, False)
+        return enable
 
     def disable_all(self) -> None:
         """Disable knife and gun detection and reset counts."""
         with self._lock:
             self._knife_enabled = False
             self._gun_enabled = False
-            self._knife_count = 0
-            self._gun_count = 0
-            self._last_knife_detections = []
-            self._last_gun_detections = []
+            self._streams.clear()
+        self._pin_models(False, False)
 
     def toggle_detection(self) -> bool:
         """Backward-compatible toggle for combined weapon detection."""
         with self._lock:
             new_state = not (self._knife_enabled or self._gun_enabled)
+        if new_state and not self._pin_models(True, True):
+            return False
+        with self._lock:
             self._knife_enabled = new_state
             self._gun_enabled = new_state
             if not new_state:
-                self._knife_count = 0
-                self._gun_count = 0
-                self._last_knife_detections = []
-                self._last_gun_detections = []
+                self._streams.clear()
             logger.info("WeaponDetectionService: detection %s",
                         "enabled" if new_state else "disabled")
-            return new_state
-
-    def get_weapon_counts(self) -> Dict[str, int]:
-        """Return current knife and gun counts."""
+        if not new_state:
+            self._pin_models(False, False)
+        return new_state
+
+    def _selected_states(self, stream_id) -> List[_WeaponStreamState]:
+        if stream_id is None:
+            return list(self._streams.values())
+        state = self._streams.get(stream_id)
+        return [state] if state is not None else []
+
+    def get_weapon_counts(self, stream_id=None) -> Dict[str, int]:
+        """Return knife and gun counts for one stream, or totals across all streams when ``stream_id`` is None."""
         with self._lock:
+            states = self._selected_states(stream_id)
+            knives = sum(state.knife_count for state in states)
+            guns = sum(state.gun_count for state in states)
             return {
-                "knives_detected": self._knife_count,
-                "guns_detected": self._gun_count,
-                "total_weapons": self._knife_count + self._gun_count,
+                "knives_detected": knives,
+                "guns_detected": guns,
+                "total_weapons": knives + guns,
             }
 
-    def get_knife_count(self) -> int:
+    def get_knife_count(self, stream_id=None) -> int:
         with self._lock:
-            return self._knife_count
+            return sum(state.knife_count for state in self._selected_states(stream_id))
 
-    def get_gun_count(self) -> int:
+    def get_gun_count(self, stream_id=None) -> int:
         with self._lock:
-            return self._gun_count
+            return sum(state.gun_count for state in self._selected_states(stream_id))
 
     def is_knife_enabled(self) -> bool:
         with self._lock:
@@ -227,192 +432,312 @@ class WeaponDetectionService:
         with self._lock:
             return self._knife_enabled or self._gun_enabled
 
-    def detect_weapons(self, frame, force: bool = False) -> Optional[object]:
-        """Run weapon detection on frame. Returns annotated frame."""
-        if frame is None:
-            return frame
+    def get_batch_stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            "knife": self._knife_batcher.get_stats(),
+            "gun": self._gun_batcher.get_stats(),
+        }
 
+    def get_async_stats(self) -> Dict[str, object]:
+        """Counters for asynchronous gun requests to the Roboflow backend."""
         with self._lock:
-            if not self._knife_enabled and not self._gun_enabled:
-                return self._add_status_overlays(frame)
-
-            if self._knife_enabled and self._base_model is None:
-                return self._add_status_overlays(frame, False)
+            return {"enabled": self._gun_backend == "roboflow" and self._async_remote, **self._async_stats}
 
-            self._frame_counter += 1
-            if not force and self._frame_counter % self._detection_interval != 0:
-                # Reuse previous detections on skipped frames
-                frame = self._draw_detections(frame)
-                return self._add_status_overlays(frame)
+    def is_gun_backend_reachable(self) -> bool:
+        """False while the circuit to the Roboflow gun model is open."""
+        with self._lock:
+            if self._gun_backend != "roboflow":
+                return self._gun_backend != "none"
+        return not self._remote_client.is_circuit_open(self._gun_roboflow_model_id)
 
-            try:
-                # --- Knife detection via base YOLO model (COCO class 43) ---
-                knife_detections: List[Tuple[int, int, int, int, float]] = []
-                if self._knife_enabled:
-                    knife_results = self._base_model(
-                        frame,
-                        verbose=False,
-                        conf=self._confidence_threshold,
-                        iou=self._iou_threshold,
-                        classes=[KNIFE_COCO_CLASS_ID],
-                        max_det=20,
-                    )
+    def get_tracks(self, stream_id=None) -> List[Dict[str, object]]:
+        """Tracked knives and guns of one stream, or of every stream (tagged with ``camera_id``) when ``stream_id`` is None."""
+        with self._lock:
+            states = [(stream_id, self._streams.get(stream_id))] if stream_id is not None else list(self._streams.items())
+        tracks = []
+        for camera_id, state in states:
+            if state is None or state.tracker is None:
+                continue
+            for track in state.tracker.get_tracks():
+                tracks.append(track if stream_id is not None else {"camera_id": camera_id, **track})
+        return tracks
+
+    def track(self, frame, stream_id=None) -> None:
+        """Move this stream's tracked boxes onto ``frame`` (a frame examined between detection runs)."""
+        state = self._streams.get(stream_id)
+        if state is not None and state.tracker is not None:
+            state.tracker.propagate(FrameContext.wrap(frame))
+
+    def annotate(self, frame, stream_id=None):
+        """Draw the most recent knife/gun results without running inference."""
+        # Detection lists are replaced, never mutated, so drawing them does not
+        # need the lock held by an in-flight model call.
+        state = self._streams.get(stream_id) or _WeaponStreamState()
+        model_missing = self._knife_enabled and not self._base_handle.is_loaded()
+        frame = self._draw_detections(frame, state)
+        return self._add_status_overlays(frame, state, False if model_missing else None)
+
+    def run_inference(self, frame, force: bool = False, stream_id=None) -> None:
+        """Update this stream's knife/gun results without drawing on ``frame`` (an image or FrameContext)."""
+        if frame is None:
+            return
+        context = FrameContext.wrap(frame)
 
-                    for result in knife_results:
-                        if not hasattr(result, "boxes"):
-                            continue
-                        for box in result.boxes:
-                            confidence = float(box.conf[0])
-                            if confidence >= self._confidence_threshold:
-                                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                                knife_detections.append((x1, y1, x2, y2, confidence))
-
-                self._last_knife_detections = knife_detections
-                self._knife_count = len(knife_detections)
-
-                # --- Gun detection via custom model (if loaded) ---
-                gun_detections: List[Tuple[int, int, int, int, float]] = []
-                if self._gun_enabled:
-                    if self._gun_backend == "custom_yolo" and self._gun_model is not None:
-                        gun_results = self._gun_model(
-                            frame,
-                            verbose=False,
-                            conf=self._confidence_threshold,
-                            iou=self._iou_threshold,
-                            max_det=20,
-                        )
-                        for result in gun_results:
-                            if not hasattr(result, "boxes"):
-                                continue
-                            for box in result.boxes:
-                                confidence = float(box.conf[0])
-                                if confidence >= self._confidence_threshold:
-                                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                                    gun_detections.append((x1, y1, x2, y2, confidence))
-                    elif self._gun_backend == "roboflow":
-                        gun_detections = self._roboflow_detect_gun(frame)
-
-                self._last_gun_detections = gun_detections
-                self._gun_count = len(gun_detections)
-
-                frame = self._draw_detections(frame)
-                return self._add_status_overlays(frame)
+        with self._lock:
+            if not self._knife_enabled and not self._gun_enabled:
+                return
+
+            if self._knife_enabled and not self._base_handle.is_loaded():
+                return
+
+            state = self._get_stream_state(stream_id)
+            state.frame_counter += 1
+            if not force and state.frame_counter % self._detection_interval != 0:
+                # Keep previous detections on skipped frames
+                return
+
+            knife_enabled = self._knife_enabled
+            gun_enabled = self._gun_enabled
+            gun_backend = self._gun_backend
+            # Remote gun requests are fire-and-forget on live frames so knife
+            # results are not held back by the network round trip.
+            gun_async = gun_enabled and gun_backend == "roboflow" and self._async_remote and not force
+
+        # With the gun backend's circuit open nothing is sent, and stale gun boxes are cleared.
+        gun_circuit_open = gun_backend == "roboflow" and self._remote_client.is_circuit_open(self._gun_roboflow_model_id)
+        if gun_circuit_open:
+            gun_async = False
+
+        # Near-identical recent frames reuse the cached gun boxes instead of an API call.
+        gun_cache_entry = None
+        gun_cached = None
+        if gun_enabled and gun_backend == "roboflow" and not gun_circuit_open and not force:
+            gun_cache_entry, gun_cached = self._probe_gun_cache(context, stream_id)
+            if gun_cached is not None:
+                gun_async = False
+
+        # Inference runs outside the service lock so other cameras can join the batch.
+        try:
+            # --- Knife detection via base YOLO model (COCO class 43) ---
+            knife_detections = empty_detections()
+            if knife_enabled and self._shared_coco is not None:
+                knife_detections = self._shared_coco.detect(
+                    context,
+                    [KNIFE_COCO_CLASS_ID],
+                    self._confidence_threshold,
+                    self._iou_threshold,
+                    stream_id=stream_id,
+                )
+            elif knife_enabled:
+                knife_detections = self._region_detections(
+                    self._knife_batcher,
+                    context,
+                    stream_id,
+                    classes=[KNIFE_COCO_CLASS_ID],
+                )
+
+            # --- Gun detection via custom model (if loaded) ---
+            gun_detections = empty_detections()
+            if gun_async:
+                self._submit_roboflow_gun(context, state, stream_id, gun_cache_entry)
+            elif gun_cached is not None:
+                gun_detections = as_detections(gun_cached)
+            elif gun_enabled and not gun_circuit_open:
+                if gun_backend == "custom_yolo" and self._gun_model() is not None:
+                    gun_detections = self._region_detections(self._gun_batcher, context, stream_id)
+                elif gun_backend == "roboflow":
+                    gun_detections = as_detections(self._roboflow_detect_gun(context, gun_cache_entry))
+
+            gun_is_local = gun_backend == "custom_yolo"
+            with self._lock:
+                # Local models only examined the motion crops; boxes elsewhere carry over.
+                knife_detections = concat(knife_detections, as_detections(context.keep_outside_regions(state.last_knife_detections)))
+                state.set_knives(to_boxes(knife_detections), context.timestamp, smooth=not force)
+                if not gun_async and context.timestamp >= state.gun_result_timestamp:
+                    if gun_enabled and gun_is_local:
+                        gun_detections = concat(gun_detections, as_detections(context.keep_outside_regions(state.last_gun_detections)))
+                    state.set_guns(to_boxes(gun_detections), context.timestamp, smooth=not force)
+        except Exception as error:
+            logger.error("Error during weapon detection: %s", error)
 
-            except Exception as error:
-                logger.error("Error during weapon detection: %s", error)
-                return self._add_status_overlays(frame)
+    def detect_weapons(self, frame, force: bool = False, stream_id=None) -> Optional[object]:
+        """Run weapon detection on frame. Returns annotated frame."""
+        if frame is None:
+            return frame
 
-    def _roboflow_detect_gun(self, frame) -> List[Tuple[int, int, int, int, float]]:
+        context = FrameContext.wrap(frame)
+        self.run_inference(context, force=force, stream_id=stream_id)
+        return self.annotate(context.frame, stream_id=stream_id)
+
+    def _region_detections(self, batcher: BatchInferenceScheduler, context: FrameContext, stream_id, **predict_kwargs):
+        """Detection array above the confidence threshold from the frame's motion crops (or whole frame), in frame coordinates."""
+        detections = batcher.infer_regions(
+            context,
+            stream_id=stream_id,
+            verbose=False,
+            conf=self._confidence_threshold,
+            iou=self._iou_threshold,
+            max_det=20,
+            **predict_kwargs,
+        )
+        return select(detections, min_confidence=self._confidence_threshold)
+
+    def _roboflow_gun_payload(self, context: FrameContext):
+        """Upload view (shrunk to the gun model's input size), JPEG buffer and query parameters, or None."""
+        view = context.fit_within(self._gun_roboflow_size)
+        success, buffer = cv2.imencode(".jpg", view.frame, [cv2.IMWRITE_JPEG_QUALITY, self._jpeg_quality])
+        if not success:
+            return None
+        params = {
+            "api_key": self._gun_roboflow_api_key,
+            "confidence": self._confidence_threshold,
+            "overlap": 35,
+        }
+        return view, buffer, params
+
+    def _parse_gun_predictions(self, response_data, view: FrameContext) -> List[Tuple[int, int, int, int, float]]:
+        """Roboflow predictions in ``view`` pixels as source-frame corner boxes, with NMS cleanup."""
+        detections = select(from_center_predictions(response_data.get("predictions", [])), min_confidence=self._confidence_threshold)
+        detections[:, :4] = view.to_source_boxes(detections[:, :4])
+        return to_boxes(nms(detections, self._iou_threshold))
+
+    def _roboflow_detect_gun(self, context: FrameContext, cache_entry=None) -> List[Tuple[int, int, int, int, float]]:
         """Invoke Roboflow API for gun detection and apply NMS cleanup."""
         try:
-            success, buffer = cv2.imencode(".jpg", frame)
-            if not success:
+            payload = self._roboflow_gun_payload(context)
+            if payload is None:
                 return []
 
-            api_url = f"https://detect.roboflow.com/{self._gun_roboflow_model_id}"
-            params = f"?api_key={self._gun_roboflow_api_key}&confidence={self._confidence_threshold}&overlap=35"
-            full_url = api_url + params
-
-            boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-            body = (
-                f"--{boundary}\r\n"
-                f'Content-Disposition: form-data; name="file"; filename="image.jpg"\r\n'
-                f"Content-Type: image/jpeg\r\n\r\n"
-            ).encode("utf-8")
-            body += base64.b64decode(base64.b64encode(buffer).decode("utf-8"))
-            body += f"\r\n--{boundary}--\r\n".encode("utf-8")
-
-            request = urllib.request.Request(
-                full_url,
-                data=body,
-                method="POST",
-                headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            view, buffer, params = payload
+            response_data = self._remote_client.infer(
+                self._gun_roboflow_model_id,
+                buffer,
+                params,
+                timeout=self._remote_timeout,
             )
+            gun_detections = self._parse_gun_predictions(response_data, view)
+            if cache_entry is not None:
+                self._result_cache.store(*cache_entry, gun_detections)
+            return gun_detections
+        except RemoteInferenceError as error:
+            logger.error("Gun Roboflow API error: %s", error)
+            return []
+        except Exception as error:
+            logger.error("Gun Roboflow detection error: %s", error)
+            return []
 
-            with urllib.request.urlopen(request, timeout=10) as response:
-                response_data = json.loads(response.read().decode("utf-8"))
-
-            raw_detections: List[Tuple[int, int, int, int, float]] = []
-            for pred in response_data.get("predictions", []):
-                confidence = float(pred.get("confidence", 0.0))
-                if confidence < self._confidence_threshold:
-                    continue
-                x = float(pred.get("x", 0))
-                y = float(pred.get("y", 0))
-                width = float(pred.get("width", 0))
-                height = float(pred.get("height", 0))
-
-                x1 = max(0, int(x - width / 2))
-                y1 = max(0, int(y - height / 2))
-                x2 = int(x + width / 2)
-                y2 = int(y + height / 2)
-                raw_detections.append((x1, y1, x2, y2, confidence))
-
-            if not raw_detections:
-                return []
+    def _probe_gun_cache(self, context: FrameContext, stream_id):
+        """``(cache_entry, cached_detections)``; cache_entry is None when no cache is configured."""
+        if self._result_cache is None:
+            return None, None
+        namespace = (self._gun_roboflow_model_id, stream_id, context.shape[:2])
+        frame_hash = self._result_cache.frame_hash(context)
+        return (namespace, frame_hash), self._result_cache.lookup(namespace, frame_hash)
+
+    def _submit_roboflow_gun(self, context: FrameContext, state: _WeaponStreamState, stream_id, cache_entry=None) -> None:
+        """Send this frame to the gun model without waiting; _apply_gun_result stores the answer."""
+        with self._lock:
+            if state.gun_remote_pending:
+                self._async_stats["skipped_busy"] += 1
+                return
+            state.gun_remote_pending = True
 
-            nms_boxes = []
-            scores = []
-            for x1, y1, x2, y2, conf in raw_detections:
-                nms_boxes.append([x1, y1, max(1, x2 - x1), max(1, y2 - y1)])
-                scores.append(float(conf))
-
-            kept_indexes = cv2.dnn.NMSBoxes(
-                nms_boxes,
-                scores,
-                self._confidence_threshold,
-                self._iou_threshold,
+        try:
+            payload = self._roboflow_gun_payload(context)
+            if payload is None:
+                with self._lock:
+                    state.gun_remote_pending = False
+                return
+            view, buffer, params = payload
+            submitted_at = time.perf_counter()
+            future = self._remote_client.submit(
+                self._gun_roboflow_model_id,
+                buffer,
+                params,
+                timeout=self._remote_timeout,
             )
+        except Exception:
+            with self._lock:
+                state.gun_remote_pending = False
+            raise
 
-            if kept_indexes is None or len(kept_indexes) == 0:
-                return []
+        with self._lock:
+            self._async_stats["submitted"] += 1
+        frame_timestamp = context.timestamp
+        future.add_done_callback(
+            lambda done: self._apply_gun_result(done, view, state, stream_id, frame_timestamp, cache_entry, submitted_at)
+        )
 
-            filtered: List[Tuple[int, int, int, int, float]] = []
-            for idx in kept_indexes:
-                resolved = int(idx[0]) if isinstance(idx, (list, tuple)) else int(idx)
-                filtered.append(raw_detections[resolved])
+    def _apply_gun_result(
+        self,
+        future,
+        view: FrameContext,
+        state: _WeaponStreamState,
+        stream_id,
+        frame_timestamp: float,
+        cache_entry=None,
+        submitted_at: Optional[float] = None,
+    ) -> None:
+        if self._remote_latency_callback is not None and submitted_at is not None:
+            self._remote_latency_callback(time.perf_counter() - submitted_at)
+        with self._lock:
+            state.gun_remote_pending = False
 
-            return filtered
-        except urllib.error.HTTPError as error:
-            logger.error("Gun Roboflow API HTTP error: %s", error.code)
-            return []
-        except urllib.error.URLError as error:
-            logger.error("Gun Roboflow API connection error: %s", error.reason)
-            return []
+        try:
+            gun_detections = self._parse_gun_predictions(future.result(), view)
+            if cache_entry is not None:
+                self._result_cache.store(*cache_entry, gun_detections)
+        except RemoteInferenceError as error:
+            with self._lock:
+                self._async_stats["failed"] += 1
+            logger.error("Gun Roboflow API error: %s", error)
+            return
         except Exception as error:
+            with self._lock:
+                self._async_stats["failed"] += 1
             logger.error("Gun Roboflow detection error: %s", error)
-            return []
+            return
 
-    def _draw_detections(self, frame):
+        with self._lock:
+            if not self._gun_enabled or self._streams.get(stream_id) is not state or frame_timestamp <= state.gun_result_timestamp:
+                self._async_stats["stale"] += 1
+                return
+            state.set_guns(gun_detections, frame_timestamp)
+            self._async_stats["applied"] += 1
+            self._async_stats["last_age_ms"] = round(1000.0 * (time.time() - frame_timestamp), 1)
+
+    def _draw_detections(self, frame, state: _WeaponStreamState):
         """Draw knife and gun bounding boxes and labels on frame."""
         font = cv2.FONT_HERSHEY_SIMPLEX
         font_scale = 0.6
         thickness = 2
 
-        # Draw knife detections (red)
-        for x1, y1, x2, y2, conf in self._last_knife_detections:
+        # Draw knife detections (red); tracked boxes carry their track ID as a sixth field
+        for detection in state.drawn_detections("knife"):
+            x1, y1, x2, y2, conf = detection[:5]
             cv2.rectangle(frame, (x1, y1), (x2, y2), COLOR_KNIFE, 2)
-            label = f"Knife - {conf:.2f}"
+            label = f"Knife #{detection[5]} - {conf:.2f}" if len(detection) > 5 else f"Knife - {conf:.2f}"
             (lw, lh), baseline = cv2.getTextSize(label, font, font_scale, thickness)
             cv2.rectangle(frame, (x1, y1 - lh - baseline - 5), (x1 + lw, y1), COLOR_LABEL_BG_KNIFE, -1)
             cv2.putText(frame, label, (x1, y1 - baseline - 5), font, font_scale, COLOR_TEXT, thickness, cv2.LINE_AA)
 
         # Draw gun detections (blue)
-        for x1, y1, x2, y2, conf in self._last_gun_detections:
+        for detection in state.drawn_detections("gun"):
+            x1, y1, x2, y2, conf = detection[:5]
             cv2.rectangle(frame, (x1, y1), (x2, y2), COLOR_GUN, 2)
-            label = f"Gun - {conf:.2f}"
+            label = f"Gun #{detection[5]} - {conf:.2f}" if len(detection) > 5 else f"Gun - {conf:.2f}"
             (lw, lh), baseline = cv2.getTextSize(label, font, font_scale, thickness)
             cv2.rectangle(frame, (x1, y1 - lh - baseline - 5), (x1 + lw, y1), COLOR_LABEL_BG_GUN, -1)
             cv2.putText(frame, label, (x1, y1 - baseline - 5), font, font_scale, COLOR_TEXT, thickness, cv2.LINE_AA)
 
         return frame
 
-    def _add_status_overlays(self, frame, has_explicit_state: Optional[bool] = None):
+    def _add_status_overlays(self, frame, state: _WeaponStreamState, has_explicit_state: Optional[bool] = None):
         """Add weapon count and status overlays to frame."""
         frame_h, frame_w = frame.shape[:2]
         font = cv2.FONT_HERSHEY_SIMPLEX
 
-        total = self._knife_count + self._gun_count
+        total = state.knife_count + state.gun_count
 
         # Top right - weapon counts (below drone overlay area)
         weapon_label = f"Weapons: {total}"
@@ -420,13 +745,13 @@ class WeaponDetectionService:
         weapon_origin = (max(10, frame_w - weapon_size[0] - 10), 90)
         self._draw_overlay_text(frame, weapon_label, weapon_origin, (120, 210, 255), 0.7, 2)
 
-        if self._knife_count > 0:
-            knife_label = f"Knives: {self._knife_count}"
+        if state.knife_count > 0:
+            knife_label = f"Knives: {state.knife_count}"
             knife_size = cv2.getTextSize(knife_label, cv2.FONT_HERSHEY_DUPLEX, 0.58, 2)[0]
             self._draw_overlay_text(frame, knife_label, (max(10, frame_w - knife_size[0] - 10), 115), (120, 120, 255), 0.58, 2)
 
-        if self._gun_count > 0:
-            gun_label = f"Guns: {self._gun_count}"
+        if state.gun_count > 0:
+            gun_label = f"Guns: {state.gun_count}"
             gun_size = cv2.getTextSize(gun_label, cv2.FONT_HERSHEY_DUPLEX, 0.58, 2)[0]
             self._draw_overlay_text(frame, gun_label, (max(10, frame_w - gun_size[0] - 10), 140), (255, 180, 120), 0.58, 2)
 
@@ -0,0 +1,153 @@
+"""Benchmark remote inference transport against the local Roboflow stand-in.
+
+Compares the original per-request urllib upload (new connection, base64 round
+trip, hand-built body) with the pooled keep-alive RemoteInferenceClient, both
+sequentially and with several cameras submitting at once, then compares
+full-resolution uploads with frames shrunk to the model input size.
+
+Run from the repository root:
+    python -m camera_feed_app.benchmark_remote_inference [--requests 100] [--cameras 4] [--latency-ms 20]
+Pass --url to benchmark an already running server instead of the built-in stand-in.
+"""
+import argparse
+import base64
+import json
+import statistics
+import threading
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.remote_inference import RemoteInferenceClient
+from camera_feed_app.mock_roboflow_server import start_server
+
+
+def legacy_request(base_url, jpeg):
+    img_data = base64.b64encode(jpeg).decode("utf-8")
+    boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="image.jpg"\r\n'
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode("utf-8")
+    body += base64.b64decode(img_data)
+    body += f"\r\n--{boundary}--\r\n".encode("utf-8")
+    request = urllib.request.Request(
+        f"{base_url}/drone-dataset-jiusn/1?api_key=bench&confidence=0.45&overlap=30",
+        data=body,
+        method="POST",
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def run(label, send, jpeg, total, workers):
+    latencies = []
+    lock = threading.Lock()
+    per_worker = max(1, total // workers)
+
+    def worker():
+        for _ in range(per_worker):
+            started = time.perf_counter()
+            send(jpeg)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed * 1000.0)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(
+        f"  {label:<28} {len(latencies) / elapsed:7.1f} req/s   "
+        f"p50 {statistics.median(latencies):6.1f} ms   p95 {p95:6.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="", help="existing server base URL (default: start the stand-in)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stand-in server model time")
+    parser.add_argument("--upload-size", type=int, default=640, help="longer side of downscaled uploads")
+    parser.add_argument("--jpeg-quality", type=int, default=80, help="JPEG quality of downscaled uploads")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url.rstrip("/")
+    if not base_url:
+        server = start_server(latency_ms=args.latency_ms, decode_images=False)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    frame = cv2.resize(np.random.default_rng(3).integers(0, 255, (90, 160, 3), dtype=np.uint8), (1280, 720))
+    ok, jpeg = cv2.imencode(".jpg", frame)
+    if not ok:
+        raise SystemExit("could not encode benchmark frame")
+
+    client = RemoteInferenceClient(base_url, max_in_flight=args.cameras)
+    params = {"api_key": "bench", "confidence": 0.45, "overlap": 30}
+
+    def pooled(buffer):
+        return client.infer("drone-dataset-jiusn/1", buffer, params, timeout=10.0)
+
+    def legacy(buffer):
+        return legacy_request(base_url, buffer)
+
+    print(f"Remote inference benchmark against {base_url}: {args.requests} requests, {jpeg.size / 1024:.0f} KiB JPEG")
+    run("legacy urllib, 1 camera", legacy, jpeg, args.requests, 1)
+    run("pooled client, 1 camera", pooled, jpeg, args.requests, 1)
+    run(f"legacy urllib, {args.cameras} cameras", legacy, jpeg, args.requests, args.cameras)
+    run(f"pooled client, {args.cameras} cameras", pooled, jpeg, args.requests, args.cameras)
+    stats = client.get_stats()
+    print(f"  pooled connections opened {stats['connections_opened']}, reused {stats['connections_reused']}")
+    client.close()
+
+    # Upload size: the stand-in decodes the JPEG here, as a real server must.
+    decode_server = None
+    upload_url = args.url.rstrip("/")
+    if not upload_url:
+        decode_server = start_server(latency_ms=args.latency_ms, decode_images=True)
+        upload_url = f"http://127.0.0.1:{decode_server.server_port}"
+    upload_client = RemoteInferenceClient(upload_url, max_in_flight=args.cameras)
+    small = FrameContext(frame).fit_within(args.upload_size).frame
+    ok, small_jpeg = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, args.jpeg_quality])
+    if not ok:
+        raise SystemExit("could not encode downscaled frame")
+
+    def upload(model_id):
+        return lambda buffer: upload_client.infer(model_id, buffer, params, timeout=10.0)
+
+    print(f"Upload size against {upload_url}: {args.cameras} cameras")
+    run(f"full {frame.shape[1]}x{frame.shape[0]} q95", upload("full/1"), jpeg, args.requests, args.cameras)
+    run(
+        f"fit {small.shape[1]}x{small.shape[0]} q{args.jpeg_quality}",
+        upload("downscaled/1"),
+        small_jpeg,
+        args.requests,
+        args.cameras,
+    )
+    for model_id, model_stats in upload_client.get_stats()["models"].items():
+        print(
+            f"  {model_id:<28} {model_stats['average_upload_bytes'] / 1024:7.1f} KiB/request   "
+            f"avg {model_stats['average_latency_ms']:6.1f} ms"
+        )
+
+    upload_client.close()
+    for running in (server, decode_server):
+        if running is not None:
+            running.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,14 +12,34 @@ class Config:
     DEBUG = os.getenv("FLASK_DEBUG", "false").lower() == "true"
 
     CAMERA_SCAN_MAX_INDEX = int(os.getenv("CAMERA_SCAN_MAX_INDEX", "1"))
+    CAMERA_MAX_STREAMS = int(os.getenv("CAMERA_MAX_STREAMS", "8"))  # Cameras that may stream concurrently
     CAMERA_FPS = int(os.getenv("CAMERA_FPS", "20"))
     CAMERA_FRAME_WIDTH = int(os.getenv("CAMERA_FRAME_WIDTH", "1280"))
     CAMERA_FRAME_HEIGHT = int(os.getenv("CAMERA_FRAME_HEIGHT", "720"))
+    FRAME_BUFFER_SIZE = int(os.getenv("FRAME_BUFFER_SIZE", "3"))  # Latest-frame ring buffer between capture and inference
+    STREAM_JPEG_QUALITY = int(os.getenv("STREAM_JPEG_QUALITY", "95"))  # Encoded once per frame, shared by all viewers
+    # Recorded frames are written by a background thread through a bounded queue
+    RECORDING_QUEUE_SIZE = int(os.getenv("RECORDING_QUEUE_SIZE", "64"))
+    RECORDING_DROP_POLICY = os.getenv("RECORDING_DROP_POLICY", "drop_oldest")  # drop_oldest or block
+    RECORDING_LATE_MS = float(os.getenv("RECORDING_LATE_MS", "500"))  # Frames written later than this count as late
+
+    # Event recording: save a clip around each detection from a pre-event buffer of recent frames
+    EVENT_RECORDING_ENABLED = os.getenv("EVENT_RECORDING_ENABLED", "false").lower() == "true"
+    EVENT_TRIGGERS = os.getenv("EVENT_TRIGGERS", "drone,knife,gun,audio")
+    EVENT_PRE_SECONDS = float(os.getenv("EVENT_PRE_SECONDS", "5"))
+    EVENT_POST_SECONDS = float(os.getenv("EVENT_POST_SECONDS", "5"))
+    EVENT_BUFFER_FPS = float(os.getenv("EVENT_BUFFER_FPS", "10"))
+    EVENT_BUFFER_MAX_MB = float(os.getenv("EVENT_BUFFER_MAX_MB", "64"))  # Per camera, and per open clip
+    EVENT_CLIP_MAX_SECONDS = float(os.getenv("EVENT_CLIP_MAX_SECONDS", "60"))
     LOW_LIGHT_ENHANCEMENT_ENABLED = os.getenv("LOW_LIGHT_ENHANCEMENT_ENABLED", "true").lower() == "true"
     LOW_LIGHT_LUMA_THRESHOLD = int(os.getenv("LOW_LIGHT_LUMA_THRESHOLD", "70"))
     LOW_LIGHT_CLAHE_CLIP_LIMIT = float(os.getenv("LOW_LIGHT_CLAHE_CLIP_LIMIT", "2.8"))
     LOW_LIGHT_GAMMA = float(os.getenv("LOW_LIGHT_GAMMA", "1.35"))
     LOW_LIGHT_MAX_GAIN = float(os.getenv("LOW_LIGHT_MAX_GAIN", "2.8"))
+    LOW_LIGHT_MODE = os.getenv("LOW_LIGHT_MODE", "fast")  # fast (fused, cached) or quality (full per-frame passes)
+    LOW_LIGHT_ESTIMATE_INTERVAL = int(os.getenv("LOW_LIGHT_ESTIMATE_INTERVAL", "10"))  # Frames between luminance checks
+    LOW_LIGHT_HYSTERESIS = float(os.getenv("LOW_LIGHT_HYSTERESIS", "6"))  # Luma margin above threshold before switching off
+    LOW_LIGHT_CLAHE_SCALE = float(os.getenv("LOW_LIGHT_CLAHE_SCALE", "0.5"))  # CLAHE resolution relative to the frame
 
     CAPTURES_DIR = BASE_DIR / "app" / "static" / "captures"
     RECORDINGS_DIR = BASE_DIR / "app" / "static" / "recordings"
@@ -30,7 +50,20 @@ class Config:
     # Roboflow API settings (recommended) - uses serverless API, no local weights needed
     ROBOFLOW_API_KEY = os.getenv("ROBOFLOW_API_KEY", "")  # Required for API-based detection
     ROBOFLOW_MODEL_ID = os.getenv("ROBOFLOW_MODEL_ID", "drone-dataset-jiusn/1")  # Roboflow project/version
-    ROBOFLOW_SIZE = int(os.getenv("ROBOFLOW_SIZE", "640"))  # Inference image size
+    ROBOFLOW_SIZE = int(os.getenv("ROBOFLOW_SIZE", "640"))  # Frames are shrunk to this longer side before upload (0 = full size)
+    ROBOFLOW_JPEG_QUALITY = int(os.getenv("ROBOFLOW_JPEG_QUALITY", "80"))  # Upload JPEG quality, drone and gun
+    ROBOFLOW_API_URL = os.getenv("ROBOFLOW_API_URL", "https://detect.roboflow.com")  # Also used by the gun backend
+    REMOTE_INFERENCE_MAX_IN_FLIGHT = int(os.getenv("REMOTE_INFERENCE_MAX_IN_FLIGHT", "4"))  # Keep-alive pool size
+    REMOTE_INFERENCE_DEADLINE_MS = float(os.getenv("REMOTE_INFERENCE_DEADLINE_MS", "0"))  # 0 = ten detection ticks
+    REMOTE_INFERENCE_ASYNC = os.getenv("REMOTE_INFERENCE_ASYNC", "true").lower() == "true"  # Don't wait on live frames
+    REMOTE_BREAKER_FAILURE_THRESHOLD = int(os.getenv("REMOTE_BREAKER_FAILURE_THRESHOLD", "3"))  # Failures before opening
+    REMOTE_BREAKER_RESET_MS = float(os.getenv("REMOTE_BREAKER_RESET_MS", "2000"))  # First wait before a trial request
+    REMOTE_BREAKER_MAX_RESET_MS = float(os.getenv("REMOTE_BREAKER_MAX_RESET_MS", "60000"))  # Backoff cap
+    REMOTE_CACHE_ENABLED = os.getenv("REMOTE_CACHE_ENABLED", "true").lower() == "true"  # Reuse results for near-identical frames
+    REMOTE_CACHE_TTL_MS = float(os.getenv("REMOTE_CACHE_TTL_MS", "10000"))  # Static scenes are re-checked this often
+    REMOTE_CACHE_MAX_DISTANCE = int(os.getenv("REMOTE_CACHE_MAX_DISTANCE", "8"))  # Hamming tolerance (of 256 hash bits)
+    REMOTE_CACHE_SIZE = int(os.getenv("REMOTE_CACHE_SIZE", "256"))  # LRU entries across cameras and models
+    REMOTE_FALLBACK_LOCAL = os.getenv("REMOTE_FALLBACK_LOCAL", "false").lower() == "true"  # Local YOLO drone model while open
     
     # Legacy local YOLO model settings (if Roboflow API not configured)
     DRONE_MODEL = os.getenv("DRONE_MODEL", "yolov8s.pt")
@@ -60,4 +93,49 @@ class Config:
     WEAPON_FRAME_SKIP = int(os.getenv("WEAPON_FRAME_SKIP", "3"))  # Higher skip = less CPU
     WEAPON_IOU_THRESHOLD = float(os.getenv("WEAPON_IOU_THRESHOLD", "0.45"))
 
+    # One COCO model/pass for the local drone fallback and knife detection.
+    # Used automatically when DRONE_MODEL == WEAPON_BASE_MODEL; set to force sharing with this model.
+    COCO_SHARED_MODEL = os.getenv("COCO_SHARED_MODEL", "")
+
+    # Detectors run concurrently per frame; 0 sizes the pool as 2 workers per camera slot
+    AI_PIPELINE_WORKERS = int(os.getenv("AI_PIPELINE_WORKERS", "0"))
+
+    # Cross-camera batching for local YOLO models (drone, knife, custom gun)
+    INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "8"))
+    INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "15"))
+
+    # Background model preload at startup: comma-separated subset of face, drone, weapon, audio
+    MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "face,drone,weapon")
+    MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "true").lower() == "true"  # Run one dummy inference after loading
+    # Models no enabled detector holds are unloaded after this many idle seconds (0 keeps them loaded)
+    MODEL_IDLE_EVICT_SECONDS = float(os.getenv("MODEL_IDLE_EVICT_SECONDS", "600"))
+
+    # Status endpoints serve a snapshot the pipeline republishes at most once per this interval
+    STATE_SNAPSHOT_MIN_INTERVAL_MS = float(os.getenv("STATE_SNAPSHOT_MIN_INTERVAL_MS", "200"))
+    STATE_EVENTS_MAX_RATE = float(os.getenv("STATE_EVENTS_MAX_RATE", "2"))  # /api/events updates per second per client
+
+    # Adaptive detection intervals: measured detector latency decides how often each detector runs
+    AI_ADAPTIVE_INTERVALS = os.getenv("AI_ADAPTIVE_INTERVALS", "true").lower() == "true"
+    AI_TARGET_FPS = float(os.getenv("AI_TARGET_FPS", "15"))  # Frames per second each camera's inference loop should keep up with
+    AI_CPU_BUDGET = float(os.getenv("AI_CPU_BUDGET", "0.5"))  # Share of all CPU cores detectors may use across cameras
+    AI_MAX_INTERVAL = int(os.getenv("AI_MAX_INTERVAL", "30"))  # Slowest a detector may be scheduled (every Nth frame)
+
+    # Object tracking: Kalman filter + optical flow moves drone/weapon boxes between detection runs
+    OBJECT_TRACKING_ENABLED = os.getenv("OBJECT_TRACKING_ENABLED", "true").lower() == "true"
+    TRACKING_IOU_THRESHOLD = float(os.getenv("TRACKING_IOU_THRESHOLD", "0.3"))  # Overlap that matches a detection to a track
+    TRACKING_MAX_MISSED = int(os.getenv("TRACKING_MAX_MISSED", "2"))  # Detection runs a track survives unmatched (keeps its ID)
+    TRACKING_FLOW_WIDTH = int(os.getenv("TRACKING_FLOW_WIDTH", "320"))  # Width of the gray image used for optical flow
+
+    # Motion gating: detectors skip frames where the scene has not changed
+    MOTION_GATING_ENABLED = os.getenv("MOTION_GATING_ENABLED", "true").lower() == "true"
+    MOTION_PIXEL_THRESHOLD = int(os.getenv("MOTION_PIXEL_THRESHOLD", "25"))  # Gray-level change that counts (lower = more sensitive)
+    MOTION_MIN_AREA = float(os.getenv("MOTION_MIN_AREA", "0.002"))  # Fraction of changed pixels that counts as motion
+    MOTION_HOLD_FRAMES = int(os.getenv("MOTION_HOLD_FRAMES", "10"))  # Keep detecting this many frames after motion stops
+    MOTION_KEEPALIVE_MS = float(os.getenv("MOTION_KEEPALIVE_MS", "5000"))  # Run detectors at least this often on static scenes
+    MOTION_ROI_ENABLED = os.getenv("MOTION_ROI_ENABLED", "true").lower() == "true"  # Detect only in motion crops
+    MOTION_ROI_MAX_REGIONS = int(os.getenv("MOTION_ROI_MAX_REGIONS", "3"))  # Crops per frame after merging
+    MOTION_ROI_PADDING = int(os.getenv("MOTION_ROI_PADDING", "48"))  # Pixels added around each motion area
+    MOTION_ROI_FULL_FRAME_EVERY = int(os.getenv("MOTION_ROI_FULL_FRAME_EVERY", "10"))  # Every Nth run of each detector scans the whole frame
+    MOTION_ROI_MAX_COVERAGE = float(os.getenv("MOTION_ROI_MAX_COVERAGE", "0.5"))  # Larger crops fall back to the whole frame
+
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -0,0 +1,119 @@
+"""Local stand-in for the Roboflow detection API, for offline benchmarking.
+
+Speaks the same protocol as detect.roboflow.com: POST /<project>/<version>?api_key=...&confidence=...
+with a multipart JPEG body, answering with {"predictions": [...], "image": {...}, "time": ...}.
+Connections are kept alive (HTTP/1.1).
+
+Run from the repository root:
+    python -m camera_feed_app.mock_roboflow_server --port 9001 --latency-ms 40
+and point the app at it with ROBOFLOW_API_URL=http://127.0.0.1:9001
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+
+class MockRoboflowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; avoid Nagle stalls on kept-alive connections.
+    disable_nagle_algorithm = True
+    latency_seconds = 0.0
+    decode_images = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        started = time.perf_counter()
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        if not query.get("api_key"):
+            self._send_json(403, {"message": "Forbidden"})
+            return
+
+        start = body.find(b"\xff\xd8")
+        end = body.rfind(b"\xff\xd9")
+        if start < 0 or end < 0:
+            self._send_json(400, {"message": "No JPEG image in request"})
+            return
+
+        width, height = 640, 640
+        if self.decode_images:
+            image = cv2.imdecode(np.frombuffer(body[start:end + 2], dtype=np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                self._send_json(400, {"message": "Could not decode image"})
+                return
+            height, width = image.shape[:2]
+
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+
+        # One deterministic box in the centre of the image, in uploaded-image pixels.
+        self._send_json(
+            200,
+            {
+                "time": round(time.perf_counter() - started, 4),
+                "image": {"width": width, "height": height},
+                "predictions": [
+                    {
+                        "x": width / 2.0,
+                        "y": height / 2.0,
+                        "width": width / 8.0,
+                        "height": height / 8.0,
+                        "confidence": 0.91,
+                        "class": "drone",
+                        "class_id": 0,
+                    }
+                ],
+            },
+        )
+
+
+def start_server(host="127.0.0.1", port=0, latency_ms=0.0, decode_images=True):
+    """Start the stand-in server on a background thread and return it; ``server.server_port`` has the port."""
+    handler = type(
+        "ConfiguredMockRoboflowHandler",
+        (MockRoboflowHandler,),
+        {"latency_seconds": latency_ms / 1000.0, "decode_images": decode_images},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="simulated model time per request")
+    parser.add_argument("--no-decode", action="store_true", help="skip JPEG decoding to measure pure transport cost")
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, args.latency_ms, not args.no_decode)
+    print(f"Mock Roboflow server on http://{args.host}:{server.server_port} (latency {args.latency_ms:.0f} ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the remote backend circuit breaker.
+Tests:
+- Consecutive failures open the circuit and requests are rejected while it is open
+- After the reset timeout one half-open trial goes out; success closes the circuit
+- A failed trial re-opens the circuit with the reset timeout doubled, up to the cap
+- HTTP 5xx and 429 count as backend failures; other 4xx are config errors that do not open the circuit
+"""
+
+import http.server
+import sys
+import threading
+import time
+
+import numpy as np
+
+from camera_feed_app.app.services.circuit_breaker import CircuitBreaker
+from camera_feed_app.app.services.remote_inference import RemoteInferenceClient, RemoteInferenceError
+
+
+def test_failures_open_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure(IOError("down"))
+    assert breaker.get_state() == CircuitBreaker.CLOSED
+    breaker.record_failure(IOError("down"))
+    assert breaker.get_state() == CircuitBreaker.OPEN and breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_half_open_trial_closes_on_success():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.allow_request(), "a trial should go out after the reset timeout"
+    assert breaker.get_state() == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request(), "only one trial may be in flight"
+    breaker.record_success()
+    assert breaker.get_state() == CircuitBreaker.CLOSED and breaker.allow_request()
+
+
+def test_failed_trial_backs_off():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05, max_reset_timeout=0.15)
+    breaker.record_failure()
+    for expected in (0.1, 0.15, 0.15):
+        time.sleep(breaker.get_stats()["reset_timeout_s"] + 0.02)
+        assert breaker.allow_request()
+        breaker.record_failure()
+        stats = breaker.get_stats()
+        assert stats["state"] == CircuitBreaker.OPEN and stats["reset_timeout_s"] == expected, stats
+    assert breaker.get_stats()["times_opened"] == 4
+
+
+class _StatusHandler(http.server.BaseHTTPRequestHandler):
+    status = 200
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"predictions": []}'
+        self.send_response(self.status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def request_statuses(status, count):
+    _StatusHandler.status = status
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StatusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = RemoteInferenceClient(f"http://127.0.0.1:{server.server_port}", breaker_failure_threshold=2, breaker_reset_timeout=60)
+    errors = []
+    try:
+        for _ in range(count):
+            try:
+                client.infer("model/1", np.zeros(16, dtype=np.uint8), {})
+            except RemoteInferenceError as error:
+                errors.append(error)
+        return client, errors
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_errors_open_the_circuit():
+    for status in (503, 429):
+        client, errors = request_statuses(status, 4)
+        assert [error.status for error in errors] == [status, status, None, None], [str(error) for error in errors]
+        assert errors[-1].circuit_open and client.is_circuit_open("model/1")
+
+
+def test_client_errors_do_not_open_the_circuit():
+    client, errors = request_statuses(401, 4)
+    assert all(error.status == 401 and error.config_error and not error.backend_failure for error in errors)
+    assert not client.is_circuit_open("model/1")
+    stats = client.get_stats()
+    assert stats["circuit_breakers"]["model/1"]["consecutive_failures"] == 0, stats
+    assert "check the API key" in stats["config_errors"]["model/1"], stats
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (
+        test_failures_open_the_circuit,
+        test_half_open_trial_closes_on_success,
+        test_failed_trial_backs_off,
+        test_server_errors_open_the_circuit,
+        test_client_errors_do_not_open_the_circuit,
+    ):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the compact (N, 6) detection arrays.
+Tests:
+- Ultralytics box data with a track-id column and Roboflow centre predictions convert to x1, y1, x2, y2, conf, class
+- select() filters by class and confidence
+- nms() keeps the most confident of overlapping boxes and leaves separate boxes alone
+- to_boxes() and as_detections() round-trip the stored (x1, y1, x2, y2, conf) tuples
+"""
+
+import sys
+
+import numpy as np
+
+from camera_feed_app.app.services.detection_arrays import (
+    as_detections,
+    concat,
+    empty_detections,
+    from_boxes_data,
+    from_center_predictions,
+    iou_matrix,
+    nms,
+    select,
+    to_boxes,
+)
+
+DETECTIONS = np.array(
+    [
+        [0, 0, 10, 10, 0.9, 43],
+        [20, 20, 30, 30, 0.3, 43],
+        [40, 40, 50, 50, 0.8, 4],
+        [60, 60, 70, 70, 0.5, 0],
+    ],
+    dtype=np.float32,
+)
+
+
+def test_conversions():
+    tracked = np.array([[1, 2, 3, 4, 7, 0.5, 2]], dtype=np.float32)  # ..., track id, conf, cls
+    assert from_boxes_data(tracked).tolist() == [[1, 2, 3, 4, 0.5, 2]]
+    assert from_boxes_data(None).shape == (0, 6)
+    converted = from_center_predictions([{"x": 50, "y": 40, "width": 20, "height": 10, "confidence": 0.75, "class_id": 1}])
+    assert converted.tolist() == [[40, 35, 60, 45, 0.75, 1]], converted
+
+
+def test_select_by_class_and_confidence():
+    assert select(DETECTIONS, class_ids=[43])[:, 5].tolist() == [43, 43]
+    assert select(DETECTIONS, class_ids=[43], min_confidence=0.5)[:, 4].tolist() == [np.float32(0.9)]
+    assert len(select(DETECTIONS, min_confidence=0.6)) == 2
+    assert len(select(DETECTIONS, class_ids=[])) == 0
+    assert len(select(empty_detections(), class_ids=[43])) == 0
+
+
+def test_nms():
+    overlapping = np.array(
+        [
+            [0, 0, 10, 10, 0.6, 0],
+            [1, 1, 11, 11, 0.9, 0],
+            [50, 50, 60, 60, 0.4, 0],
+        ],
+        dtype=np.float32,
+    )
+    kept = nms(overlapping, 0.5)
+    assert kept[:, 4].tolist() == [np.float32(0.9), np.float32(0.4)], kept
+    assert iou_matrix(overlapping[:1], overlapping[2:]).tolist() == [[0.0]]
+
+
+def test_box_tuples_round_trip():
+    boxes = to_boxes(DETECTIONS[:2])
+    assert boxes == [(0, 0, 10, 10, 0.9), (20, 20, 30, 30, 0.3)], boxes
+    restored = as_detections(boxes, class_id=43)
+    assert np.allclose(restored, DETECTIONS[:2]), restored
+    assert concat(empty_detections(), restored) is restored
+    assert as_detections([]).shape == (0, 6)
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_conversions, test_select_by_class_and_confidence, test_nms, test_box_tuples_round_trip):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test the perceptual remote-result cache.
+Tests:
+- Exact and near-identical frames hit, distant frames miss
+- Lookups only see their own camera and model
+- Entries expire after the TTL and the least recently used entry is evicted
+- A cache hit is shown without going through the drone temporal filter again
+"""
+
+import sys
+import time
+
+from camera_feed_app.app.services.detection_cache import PerceptualResultCache
+from camera_feed_app.app.services.drone_detection_service import DroneDetectionService
+
+BOXES = [(10, 20, 60, 80, 0.9)]
+
+
+def test_hits_and_misses():
+    cache = PerceptualResultCache(max_distance=2)
+    cache.store("cam0", 0b1111, BOXES)
+    assert cache.lookup("cam0", 0b1111) == BOXES
+    assert cache.lookup("cam0", 0b1110) == BOXES, "one bit apart should hit"
+    assert cache.lookup("cam0", 0b11110000) is None, "distant hashes should miss"
+    stats = cache.get_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1, stats
+
+
+def test_namespaces_are_separate():
+    cache = PerceptualResultCache()
+    cache.store("cam0", 42, BOXES)
+    assert cache.lookup("cam1", 42) is None
+    cache.discard_namespace(lambda namespace: namespace == "cam0")
+    assert cache.lookup("cam0", 42) is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_ttl_and_eviction():
+    cache = PerceptualResultCache(max_entries=2, ttl=0.05, max_distance=0)
+    cache.store("cam0", 1, BOXES)
+    cache.store("cam0", 2, BOXES)
+    cache.lookup("cam0", 1)
+    cache.store("cam0", 3, BOXES)
+    assert cache.lookup("cam0", 2) is None, "the least recently used entry should be evicted"
+    assert cache.lookup("cam0", 1) == BOXES
+    time.sleep(0.1)
+    assert cache.lookup("cam0", 1) is None, "entries should expire after the TTL"
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1 and stats["expired"] == 2 and stats["entries"] == 0, stats
+
+
+def test_cache_hit_skips_temporal_filter():
+    detector = DroneDetectionService(model_path="unused.pt")
+    state = detector._get_stream_state("cam0")
+    boxes = detector._store_detections(state, BOXES, 1.0)
+    history = len(state.detection_history)
+    assert detector._store_detections(state, boxes, 2.0, filtered=True) == boxes
+    assert len(state.detection_history) == history, "a cache hit must not be added to the filter history"
+    assert state.result_timestamp == 2.0 and state.drone_count == 1
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_hits_and_misses, test_namespaces_are_separate, test_ttl_and_eviction, test_cache_hit_skips_temporal_filter):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
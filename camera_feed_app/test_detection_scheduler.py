@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the adaptive detection interval scheduler.
+Tests:
+- Slow detectors back off while fast ones keep running every frame
+- The round trip of asynchronous remote runs sets a minimum interval but stays out of the budget
+- Detectors sharing one model pass land on the same frames
+- ticks_until_due() agrees with is_due()
+"""
+
+import sys
+import time
+
+from camera_feed_app.app.services.detection_scheduler import AdaptiveIntervalScheduler
+
+
+def make_scheduler(shared=(), intervals=None):
+    return AdaptiveIntervalScheduler(
+        intervals or {"face": 1, "drone": 1, "weapon": 1},
+        target_fps=10,
+        cpu_budget=1.0,
+        recompute_seconds=0.1,
+        shared=shared,
+    )
+
+
+def recompute(scheduler):
+    time.sleep(0.15)
+    scheduler.next_tick("cam")
+
+
+def test_slow_detector_backs_off():
+    scheduler = make_scheduler()
+    for _ in range(5):
+        scheduler.record("face", 0.002)
+        scheduler.record("drone", 0.300)
+        scheduler.record("weapon", 0.002)
+    recompute(scheduler)
+    intervals = scheduler.get_intervals()
+    assert intervals["face"] == 1 and intervals["weapon"] == 1, intervals
+    assert intervals["drone"] > 1, intervals
+
+
+def test_remote_round_trip_sets_min_interval():
+    scheduler = make_scheduler()
+    for _ in range(5):
+        # Submitting takes a millisecond; the result arrives 600 ms later.
+        scheduler.record("drone", 0.001)
+        scheduler.record("drone", 0.600, remote=True)
+        scheduler.record("face", 0.045)
+        scheduler.record("weapon", 0.045)
+    recompute(scheduler)
+    intervals = scheduler.get_intervals()
+    # 600 ms at 10 fps: one request every 6 frames, without taking budget from the local detectors.
+    assert intervals == {"face": 1, "drone": 6, "weapon": 1}, intervals
+    stats = scheduler.get_stats()["detectors"]["drone"]
+    assert stats["remote_latency_ms"] == 600.0 and stats["latency_ms"] == 1.0, stats
+
+
+def test_shared_consumers_run_together():
+    scheduler = make_scheduler(shared=[("drone", "weapon")], intervals={"face": 3, "drone": 3, "weapon": 3})
+    for _ in range(2):
+        for tick in range(1, 61):
+            assert scheduler.is_due("drone", tick) == scheduler.is_due("weapon", tick), tick
+        assert any(scheduler.is_due("drone", tick) for tick in range(1, 61))
+        assert not all(
+            scheduler.is_due("face", tick) == scheduler.is_due("drone", tick) for tick in range(1, 61)
+        ), "other detectors should still be staggered"
+        # Different latencies must not split the unit.
+        for _ in range(5):
+            scheduler.record("face", 0.05)
+            scheduler.record("drone", 0.2)
+            scheduler.record("weapon", 0.02)
+        recompute(scheduler)
+    intervals = scheduler.get_intervals()
+    assert intervals["drone"] == intervals["weapon"] > 1, intervals
+
+
+def test_ticks_until_due():
+    scheduler = make_scheduler()
+    for _ in range(5):
+        scheduler.record("drone", 0.5)
+    recompute(scheduler)
+    for tick in range(1, 40):
+        for name in ("face", "drone", "weapon"):
+            wait = scheduler.ticks_until_due(name, tick)
+            assert (wait == 0) == scheduler.is_due(name, tick), (name, tick, wait)
+            assert scheduler.is_due(name, tick + wait), (name, tick, wait)
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (
+        test_slow_detector_backs_off,
+        test_remote_round_trip_sets_min_interval,
+        test_shared_consumers_run_together,
+        test_ticks_until_due,
+    ):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
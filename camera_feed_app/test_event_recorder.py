@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test detection-triggered event clips.
+Tests:
+- A trigger turns the pre-event buffer into a clip that is written with a JSON sidecar
+- The pre-event buffer and open clips stay within EVENT_BUFFER_MAX_MB
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from camera_feed_app.app.services.event_recorder import EventRecorder
+
+
+def jpeg_frame(step):
+    frame = np.random.default_rng(step).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+
+def wait_for_clips(recorder, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if recorder.get_stats()["clips_written"] >= count:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_trigger_writes_clip():
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = EventRecorder(Path(directory), pre_seconds=5, post_seconds=0.2, buffer_fps=0)
+        for step in range(5):
+            recorder.add_frame(0, jpeg_frame(step))
+        assert recorder.trigger(0, "drone", {"count": 1})
+        assert not recorder.trigger(0, "gun"), "a second trigger should extend the open clip"
+        for step in range(5, 8):
+            recorder.add_frame(0, jpeg_frame(step))
+        time.sleep(0.3)
+        recorder.add_frame(0, jpeg_frame(8))
+        assert wait_for_clips(recorder, 1), "the clip was not written"
+
+        clip = recorder.get_recent_clips()[0]
+        assert [trigger["kind"] for trigger in clip["triggers"]] == ["drone", "gun"]
+        assert clip["frames"] >= 8, clip
+        sidecar = (Path(directory) / clip["clip"]).with_suffix(".json")
+        assert json.loads(sidecar.read_text())["camera_id"] == 0
+
+
+def test_open_clip_is_capped():
+    frame_bytes = len(jpeg_frame(0))
+    max_mb = 10 * frame_bytes / 1e6
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = EventRecorder(Path(directory), pre_seconds=60, post_seconds=60, buffer_fps=0, max_buffer_mb=max_mb)
+        for step in range(30):
+            recorder.add_frame(0, jpeg_frame(step))
+        assert recorder.get_stats()["buffered_mb"][0] <= round(max_mb, 1) + 0.1
+        recorder.trigger(0, "drone")
+        # A detection that stays in view for far longer than the cap allows.
+        for step in range(30, 60):
+            recorder.add_frame(0, jpeg_frame(step))
+            recorder.trigger(0, "drone")
+            time.sleep(0.02)
+        assert wait_for_clips(recorder, 2), f"the open clip was never written out: {recorder.get_stats()}"
+        for clip in recorder.get_recent_clips():
+            assert clip["frames"] <= 12, f"a clip grew past the byte cap: {clip['frames']} frames"
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_trigger_writes_clip, test_open_clip_is_capped):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the encode-once MJPEG broadcaster.
+Tests:
+- With several clients each frame is encoded once and every client gets the same JPEG bytes
+- Clients never receive a frame twice
+- Frames published with no client watching are encoded only when asked for
+"""
+
+import sys
+import threading
+import time
+
+import numpy as np
+
+from camera_feed_app.app.services.mjpeg_broadcaster import MjpegBroadcaster
+
+CLIENTS = 5
+FRAMES = 20
+
+
+def frame(step):
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    image[:, : step + 1] = 255
+    return image
+
+
+def test_encodes_once_for_all_clients():
+    broadcaster = MjpegBroadcaster(jpeg_quality=80)
+    received = [[] for _ in range(CLIENTS)]
+    done = threading.Event()
+
+    def client(index):
+        sequence = 0
+        while not done.is_set():
+            result = broadcaster.wait_for_frame(sequence, timeout=0.2)
+            if result is not None:
+                sequence = result[0]
+                received[index].append(result)
+
+    for _ in range(CLIENTS):
+        broadcaster.add_client()
+    threads = [threading.Thread(target=client, args=(index,), daemon=True) for index in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for step in range(FRAMES):
+        broadcaster.publish(frame(step))
+        time.sleep(0.02)
+    time.sleep(0.1)
+    done.set()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert broadcaster.get_encode_count() == FRAMES, broadcaster.get_encode_count()
+    jpeg_by_sequence = {}
+    for frames in received:
+        sequences = [sequence for sequence, _ in frames]
+        assert sequences == sorted(set(sequences)), f"a client got a frame twice or out of order: {sequences}"
+        assert sequences and sequences[-1] == FRAMES, sequences
+        for sequence, jpeg in frames:
+            assert jpeg_by_sequence.setdefault(sequence, jpeg) is jpeg, "clients should share one encoded buffer"
+
+
+def test_unwatched_frames_are_encoded_on_demand():
+    broadcaster = MjpegBroadcaster()
+    for step in range(10):
+        broadcaster.publish(frame(step))
+    assert broadcaster.get_encode_count() == 0
+    sequence, jpeg = broadcaster.latest()
+    assert sequence == 10 and jpeg.startswith(b"\xff\xd8")
+    broadcaster.latest()
+    assert broadcaster.get_encode_count() == 1, "the pending frame should be encoded only once"
+    broadcaster.clear()
+    assert broadcaster.latest() is None
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_encodes_once_for_all_clients, test_unwatched_frames_are_encoded_on_demand):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the background model preloader.
+Tests:
+- A model goes pending -> loading -> warming -> ready, with load and warmup times
+- A loader that returns False or raises marks the model failed; a failed warmup still ends ready
+- wait() returns False at once for unknown models and before start()
+"""
+
+import sys
+import threading
+import time
+
+from camera_feed_app.app.services.model_preloader import ModelPreloader
+
+
+def test_states_until_ready():
+    preloader = ModelPreloader()
+    release_load = threading.Event()
+    release_warmup = threading.Event()
+    preloader.register("drone", lambda: release_load.wait(5), lambda: release_warmup.wait(5))
+    assert preloader.get_state("drone") == ModelPreloader.PENDING
+    preloader.start()
+
+    def wait_for_state(state):
+        deadline = time.monotonic() + 2
+        while preloader.get_state("drone") != state and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return preloader.get_state("drone")
+
+    assert wait_for_state(ModelPreloader.LOADING) == ModelPreloader.LOADING
+    release_load.set()
+    assert wait_for_state(ModelPreloader.WARMING) == ModelPreloader.WARMING
+    release_warmup.set()
+    assert preloader.wait("drone", timeout=2)
+    status = preloader.get_status()["drone"]
+    assert status["state"] == ModelPreloader.READY and status["load_ms"] is not None and status["warmup_ms"] is not None, status
+
+
+def test_failures():
+    def broken_warmup():
+        raise RuntimeError("no GPU")
+
+    def broken_load():
+        raise RuntimeError("missing weights")
+
+    preloader = ModelPreloader()
+    preloader.register("face", lambda: False)
+    preloader.register("audio", broken_load)
+    preloader.register("weapon", lambda: True, broken_warmup)
+    preloader.start()
+    assert not preloader.wait("face", timeout=2)
+    assert not preloader.wait("audio", timeout=2)
+    assert preloader.wait("weapon", timeout=2), "a failed warmup must not fail the model"
+    status = preloader.get_status()
+    assert status["face"]["state"] == ModelPreloader.FAILED and status["face"]["error"] == "model failed to load"
+    assert status["audio"]["error"] == "missing weights"
+    assert status["weapon"]["error"].startswith("warmup failed"), status["weapon"]
+
+
+def test_wait_without_preload_returns_at_once():
+    preloader = ModelPreloader()
+    preloader.register("drone", lambda: True)
+    started = time.monotonic()
+    assert not preloader.wait("drone"), "a preload that was never started must not block"
+    assert not preloader.wait("unknown")
+    assert time.monotonic() - started < 0.1
+    assert preloader.get_state("unknown") is None
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_states_until_ready, test_failures, test_wait_without_preload_returns_at_once):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test the shared model registry's idle eviction.
+Tests:
+- Models nobody holds are evicted once idle and reloaded on demand
+- Models pinned by a user (such as preloaded models) are never evicted
+"""
+
+import sys
+import time
+
+from camera_feed_app.app.services.model_registry import ModelRegistry
+
+
+class FakeModel:
+    pass
+
+
+def test_idle_model_is_evicted_and_reloaded():
+    registry = ModelRegistry(idle_seconds=0.05, check_seconds=3600)
+    handle = registry.register("fake:a", FakeModel)
+    first = handle.load()
+    time.sleep(0.1)
+    assert registry.evict_idle() == ["fake:a"]
+    assert not handle.is_loaded()
+    assert handle.load() is not first, "an evicted model should be loaded again"
+
+
+def test_pinned_model_is_kept():
+    registry = ModelRegistry(idle_seconds=0.05, check_seconds=3600)
+    handle = registry.register("fake:b", FakeModel)
+    handle.load()
+    handle.acquire("preload")
+    time.sleep(0.1)
+    assert registry.evict_idle() == [], "a pinned model must not be evicted"
+    assert handle.is_loaded()
+    assert registry.get_stats()["models"]["fake:b"]["users"] == ["preload"]
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_idle_model_is_evicted_and_reloaded, test_pinned_model_is_kept):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the motion gate's region crops and full-frame fallback.
+Tests:
+- Still frames are gated after the hold period
+- Motion frames get crops around the moving object
+- Detectors with frame skips that do not line up with MOTION_ROI_FULL_FRAME_EVERY
+  still get a full frame under constant motion
+"""
+
+import sys
+
+import numpy as np
+
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.motion_gate import MotionGate
+
+
+def moving_square_frame(step, size=48):
+    """A dark 640x480 frame with a bright square that moves every frame."""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    x = 40 + (step * 17) % 400
+    frame[200:200 + size, x:x + size] = 255
+    return frame
+
+
+def test_still_frames_are_gated():
+    gate = MotionGate(hold_frames=2, keepalive=0)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    results = [gate.update(FrameContext(frame), "cam").should_infer for _ in range(6)]
+    assert results[0], "the first frame must always be examined"
+    assert not any(results[1:]), f"still frames should be gated, got {results}"
+
+
+def test_motion_gets_regions():
+    gate = MotionGate(keepalive=0, roi_enabled=True, full_frame_every=10)
+    gate.update(FrameContext(moving_square_frame(0)), "cam")
+    motion = gate.update(FrameContext(moving_square_frame(1)), "cam")
+    assert motion.should_infer and motion.motion
+    assert motion.regions, "a small moving object should give crop regions"
+    assert gate.regions_for("cam", ["drone"], motion.regions) == motion.regions
+
+
+def test_full_frame_reaches_every_skip():
+    """Run the gate the way the camera manager does, with detectors that skip frames."""
+    full_frame_every = 10
+    for skips in ((2,), (5,), (10,), (2, 5), (3, 7)):
+        gate = MotionGate(keepalive=0, roi_enabled=True, full_frame_every=full_frame_every)
+        counters = {f"detector{skip}": 0 for skip in skips}
+        runs = {name: [] for name in counters}
+        for step in range(200):
+            motion = gate.update(FrameContext(moving_square_frame(step)), "cam")
+            assert motion.should_infer, "constant motion should never be gated"
+            running = [name for name, counter in counters.items() if (counter + 1) % int(name[8:]) == 0]
+            regions = gate.regions_for("cam", running, motion.regions)
+            for name in counters:
+                counters[name] += 1
+            for name in running:
+                runs[name].append(regions is None)
+
+        for name, full_frames in runs.items():
+            assert any(full_frames), f"{name} never got a full frame (skips {skips})"
+            # After the first frame, no detector runs on crops full_frame_every times in a row.
+            longest = max(len(run) for run in "".join("F" if full else "r" for full in full_frames).split("F"))
+            assert longest < full_frame_every, f"{name} ran {longest} times on crops in a row (skips {skips})"
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_still_frames_are_gated, test_motion_gets_regions, test_full_frame_reaches_every_skip):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the Kalman box tracker used between detection runs.
+Tests:
+- A second detection at the same timestamp keeps the box (no collapse to zero)
+- Unsmoothed updates (uploaded images) show the detections as they are
+- A moving object keeps its track ID and is extrapolated forward
+- Frames examined with no live tracks skip the optical flow image
+"""
+
+import sys
+
+import numpy as np
+
+from camera_feed_app.app.services.frame_context import FrameContext
+from camera_feed_app.app.services.object_tracker import ObjectTracker
+
+
+def assert_box_close(actual, expected, tolerance=2.0):
+    assert np.allclose(actual[:4], expected[:4], atol=tolerance), f"box {actual[:4]} is not close to {expected[:4]}"
+
+
+def test_same_timestamp_updates_do_not_collapse():
+    tracker = ObjectTracker()
+    box = (100, 120, 180, 200, 0.9)
+    tracker.update("drone", [box], 10.0)
+    tracker.update("drone", [box], 10.0)
+    tracker.update("drone", [box], 10.0)
+    boxes = tracker.visible_boxes("drone", now=10.0)
+    assert len(boxes) == 1, f"expected one track, got {boxes}"
+    assert_box_close(boxes[0], box)
+
+
+def test_updates_without_propagate_follow_detections():
+    """Uploads and detection-only streams never call propagate() between updates."""
+    tracker = ObjectTracker()
+    tracker.update("gun", [(50, 50, 150, 150, 0.8)], 1.0)
+    tracker.update("gun", [(60, 55, 160, 155, 0.8)], 1.0)
+    boxes = tracker.visible_boxes("gun", now=1.0)
+    assert len(boxes) == 1
+    assert boxes[0][2] > boxes[0][0] and boxes[0][3] > boxes[0][1], f"degenerate box {boxes[0]}"
+    assert_box_close(boxes[0], (55, 52, 155, 152), tolerance=6.0)
+
+
+def test_unsmoothed_update_replaces_tracks():
+    tracker = ObjectTracker()
+    tracker.update("knife", [(10, 10, 50, 50, 0.7)], 5.0)
+    tracker.update("knife", [(300, 300, 360, 380, 0.6)], 5.0, smooth=False)
+    boxes = tracker.visible_boxes("knife", now=5.0)
+    assert len(boxes) == 1, f"old tracks should be dropped, got {boxes}"
+    assert boxes[0][:4] == (300, 300, 360, 380)
+
+
+def test_moving_object_keeps_id():
+    tracker = ObjectTracker(max_extrapolation=0.5)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    track_ids = set()
+    for step in range(6):
+        timestamp = 100.0 + step * 0.1
+        x = 100 + step * 10
+        tracker.propagate(FrameContext(frame, timestamp=timestamp))
+        tracker.update("drone", [(x, 100, x + 60, 160, 0.9)], timestamp)
+        track_ids.update(box[5] for box in tracker.visible_boxes("drone", now=timestamp))
+    assert len(track_ids) == 1, f"the object changed track IDs: {track_ids}"
+    ahead = tracker.visible_boxes("drone", now=100.5 + 0.2)[0]
+    assert ahead[0] > 150, f"the box should be extrapolated along the motion, got {ahead}"
+
+
+def test_propagate_without_tracks_skips_flow():
+    tracker = ObjectTracker()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    context = FrameContext(frame, timestamp=1.0)
+    tracker.propagate(context)
+    assert tracker._prev_gray is None and not context._views, "no tracks should mean no flow image"
+    tracker.update("drone", [(100, 100, 160, 160, 0.9)], 1.0)
+    tracker.propagate(FrameContext(frame, timestamp=1.1))
+    tracker.propagate(FrameContext(frame, timestamp=1.2))
+    assert len(tracker.visible_boxes("drone", now=1.2)) == 1
+    tracker.clear()
+    tracker.propagate(FrameContext(frame, timestamp=1.3))
+    assert tracker._prev_gray is None, "the flow image should be dropped once the last track is gone"
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (
+        test_same_timestamp_updates_do_not_collapse,
+        test_updates_without_propagate_follow_detections,
+        test_unsmoothed_update_replaces_tracks,
+        test_moving_object_keeps_id,
+        test_propagate_without_tracks_skips_flow,
+    ):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
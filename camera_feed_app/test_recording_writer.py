@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the background recording writer and its bounded queue.
+Tests:
+- Every submitted frame is written in order and the file is closed once
+- drop_oldest discards the oldest queued frames when the writer falls behind
+- block makes the submitter wait instead of dropping
+- A failing write is counted and does not stop the writer
+"""
+
+import sys
+import threading
+import time
+
+from camera_feed_app.app.services.recording_writer import RecordingWriter
+
+
+class SlowSink:
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.frames = []
+        self.closed = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def write(self, frame):
+        self.gate.wait()
+        time.sleep(self.delay)
+        if frame == self.fail_on:
+            raise IOError("disk full")
+        self.frames.append(frame)
+
+    def close(self):
+        self.closed += 1
+
+
+def test_writes_all_frames_in_order():
+    sink = SlowSink()
+    writer = RecordingWriter("test", sink.write, sink.close, queue_size=64)
+    for frame in range(50):
+        assert writer.submit(frame)
+    writer.close(timeout=5)
+    stats = writer.get_stats()
+    assert sink.frames == list(range(50)), sink.frames
+    assert sink.closed == 1 and stats["finished"] and stats["written"] == 50, stats
+    assert not writer.submit(99), "a closed writer must refuse frames"
+
+
+def test_drop_oldest_keeps_newest():
+    sink = SlowSink()
+    sink.gate.clear()
+    writer = RecordingWriter("test", sink.write, sink.close, queue_size=4, drop_policy="drop_oldest")
+    writer.submit(0)
+    time.sleep(0.1)  # The writer thread is now stuck writing frame 0.
+    for frame in range(1, 11):
+        assert writer.submit(frame)
+    sink.gate.set()
+    writer.close(timeout=5)
+    assert sink.frames == [0, 7, 8, 9, 10], sink.frames
+    assert writer.get_stats()["dropped"] == 6
+
+
+def test_block_waits_for_space():
+    sink = SlowSink(delay=0.01)
+    writer = RecordingWriter("test", sink.write, sink.close, queue_size=2, drop_policy="block")
+    started = time.monotonic()
+    for frame in range(20):
+        assert writer.submit(frame)
+    assert time.monotonic() - started >= 0.1, "submit should have waited for the slow writer"
+    writer.close(timeout=5)
+    assert sink.frames == list(range(20))
+    assert writer.get_stats()["dropped"] == 0
+
+
+def test_failed_write_is_counted():
+    sink = SlowSink(fail_on=3)
+    writer = RecordingWriter("test", sink.write, sink.close)
+    for frame in range(6):
+        writer.submit(frame)
+    writer.close(timeout=5)
+    stats = writer.get_stats()
+    assert sink.frames == [0, 1, 2, 4, 5] and stats["failed"] == 1 and sink.closed == 1, stats
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_writes_all_frames_in_order, test_drop_oldest_keeps_newest, test_block_waits_for_space, test_failed_write_is_counted):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the lock-free state snapshot behind /api/status, /api/fps and /api/ai_status.
+Tests:
+- The version only increases when the published content changes
+- Rebuilds are rate limited unless forced, and a stale snapshot is rebuilt on read
+- A request whose If-None-Match matches the snapshot ETag gets 304
+- The event stream starts with the full state, then sends only changed keys
+- Changes published faster than the event rate are folded into one event
+- A keepalive comment is sent while nothing changes
+"""
+
+import json
+import sys
+import time
+
+from flask import Flask
+
+from camera_feed_app.app.routes.camera_routes import _snapshot_response
+from camera_feed_app.app.services.state_snapshot import StatePublisher, state_events
+
+
+class FakeState:
+    def __init__(self):
+        self.faces = 0
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {"is_running": True}, {"face_enabled": True, "faces_detected": self.faces}, {None: 15.0, 0: 15.0}
+
+
+def test_version_changes_only_with_content():
+    state = FakeState()
+    publisher = StatePublisher(state.build, min_interval=0.0)
+    first = publisher.publish(force=True)
+    second = publisher.publish(force=True)
+    assert second.version == first.version and second.ai_status_etag == first.ai_status_etag
+    state.faces = 2
+    third = publisher.publish(force=True)
+    assert third.version == first.version + 1 and third.ai_status_etag != first.ai_status_etag
+    assert third.status_etag == first.status_etag, "an unchanged payload must keep its ETag"
+
+
+def test_rebuilds_are_rate_limited():
+    state = FakeState()
+    publisher = StatePublisher(state.build, min_interval=10.0, max_age=10.0)
+    snapshot = publisher.publish(force=True)
+    state.faces = 1
+    assert publisher.publish() is snapshot and state.builds == 1, "a frame inside min_interval must not rebuild"
+    assert publisher.publish(force=True).ai_status["faces_detected"] == 1
+
+    stale = StatePublisher(state.build, min_interval=0.0, max_age=0.05)
+    old = stale.current()
+    assert stale.current() is old
+    time.sleep(0.1)
+    assert stale.current() is not old, "a snapshot older than max_age should be rebuilt on read"
+
+
+def test_matching_etag_gets_304():
+    snapshot = StatePublisher(FakeState().build).publish(force=True)
+    app = Flask(__name__)
+    with app.test_request_context("/api/ai_status"):
+        response = _snapshot_response(snapshot.ai_status_body, snapshot.ai_status_etag, snapshot.version)
+        assert response.status_code == 200 and response.headers["X-State-Version"] == str(snapshot.version)
+        etag = response.headers["ETag"]
+    with app.test_request_context("/api/ai_status", headers={"If-None-Match": etag}):
+        response = _snapshot_response(snapshot.ai_status_body, snapshot.ai_status_etag, snapshot.version)
+        assert response.status_code == 304, response.status_code
+    with app.test_request_context("/api/ai_status", headers={"If-None-Match": 'W/"stale"'}):
+        response = _snapshot_response(snapshot.ai_status_body, snapshot.ai_status_etag, snapshot.version)
+        assert response.status_code == 200
+
+
+def read_event(events):
+    chunk = next(events)
+    lines = dict(line.split(": ", 1) for line in chunk.decode("utf-8").strip().split("\n"))
+    assert lines.get("event") == "state", chunk
+    return json.loads(lines["data"])
+
+
+def test_events_send_full_state_then_deltas():
+    state = FakeState()
+    publisher = StatePublisher(state.build, min_interval=0.0)
+    events = state_events(publisher, max_rate=0)
+    assert next(events).startswith(b"retry:")
+    first = read_event(events)
+    assert first["full"] and first["status"] == {"is_running": True} and first["fps"] == 15.0, first
+    assert first["ai_status"] == {"face_enabled": True, "faces_detected": 0}
+    state.faces = 1
+    publisher.publish(force=True)
+    delta = read_event(events)
+    assert delta == {"version": first["version"] + 1, "ai_status": {"faces_detected": 1}}, delta
+
+
+def test_events_coalesce_fast_changes():
+    state = FakeState()
+    publisher = StatePublisher(state.build, min_interval=0.0)
+    events = state_events(publisher, max_rate=4.0)
+    next(events)
+    first = read_event(events)
+    sent_at = time.monotonic()
+    for faces in (1, 2, 3):
+        state.faces = faces
+        publisher.publish(force=True)
+    delta = read_event(events)
+    assert time.monotonic() - sent_at >= 0.2, "events must not exceed max_rate"
+    assert delta == {"version": first["version"] + 3, "ai_status": {"faces_detected": 3}}, delta
+
+
+def test_events_keepalive():
+    publisher = StatePublisher(FakeState().build, min_interval=0.0, max_age=60.0)
+    events = state_events(publisher, max_rate=0, keepalive=0.1)
+    next(events)
+    read_event(events)
+    assert next(events) == b": keepalive\n\n"
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (
+        test_version_changes_only_with_content,
+        test_rebuilds_are_rate_limited,
+        test_matching_etag_gets_304,
+        test_events_send_full_state_then_deltas,
+        test_events_coalesce_fast_changes,
+        test_events_keepalive,
+    ):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as error:
+            failed += 1
+            print(f"FAIL {test.__name__}: {error}")
+    sys.exit(1 if failed else 0)